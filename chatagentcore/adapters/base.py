@@ -1,19 +1,116 @@
 """Base adapter class for chat platforms"""
 
+import asyncio
+import inspect
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict
-from pydantic import BaseModel
+from collections import deque
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, List, Optional
+from loguru import logger
 
+if TYPE_CHECKING:
+    from chatagentcore.adapters.stream import ReplyStream
 
-class Message(BaseModel):
-    """统一消息格式"""
+# SDK 线程等待入站消息落盘的最长时间（秒），超时后照常返回（不阻塞平台应答过久）
+_PERSIST_TIMEOUT = 5.0
 
-    platform: str  # feishu | wecom | dingtalk
-    message_id: str
-    sender: Dict[str, Any]  # {"id": "...", "name": "..."}
-    conversation: Dict[str, Any]  # {"id": "...", "type": "user|group"}
-    content: Dict[str, Any]  # {"type": "text|image|card", "text": "..."}
-    timestamp: int
+
+class Message:
+    """统一消息格式
+
+    入站热路径上的内部表示：使用 __slots__ 的轻量对象，构造时不做校验。
+    平台原始数据（如钉钉 to_dict()、飞书卡片 content）通过 raw 延迟生成，
+    只有访问 data 或在 API 边界调用 to_dict() 时才物化为 content["data"]。
+    """
+
+    __slots__ = ("platform", "message_id", "sender", "conversation", "content", "timestamp", "_raw")
+
+    def __init__(
+        self,
+        platform: str,
+        message_id: str,
+        sender: Dict[str, Any],
+        conversation: Dict[str, Any],
+        content: Dict[str, Any],
+        timestamp: int,
+        raw: Any = None,
+    ):
+        """
+        初始化消息
+
+        Args:
+            platform: 平台名称（feishu | wecom | dingtalk ...）
+            message_id: 消息 ID
+            sender: 发送者 {"id": "...", "name": "..."}
+            conversation: 会话 {"id": "...", "type": "user|group"}
+            content: 内容 {"type": "text|image|card", "text": "..."}
+            timestamp: 时间戳
+            raw: 平台原始数据，或返回原始数据的无参函数（首次访问 data 时调用）
+        """
+        self.platform = platform
+        self.message_id = message_id
+        self.sender = sender
+        self.conversation = conversation
+        self.content = content
+        self.timestamp = timestamp
+        self._raw = raw
+
+    @property
+    def data(self) -> Any:
+        """平台原始数据（content["data"] 优先，其次延迟生成的 raw）"""
+        if "data" in self.content:
+            return self.content["data"]
+        raw = self._raw
+        if callable(raw):
+            raw = self._raw = raw()
+        return raw if raw is not None else {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为 API 边界使用的字典（物化原始数据）
+
+        Returns:
+            消息字典，原始数据位于 content["data"]
+        """
+        content = self.content
+        if self._raw is not None and "data" not in content:
+            content = {**content, "data": self.data}
+        return {
+            "platform": self.platform,
+            "message_id": self.message_id,
+            "sender": self.sender,
+            "conversation": self.conversation,
+            "content": content,
+            "timestamp": self.timestamp,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Message":
+        """
+        从 to_dict() 的结果还原消息
+
+        Args:
+            data: 消息字典
+
+        Returns:
+            消息对象
+        """
+        return cls(
+            platform=data["platform"],
+            message_id=data["message_id"],
+            sender=data.get("sender", {}),
+            conversation=data.get("conversation", {}),
+            content=data.get("content", {}),
+            timestamp=data.get("timestamp", 0),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Message):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Message(platform={self.platform!r}, message_id={self.message_id!r}, conversation={self.conversation!r})"
 
 
 class BaseAdapter(ABC):
@@ -22,6 +119,12 @@ class BaseAdapter(ABC):
     所有平台适配器必须继承此类并实现抽象方法。
     """
 
+    # 单条文本消息的最大字符数，超出时由路由器切分为多条按序发送（None 表示不限制）
+    max_text_length: Optional[int] = None
+    # 拉取式适配器（如长轮询）：等待消息处理器返回的协程完成后再继续拉取，
+    # 入站队列已满时放慢拉取而不是丢弃消息
+    pull_based: bool = False
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化适配器
@@ -31,6 +134,15 @@ class BaseAdapter(ABC):
         """
         self.config = config
         self.platform_name = self.__class__.__name__.lower().replace("adapter", "")
+        # 入站消息处理器及其所在的事件循环（主循环）
+        self._message_handler: Optional[Callable[[Message], Any]] = None
+        self._inbound_loop: Optional[asyncio.AbstractEventLoop] = None
+        # 其他线程投递、等待主循环批量处理的消息
+        self._inbound_buffer: Deque[Message] = deque()
+        self._inbound_lock = threading.Lock()
+        self._inbound_scheduled = False
+        # 入站持久化：SDK 线程投递消息后等待其在收件箱中落盘再返回（None 表示不等待）
+        self._inbound_flush: Optional[Callable[[], Awaitable[None]]] = None
 
     @abstractmethod
     async def send_message(
@@ -53,14 +165,162 @@ class BaseAdapter(ABC):
         """
         pass
 
+    async def send_batch(
+        self,
+        recipients: List[str],
+        message_type: str,
+        content: str,
+        conversation_type: str = "user",
+        concurrency: int = 10,
+    ) -> Dict[str, str]:
+        """
+        向多个接收者发送同一条消息
+
+        默认实现以有限并发逐个调用 send_message；平台提供批量发送接口时应覆盖此方法。
+
+        Args:
+            recipients: 接收者 ID 列表
+            message_type: 消息类型
+            content: 消息内容
+            conversation_type: 会话类型 user | group
+            concurrency: 最大并发数
+
+        Returns:
+            发送结果 {接收者ID: 消息ID 或 "Error: ..."}
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        results: Dict[str, str] = {}
+
+        async def send_one(to: str) -> None:
+            async with semaphore:
+                try:
+                    results[to] = await self.send_message(to, message_type, content, conversation_type)
+                except Exception as e:
+                    results[to] = f"Error: {e}"
+
+        await asyncio.gather(*(send_one(to) for to in recipients))
+        return results
+
+    def open_stream(
+        self, to: str, conversation_type: str = "user", min_interval: float = 1.0
+    ) -> "ReplyStream":
+        """
+        打开流式回复
+
+        默认实现把已完整的段落分段发送；支持更新已发消息的平台应覆盖此方法，
+        在同一条消息上渲染生成进度。
+
+        Args:
+            to: 接收者 ID
+            conversation_type: 会话类型 user | group
+            min_interval: 两次进度更新之间的最小间隔（秒）
+
+        Returns:
+            流式回复对象
+        """
+        from chatagentcore.adapters.stream import ChunkedReplyStream
+
+        return ChunkedReplyStream(self, to, conversation_type, min_interval)
+
     def set_message_handler(self, handler: Callable[[Message], None]):
         """
         设置消息处理器
 
+        需在主事件循环中调用：处理器始终在调用本方法时所在的事件循环中执行。
+
         Args:
             handler: 消息处理函数，接收 Message 对象
         """
-        pass
+        self._message_handler = handler
+        self._bind_inbound_loop()
+
+    def _bind_inbound_loop(self) -> None:
+        """
+        记录主事件循环，入站消息始终在该循环中处理
+
+        使用 emit_inbound 的适配器应在 initialize 中（启动 SDK 线程之前）调用。
+        """
+        try:
+            self._inbound_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+    def set_inbound_flush(self, flush: Optional[Callable[[], Awaitable[None]]]) -> None:
+        """
+        设置入站持久化等待函数（启用收件箱时由主程序设置）
+
+        设置后，SDK 线程中的 emit_inbound 会阻塞到消息在收件箱中落盘后才返回，
+        SDK 回调返回（向平台应答）之前消息已持久化。
+
+        Args:
+            flush: 在主循环中执行的协程函数，等待已入队消息落盘；None 表示不等待
+        """
+        self._inbound_flush = flush
+
+    def emit_inbound(self, message: Message) -> None:
+        """
+        投递一条入站消息（可在任意线程调用）
+
+        在主循环中调用时直接交给处理器；在 SDK 线程中调用时先放入缓冲区，
+        同一批突发消息只通过 call_soon_threadsafe 唤醒主循环一次，由主循环批量处理。
+        设置了 set_inbound_flush 时，SDK 线程会等待消息落盘（最多 _PERSIST_TIMEOUT 秒）后再返回。
+
+        Args:
+            message: 入站消息
+        """
+        loop = self._inbound_loop
+        if loop is None or loop.is_closed():
+            # 未记录主循环：不在 SDK 线程中执行依赖事件循环的处理器
+            logger.warning(f"[{self.platform_name}] No event loop bound, dropped inbound {message.message_id}")
+            return
+
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+
+        with self._inbound_lock:
+            if on_loop and not self._inbound_buffer:
+                wake = None
+            else:
+                self._inbound_buffer.append(message)
+                wake = not self._inbound_scheduled
+                self._inbound_scheduled = True
+
+        if wake is None:
+            self._deliver_inbound(message)
+            return
+        if wake:
+            loop.call_soon_threadsafe(self._drain_inbound)
+        if self._inbound_flush is not None and not on_loop:
+            # 主循环按调度顺序先处理缓冲区再执行 flush，flush 完成即表示本条消息已落盘
+            future = asyncio.run_coroutine_threadsafe(self._inbound_flush(), loop)
+            try:
+                future.result(timeout=_PERSIST_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"[{self.platform_name}] Inbound message {message.message_id} not persisted before ack: {e}")
+
+    def _drain_inbound(self) -> None:
+        """在主循环中处理缓冲区中的全部消息"""
+        with self._inbound_lock:
+            batch = list(self._inbound_buffer)
+            self._inbound_buffer.clear()
+            self._inbound_scheduled = False
+        for message in batch:
+            self._deliver_inbound(message)
+
+    def _deliver_inbound(self, message: Message) -> None:
+        """调用消息处理器（协程处理器以任务方式运行）"""
+        handler = self._message_handler
+        if handler is None:
+            logger.debug(f"[{self.platform_name}] No message handler set, dropped {message.message_id}")
+            return
+        try:
+            result = handler(message)
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result)
+        except Exception as e:
+            logger.error(f"[{self.platform_name}] Message handler error: {e}")
 
     async def initialize(self) -> None:
         """初始化适配器（可选实现）"""
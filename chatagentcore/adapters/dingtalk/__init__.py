@@ -3,15 +3,23 @@
 import asyncio
 import json
 import time
-from typing import Dict, Any, Callable, Optional, Final
+import uuid
+from typing import Dict, Any, List, Optional, Final
 from loguru import logger
 from chatagentcore.adapters.base import BaseAdapter, Message
+from chatagentcore.adapters.stream import ReplyStream
 from chatagentcore.adapters.dingtalk.client import DingTalkClientSDK, HAS_SDK
 
+# 批量发送接口单次最多的接收者数量
+BATCH_SEND_LIMIT: Final = 20
+
 
 class DingTalkAdapter(BaseAdapter):
     """钉钉适配器 - 支持 Stream Mode 长连接模式"""
 
+    # 互动卡片 markdown 内容的长度上限
+    max_text_length = 5000
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化钉钉适配器
@@ -26,9 +34,6 @@ class DingTalkAdapter(BaseAdapter):
         self.client_id = config.get("client_id") or config.get("app_key", "")
         self.client_secret = config.get("client_secret") or config.get("app_secret", "")
         
-        # 事件处理器
-        self._message_handler: Optional[Callable] = None
-
         # 客户端
         self._client: Optional[DingTalkClientSDK] = None
 
@@ -37,6 +42,8 @@ class DingTalkAdapter(BaseAdapter):
 
     async def initialize(self) -> None:
         """初始化适配器"""
+        # SDK 在独立线程中回调，入站消息需投递回当前（主）事件循环
+        self._bind_inbound_loop()
         if not HAS_SDK:
             raise ImportError(
                 "dingtalk-stream SDK 未安装，请运行: pip install dingtalk-stream"
@@ -78,12 +85,8 @@ class DingTalkAdapter(BaseAdapter):
             
             logger.info(f"收到钉钉消息: {message.sender['name']} -> {message.content['text'][:50]}")
 
-            # 调用消息处理器
-            if self._message_handler:
-                if asyncio.iscoroutinefunction(self._message_handler):
-                    await self._message_handler(message)
-                else:
-                    self._message_handler(message)
+            # SDK 回调运行在 Stream 线程中，交由主循环处理
+            self.emit_inbound(message)
         except Exception as e:
             logger.error(f"处理钉钉消息异常: {e}")
 
@@ -124,9 +127,9 @@ class DingTalkAdapter(BaseAdapter):
             content={
                 "type": "text" if ding_msg.message_type == "text" else ding_msg.message_type,
                 "text": text_content,
-                "data": ding_msg.to_dict(),
             },
             timestamp=int(ding_msg.create_at) if ding_msg.create_at else int(time.time() * 1000),
+            raw=ding_msg.to_dict,
         )
 
     async def send_message(
@@ -147,9 +150,48 @@ class DingTalkAdapter(BaseAdapter):
             return f"ding_{int(time.time())}"
         raise Exception("钉钉消息发送失败")
 
-    def set_message_handler(self, handler: Callable[[Message], None]):
-        """设置消息处理器"""
-        self._message_handler = handler
+    async def send_batch(
+        self,
+        recipients: List[str],
+        message_type: str,
+        content: str,
+        conversation_type: str = "user",
+        concurrency: int = 10,
+    ) -> Dict[str, str]:
+        """批量发送消息：单聊使用 oToMessages/batchSend 接口，每 20 人一批；群聊逐个发送"""
+        if conversation_type == "group":
+            return await super().send_batch(recipients, message_type, content, conversation_type, concurrency)
+        if not self._client:
+            raise RuntimeError("客户端未初始化")
+
+        semaphore = asyncio.Semaphore(concurrency)
+        results: Dict[str, str] = {}
+
+        async def send_chunk(user_ids: List[str]) -> None:
+            try:
+                async with semaphore:
+                    data = await self._client.batch_send_markdown(user_ids, content)
+            except Exception as e:
+                results.update({user_id: f"Error: {e}" for user_id in user_ids})
+                return
+            key = data.get("processQueryKey", "")
+            results.update({user_id: key for user_id in user_ids})
+            for user_id in data.get("invalidStaffIdList") or []:
+                results[user_id] = "Error: invalid userId"
+            for user_id in data.get("flowControlledStaffIdList") or []:
+                results[user_id] = "Error: flow controlled"
+
+        await asyncio.gather(*(
+            send_chunk(recipients[i:i + BATCH_SEND_LIMIT])
+            for i in range(0, len(recipients), BATCH_SEND_LIMIT)
+        ))
+        return results
+
+    def open_stream(
+        self, to: str, conversation_type: str = "user", min_interval: float = 1.0
+    ) -> ReplyStream:
+        """打开流式回复（发送互动卡片后持续更新卡片内容）"""
+        return DingTalkReplyStream(self, to, conversation_type, min_interval)
 
     async def shutdown(self) -> None:
         """关闭适配器"""
@@ -164,4 +206,34 @@ class DingTalkAdapter(BaseAdapter):
         return self._ws_started and self._client is not None
 
 
-__all__ = ["DingTalkAdapter"]
+class DingTalkReplyStream(ReplyStream):
+    """钉钉流式回复 - 首次更新时发送互动卡片，之后按 cardBizId 更新卡片内容"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._card_biz_id = f"biz_{uuid.uuid4().hex[:16]}"
+        self._card_sent = False
+
+    async def _render(self, text: str) -> None:
+        client = self.adapter._client
+        if not client:
+            raise RuntimeError("客户端未初始化")
+
+        if not self._card_sent:
+            if not await client.send_message(
+                self.to, "markdown", text, self.conversation_type, card_biz_id=self._card_biz_id
+            ):
+                raise Exception("钉钉消息发送失败")
+            self._card_sent = True
+        elif not await client.update_card(self._card_biz_id, text):
+            raise Exception("钉钉卡片更新失败")
+
+    async def _update(self, text: str) -> None:
+        await self._render(text + " ▌")
+
+    async def _finalize(self, text: str) -> str:
+        await self._render(text)
+        return self._card_biz_id
+
+
+__all__ = ["DingTalkAdapter", "DingTalkReplyStream"]
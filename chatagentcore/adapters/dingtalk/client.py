@@ -11,6 +11,8 @@ import threading
 import uuid
 from typing import Optional, Dict, Any, Callable, List
 from loguru import logger
+from chatagentcore.core.templates import CompiledTemplate
+from chatagentcore.storage.logger import get_log_throttle
 
 # 导入钉钉 SDK
 try:
@@ -30,11 +32,37 @@ def _run_ws_in_new_thread(client: 'dingtalk_stream.DingTalkStreamClient'):
         # DingTalkStreamClient.start() 是异步的
         loop.run_until_complete(client.start())
     except Exception as e:
-        logger.error(f"钉钉 WebSocket 客户端运行异常: {e}")
+        get_log_throttle().error("钉钉 WebSocket 客户端运行异常: {}", e)
     finally:
         loop.close()
 
 
+# 标准互动卡片（标题 + Markdown 内容），预编译一次，发送时只做占位符替换
+_STANDARD_CARD = CompiledTemplate(
+    {
+        "config": {
+            "autoLayout": True,
+            "enableForward": True
+        },
+        "header": {
+            "title": {
+                "type": "text",
+                "text": "AI 助手回复"
+            },
+            "logo": "@lALPDfJ6V_FPDmvNAfTNAfQ"
+        },
+        "contents": [
+            {
+                "type": "markdown",
+                "text": "{{content}}",
+                "id": "text_{{card_id}}"
+            }
+        ]
+    },
+    message_type="card",
+)
+
+
 class DingTalkClientSDK:
     """钉钉客户端 - 官方 SDK 实现（支持 Stream Mode 长连接模式）"""
 
@@ -155,16 +183,37 @@ class DingTalkClientSDK:
         
         return self._access_token
 
+    @staticmethod
+    def build_card_data(content: Any) -> str:
+        """
+        构造标准互动卡片数据（标题 + Markdown 内容）
+
+        Args:
+            content: Markdown 内容
+
+        Returns:
+            卡片数据 JSON 字符串
+        """
+        return _STANDARD_CARD.render({"content": str(content), "card_id": uuid.uuid4().hex[:8]})
+
     async def send_message(
         self,
         to: str,
         message_type: str,
         content: Any,
-        conversation_type: str = "user"
+        conversation_type: str = "user",
+        card_biz_id: Optional[str] = None,
     ) -> bool:
         """
         发送消息 (Proactive)
         使用钉钉互动卡片 OpenAPI: https://open.dingtalk.com/document/orgapp/robots-send-interactive-cards
+
+        Args:
+            to: 接收者 ID
+            message_type: 消息类型
+            content: 消息内容
+            conversation_type: 会话类型
+            card_biz_id: 卡片业务 ID（可选，后续可用于更新卡片）
         """
         try:
             token = await self._get_access_token()
@@ -174,34 +223,11 @@ class DingTalkClientSDK:
                 "Content-Type": "application/json",
             }
             
-            # 构造符合钉钉规范的交互卡片结构
-            # 这是一个包含标题和 Markdown 内容的完整卡片数据
-            card_data_obj = {
-                "config": {
-                    "autoLayout": True,
-                    "enableForward": True
-                },
-                "header": {
-                    "title": {
-                        "type": "text",
-                        "text": "AI 助手回复"
-                    },
-                    "logo": "@lALPDfJ6V_FPDmvNAfTNAfQ"
-                },
-                "contents": [
-                    {
-                        "type": "markdown",
-                        "text": str(content),
-                        "id": f"text_{uuid.uuid4().hex[:8]}"
-                    }
-                ]
-            }
-            
             payload = {
                 "cardTemplateId": "StandardCard",
                 "robotCode": self.client_id,
-                "cardData": json.dumps(card_data_obj, ensure_ascii=False),
-                "cardBizId": f"biz_{uuid.uuid4().hex[:16]}",
+                "cardData": self.build_card_data(content),
+                "cardBizId": card_biz_id or f"biz_{uuid.uuid4().hex[:16]}",
             }
             
             if conversation_type == "group":
@@ -219,11 +245,77 @@ class DingTalkClientSDK:
                 logger.debug(f"钉钉消息发送成功: {data}")
                 return True
             else:
-                logger.error(f"钉钉消息发送失败 (HTTP {response.status_code}): {data}")
+                get_log_throttle().error("钉钉消息发送失败 (HTTP {}): {}", response.status_code, data)
                 return False
                 
         except Exception as e:
-            logger.error(f"发送钉钉消息异常: {e}")
+            get_log_throttle().error("发送钉钉消息异常: {}", e)
+            return False
+
+    async def batch_send_markdown(self, user_ids: List[str], content: Any) -> Dict[str, Any]:
+        """
+        批量发送单聊 Markdown 消息（robot/oToMessages/batchSend，单次最多 20 人）
+
+        Args:
+            user_ids: 接收者 userId 列表
+            content: Markdown 内容
+
+        Returns:
+            接口返回数据（含 processQueryKey、invalidStaffIdList、flowControlledStaffIdList）
+
+        Raises:
+            Exception: 请求失败
+        """
+        token = await self._get_access_token()
+        url = "https://api.dingtalk.com/v1.0/robot/oToMessages/batchSend"
+        headers = {
+            "x-acs-dingtalk-access-token": token,
+            "Content-Type": "application/json",
+        }
+        payload = {
+            "robotCode": self.client_id,
+            "userIds": user_ids,
+            "msgKey": "sampleMarkdown",
+            "msgParam": json.dumps({"title": "AI 助手回复", "text": str(content)}, ensure_ascii=False),
+        }
+
+        response = await self._http_client.post(url, json=payload, headers=headers)
+        data = response.json()
+        if response.status_code != 200:
+            raise Exception(f"钉钉批量发送失败 (HTTP {response.status_code}): {data}")
+        return data
+
+    async def update_card(self, card_biz_id: str, content: Any) -> bool:
+        """
+        更新已发送的互动卡片内容
+
+        Args:
+            card_biz_id: 发送卡片时使用的业务 ID
+            content: 新的 Markdown 内容
+
+        Returns:
+            是否更新成功
+        """
+        try:
+            token = await self._get_access_token()
+            url = "https://api.dingtalk.com/v1.0/im/robots/interactiveCards"
+            headers = {
+                "x-acs-dingtalk-access-token": token,
+                "Content-Type": "application/json",
+            }
+            payload = {
+                "cardBizId": card_biz_id,
+                "cardData": self.build_card_data(content),
+            }
+
+            response = await self._http_client.put(url, json=payload, headers=headers)
+            if response.status_code == 200:
+                return True
+            get_log_throttle().error("钉钉卡片更新失败 (HTTP {}): {}", response.status_code, response.text[:200])
+            return False
+
+        except Exception as e:
+            get_log_throttle().error("更新钉钉卡片异常: {}", e)
             return False
 
     async def close(self):
@@ -3,10 +3,12 @@
 import sys
 import asyncio
 import json
-from typing import Dict, Any, Callable, Optional, Final
+from typing import Dict, Any, List, Optional, Final, Union
 from loguru import logger
 from chatagentcore.adapters.base import BaseAdapter, Message
+from chatagentcore.adapters.stream import ReplyStream
 from chatagentcore.adapters.feishu.client import FeishuClientSDK, HAS_SDK
+from chatagentcore.adapters.feishu.models import FeishuEventEnvelope
 
 # Python 3.11+ 有整数转换限制，飞书消息可能包含超大数字 ID
 # 设置 sys.set_int_max_str_digits(0) 移除限制
@@ -18,10 +20,16 @@ if hasattr(sys, 'set_int_max_str_digits'):
 MODE_WEBSOCKET: Final = "websocket"
 MODE_WEBHOOK: Final = "webhook"
 
+# 批量发送接口单次最多的接收者数量
+BATCH_SEND_LIMIT: Final = 200
+
 
 class FeishuAdapter(BaseAdapter):
     """飞书适配器 - 支持 WebSocket 长连接模式和 Webhook 回调模式"""
 
+    # 飞书文本消息请求体上限 150KB，按中文 UTF-8 编码和 JSON 转义预留余量
+    max_text_length = 20000
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化飞书适配器
@@ -45,9 +53,6 @@ class FeishuAdapter(BaseAdapter):
             logger.warning(f"无效的连接模式: {self._connection_mode}，使用默认: {MODE_WEBSOCKET}")
             self._connection_mode = MODE_WEBSOCKET
 
-        # 事件处理器
-        self._message_handler: Optional[Callable] = None
-
         # 客户端
         self._client: Optional[FeishuClientSDK] = None
 
@@ -56,6 +61,8 @@ class FeishuAdapter(BaseAdapter):
 
     async def initialize(self) -> None:
         """初始化适配器"""
+        # SDK 在独立线程中回调，入站消息需投递回当前（主）事件循环
+        self._bind_inbound_loop()
         if not HAS_SDK:
             raise ImportError(
                 "lark_oapi SDK 未安装，请运行: pip install lark_oapi"
@@ -95,72 +102,48 @@ class FeishuAdapter(BaseAdapter):
             logger.info("飞书适配器初始化完成")
             logger.info("请配置 Webhook 回调地址: http://your-server:port/webhook/feishu")
 
-    def _handle_ws_message_event(self, payload: str) -> Dict[str, Any]:
+    def _handle_ws_message_event(self, event: FeishuEventEnvelope) -> Dict[str, Any]:
         """
         处理 WebSocket 模式下的消息事件
 
         Args:
-            payload: 事件 JSON 字符串（可能是 bytes）
+            event: 已解析的飞书事件
 
         Returns:
             响应数据
         """
         try:
-            # payload 可能是 bytes 类型，需要解码为字符串
-            if isinstance(payload, bytes):
-                payload = payload.decode('utf-8', errors='ignore')
-
-            event_data = json.loads(payload)
-            asyncio.create_task(self._handle_message_event_async(event_data))
+            self._dispatch_message_event(event)
             return {"msg": "success"}
         except Exception as e:
             logger.error(f"WebSocket 消息事件处理异常: {e}")
             return {"msg": "failed"}
 
-    def _handle_ws_at_message_event(self, payload: str) -> Dict[str, Any]:
+    def _handle_ws_at_message_event(self, event: FeishuEventEnvelope) -> Dict[str, Any]:
         """处理 WebSocket 模式下的群 @ 消息事件"""
         try:
-            # payload 可能是 bytes 类型，需要解码为字符串
-            if isinstance(payload, bytes):
-                payload = payload.decode('utf-8', errors='ignore')
-
-            event_data = json.loads(payload)
-            asyncio.create_task(self._handle_at_message_event_async(event_data))
+            self._dispatch_message_event(event, at=True)
             return {"msg": "success"}
         except Exception as e:
             logger.error(f"WebSocket @ 消息事件处理异常: {e}")
             return {"msg": "failed"}
 
-    def _handle_ws_bot_added_event(self, payload: str) -> Dict[str, Any]:
+    def _handle_ws_bot_added_event(self, event: FeishuEventEnvelope) -> Dict[str, Any]:
         """处理机器人加入群组事件"""
-        try:
-            event_data = json.loads(payload)
-            event = event_data.get("event", {})
-            chat_id = event.get("chat_id", "")
-            logger.info(f"机器人加入群组: {chat_id}")
-            return {"msg": "success"}
-        except Exception as e:
-            logger.error(f"机器人加入事件处理异常: {e}")
-            return {"msg": "failed"}
+        logger.info(f"机器人加入群组: {event.event.chat_id}")
+        return {"msg": "success"}
 
-    def _handle_ws_bot_deleted_event(self, payload: str) -> Dict[str, Any]:
+    def _handle_ws_bot_deleted_event(self, event: FeishuEventEnvelope) -> Dict[str, Any]:
         """处理机器人离开群组事件"""
-        try:
-            event_data = json.loads(payload)
-            event = event_data.get("event", {})
-            chat_id = event.get("chat_id", "")
-            logger.info(f"机器人离开群组: {chat_id}")
-            return {"msg": "success"}
-        except Exception as e:
-            logger.error(f"机器人离开事件处理异常: {e}")
-            return {"msg": "failed"}
+        logger.info(f"机器人离开群组: {event.event.chat_id}")
+        return {"msg": "success"}
 
-    def handle_webhook(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+    def handle_webhook(self, event_data: Union[FeishuEventEnvelope, Dict[str, Any]]) -> Dict[str, Any]:
         """
         处理 Webhook 回调事件（仅 Webhook 模式）
 
         Args:
-            event_data: 飞书推送的事件数据
+            event_data: 飞书推送的事件（已解析的事件或原始 dict）
 
         Returns:
             响应数据
@@ -170,20 +153,15 @@ class FeishuAdapter(BaseAdapter):
             return {"msg": "success"}
 
         try:
-            header = event_data.get("header", {})
-            event = event_data.get("event", "")
-            event_type = header.get("event_type", "")
-            log_id = header.get("log_id", "")
+            if isinstance(event_data, dict):
+                event_data = FeishuEventEnvelope.model_validate(event_data)
+            header = event_data.header
 
-            logger.info(f"Received Webhook event: {event_type} (log_id: {log_id})")
+            logger.info(f"Received Webhook event: {header.event_type} (log_id: {header.event_id})")
 
             # 消息接收事件
-            if event_type in ("im.message.receive_v1", "im.message.group_at_v1"):
-                asyncio.create_task(self._handle_message_event_async(event_data))
-
-            elif event_type == "im.message.group_at_v1":
-                # 群 @ 消息的处理可以扩展
-                asyncio.create_task(self._handle_at_message_event_async(event_data))
+            if header.event_type in ("im.message.receive_v1", "im.message.group_at_v1"):
+                self._dispatch_message_event(event_data)
 
             return {"msg": "success"}
 
@@ -191,137 +169,56 @@ class FeishuAdapter(BaseAdapter):
             logger.error(f"处理 Webhook 事件异常: {e}")
             return {"code": 1, "msg": str(e)}
 
-    async def _handle_message_event_async(self, event_data: Dict[str, Any]) -> None:
+    def _dispatch_message_event(self, event: FeishuEventEnvelope, at: bool = False) -> None:
         """
-        异步处理消息事件
+        解析消息事件并投递给入站处理（可在 SDK 线程中调用）
 
         Args:
-            event_data: 事件数据
+            event: 已解析的飞书事件
+            at: 是否为群 @ 消息事件
         """
         try:
-            message = await self._parse_message_from_event(event_data)
-
-            logger.info(f"处理飞书消息: {message.sender['id']} -> {message.content['text'][:50]}")
-
-            # 调用消息处理器
-            if self._message_handler:
-                if asyncio.iscoroutinefunction(self._message_handler):
-                    await self._message_handler(message)
-                else:
-                    self._message_handler(message)
+            message = self._parse_message_from_event(event)
+            if at:
+                message.content["text"] = f"[群 @] {message.content.get('text', '')}"
+                logger.info(f"处理飞书群 @ 消息: {message.sender['id']}")
             else:
-                logger.debug(f"收到消息但未设置处理器: {message.content['text'][:50]}")
-
+                logger.info(f"处理飞书消息: {message.sender['id']} -> {message.content['text'][:50]}")
+            self.emit_inbound(message)
         except Exception as e:
             logger.error(f"处理消息事件异常: {e}")
 
-    async def _handle_at_message_event_async(self, event_data: Dict[str, Any]) -> None:
-        """处理群 @ 消息事件"""
-        try:
-            message = await self._parse_message_from_event(event_data)
-            logger.info(f"处理飞书群 @ 消息: {message.sender['id']}")
-
-            # @ 消息也可以通过消息处理器处理
-            if self._message_handler:
-                content = message.content
-                content["text"] = f"[群 @] {content.get('text', '')}"
-                if asyncio.iscoroutinefunction(self._message_handler):
-                    await self._message_handler(message)
-                else:
-                    self._message_handler(message)
-
-        except Exception as e:
-            logger.error(f"处理 @ 消息事件异常: {e}")
-
-    async def _parse_message_from_event(self, event_data: Dict[str, Any]) -> Message:
+    def _parse_message_from_event(self, event: FeishuEventEnvelope) -> Message:
         """
-        从事件数据中解析消息
+        从事件中解析消息
 
         Args:
-            event_data: 飞书事件数据
+            event: 已解析的飞书事件
 
         Returns:
             标准化的 Message 对象
         """
-        header = event_data.get("header", {})
-        event = event_data.get("event", {})
-
-        # 飞书事件结构: event.data.message.message_id / chat_id / message_type / content
-        # 或者 event.message.* (取决于事件类型)
-        # 先尝试从 event.message 获取（WebSocket 模式）
-        message_obj = event.get("message", {})
-        if not message_obj:
-            # 尝试从 event.data.message 获取（Webhook 模式）
-            data = event.get("data", {})
-            if data:
-                message_obj = data.get("message", {})
-
-        # 如果还是没有消息数据，尝试直接从 event 获取（部分事件）
-        if not message_obj:
-            message_obj = event
-
-        # 提取消息数据
-        message_id = message_obj.get("message_id", "")
-        chat_id = message_obj.get("chat_id", "")
-        # 支持两种字段名: message_type 和 msg_type
-        message_type = message_obj.get("message_type") or message_obj.get("msg_type", "")
-
-        # 解析发送者信息 - 事件结构中 sender 可能在 event.sender 或 event.data.sender
-        sender_info = event.get("sender")
-        if not sender_info:
-            # 尝试从 data 获取
-            data = event.get("data", {})
-            sender_info = data.get("sender")
-
-        sender = sender_info or {}
-        sender_id = ""
-        if "sender_id" in sender:
-            sender_id_obj = sender.get("sender_id", {})
-            sender_id = sender_id_obj.get("open_id", "")
-        elif "open_id" in sender:
-            sender_id = sender.get("open_id", "")
-        elif "sender_type" in sender:
-            # 备用方案：从 sender 对象中查找 ID
-            sender_id = str(sender.get("user_id", "")) or str(sender.get("open_id", ""))
-
-        sender_type = sender.get("sender_type", "user")
-
-        # 解析消息内容 - 从 message 对象获取
-        content_raw = message_obj.get("content", "")
-        content_data = {}
-        text_content = ""
-
-        # content 可能是字符串形式的 JSON，或者是已解析的 dict
-        if content_raw:
-            if isinstance(content_raw, str):
-                try:
-                    content_data = json.loads(content_raw) if content_raw else {}
-                except json.JSONDecodeError:
-                    content_data = {"text": content_raw}
-            elif isinstance(content_raw, dict):
-                content_data = content_raw
-        else:
-            content_data = {"text": ""}
-
-        logger.debug(f"Content data: {str(content_data)[:200]}")
-
-        # 根据 message_type 处理内容
+        message_obj = event.event.get_message()
+        sender = event.event.get_sender()
+        sender_id = sender.id
+        sender_type = sender.sender_type
+        message_type = message_obj.type
+        chat_id = message_obj.chat_id
+
+        # content 是字符串形式的 JSON：文本消息需要立即解码取文本，其他类型延迟到访问 data 时解码
         if message_type == "text":
-            if content_data and isinstance(content_data, dict):
-                text_content = content_data.get("text", "")
-            elif content_raw:
-                text_content = str(content_data)
+            text_content = message_obj.content_data.get("text", "")
         elif message_type == "interactive":
             text_content = "[卡片消息]"
         elif message_type == "post":
             text_content = "[富文本消息]"
         else:
             if not message_type:
-                logger.warning(f"message_type 为空，content: {str(content_data)[:200]}")
+                logger.warning(f"message_type 为空，content: {str(message_obj.content)[:200]}")
             text_content = f"[{message_type} 消息]"
 
         # 判断会话类型
-        chat_type = message_obj.get("chat_type", "user") or ("group" if chat_id and chat_id.startswith("oc_") else "user")
+        chat_type = message_obj.chat_type or ("group" if chat_id and chat_id.startswith("oc_") else "user")
 
         # 归一化会话 ID：私聊使用 open_id，群聊使用 chat_id
         final_conv_id = chat_id
@@ -330,7 +227,7 @@ class FeishuAdapter(BaseAdapter):
 
         return Message(
             platform="feishu",
-            message_id=message_id,
+            message_id=message_obj.message_id,
             sender={
                 "id": sender_id,
                 "name": sender_type,
@@ -343,10 +240,10 @@ class FeishuAdapter(BaseAdapter):
             content={
                 "type": message_type,
                 "text": text_content,
-                "data": content_data if content_data else {},
             },
             # timestamp 优先使用 message.create_time，再使用 header.create_time
-            timestamp=(int(message_obj.get("create_time", 0) or header.get("create_time", 0)) * 1000),
+            timestamp=(int(message_obj.create_time or event.header.create_time or 0) * 1000),
+            raw=lambda: message_obj.content_data,
         )
 
     async def shutdown(self) -> None:
@@ -364,15 +261,6 @@ class FeishuAdapter(BaseAdapter):
 
         logger.info("飞书适配器已关闭")
 
-    def set_message_handler(self, handler: Callable[[Message], None]):
-        """
-        设置消息处理器
-
-        Args:
-            handler: 消息处理函数，接收 Message 对象
-        """
-        self._message_handler = handler
-
     @property
     def connection_mode(self) -> str:
         """获取当前连接模式"""
@@ -383,6 +271,83 @@ class FeishuAdapter(BaseAdapter):
         """WebSocket 是否已连接（仅 WebSocket 模式）"""
         return self._connection_mode == MODE_WEBSOCKET and self._ws_started and self._client.is_ws_started if self._client else False
 
+    async def send_batch(
+        self,
+        recipients: List[str],
+        message_type: str,
+        content: str,
+        conversation_type: str = "user",
+        concurrency: int = 10,
+    ) -> Dict[str, str]:
+        """
+        批量发送消息：单聊使用 message/v4/batch_send 接口，每 200 人一批；群聊逐个发送
+
+        Args:
+            recipients: 接收者 open_id 列表
+            message_type: 消息类型
+            content: 消息内容
+            conversation_type: 会话类型
+            concurrency: 最大并发批次数
+
+        Returns:
+            发送结果 {接收者ID: 批量消息 ID 或 "Error: ..."}
+        """
+        if conversation_type != "user":
+            return await super().send_batch(recipients, message_type, content, conversation_type, concurrency)
+        if self._client is None:
+            raise RuntimeError("客户端未初始化，请先调用 initialize()")
+
+        msg_type, payload = "text", {"text": content}
+        if message_type == "card":
+            try:
+                msg_type, payload = "interactive", json.loads(content)
+            except json.JSONDecodeError:
+                pass
+
+        semaphore = asyncio.Semaphore(concurrency)
+        results: Dict[str, str] = {}
+
+        async def send_chunk(open_ids: List[str]) -> None:
+            async with semaphore:
+                message_id, invalid = await self._client.batch_send_message(open_ids, msg_type, payload)
+            for open_id in open_ids:
+                results[open_id] = message_id if message_id is not None else "Error: 批量发送失败"
+            for open_id in invalid:
+                results[open_id] = "Error: invalid open_id"
+
+        await asyncio.gather(*(
+            send_chunk(recipients[i:i + BATCH_SEND_LIMIT])
+            for i in range(0, len(recipients), BATCH_SEND_LIMIT)
+        ))
+        return results
+
+    def open_stream(
+        self, to: str, conversation_type: str = "user", min_interval: float = 1.0
+    ) -> ReplyStream:
+        """
+        打开流式回复（发送卡片后持续更新卡片内容）
+
+        Args:
+            to: 接收者 ID
+            conversation_type: 会话类型
+            min_interval: 两次进度更新之间的最小间隔（秒）
+
+        Returns:
+            流式回复对象
+        """
+        return FeishuReplyStream(self, to, conversation_type, min_interval)
+
+    @staticmethod
+    def _is_card_json(content: str) -> bool:
+        """卡片内容是否为合法的 JSON 对象（不合法时降级为文本发送）"""
+        if not content.lstrip().startswith("{"):
+            return False
+        try:
+            json.loads(content)
+        except ValueError:
+            return False
+        return True
+
     async def send_message(
         self, to: str, message_type: str, content: str, conversation_type: str = "user"
     ) -> str:
@@ -407,31 +372,57 @@ class FeishuAdapter(BaseAdapter):
         # 根据 conversation_type 设置 receive_id_type
         receive_id_type = "open_id" if conversation_type == "user" else "chat_id"
 
-        if message_type == "text":
-            result = await self._client.send_text_message(to, content, receive_id_type)
-            if result:
-                return to  # 飞书 API 返回的消息 ID 在响应中
-            raise Exception("消息发送失败")
+        if message_type == "card" and self._is_card_json(content):
+            # 卡片 JSON（如模板渲染结果）校验后原样透传，不重新序列化
+            message_id = await self._client.send_message_with_id(
+                to, "interactive", content, receive_id_type
+            )
+            if message_id is not None:
+                return message_id
+            raise Exception("卡片消息发送失败")
 
-        elif message_type == "card":
-            try:
-                card_data = json.loads(content)
-                result = await self._client.send_card_message(to, card_data, receive_id_type)
-                if result:
-                    return to
+        # 文本消息，其他类型暂时当作文本发送
+        message_id = await self._client.send_message_with_id(
+            to, "text", {"text": content}, receive_id_type
+        )
+        if message_id is not None:
+            return message_id
+        raise Exception("消息发送失败")
+
+
+class FeishuReplyStream(ReplyStream):
+    """飞书流式回复 - 首次更新时发送 Markdown 卡片，之后通过 PATCH 更新卡片内容"""
+
+    @staticmethod
+    def _build_card(text: str, finished: bool) -> Dict[str, Any]:
+        """构造可更新的 Markdown 卡片"""
+        return {
+            "config": {"wide_screen_mode": True, "update_multi": True},
+            "elements": [{"tag": "markdown", "content": text if finished else text + " ▌"}],
+        }
+
+    async def _render(self, text: str, finished: bool) -> None:
+        adapter: FeishuAdapter = self.adapter
+        if adapter._client is None:
+            raise RuntimeError("客户端未初始化，请先调用 initialize()")
+
+        card = self._build_card(text, finished)
+        if self.message_id is None:
+            receive_id_type = "open_id" if self.conversation_type == "user" else "chat_id"
+            self.message_id = await adapter._client.send_message_with_id(
+                self.to, "interactive", card, receive_id_type
+            )
+            if self.message_id is None:
                 raise Exception("卡片消息发送失败")
-            except json.JSONDecodeError:
-                # 如果不是 JSON，当作文本发送
-                result = await self._client.send_text_message(to, content, receive_id_type)
-                if result:
-                    return to
-                raise Exception("消息发送失败")
-        else:
-            # 其他类型暂时当作文本发送
-            result = await self._client.send_text_message(to, content, receive_id_type)
-            if result:
-                return to
-            raise Exception("消息发送失败")
+        elif not await adapter._client.update_card_message(self.message_id, card):
+            raise Exception("卡片消息更新失败")
+
+    async def _update(self, text: str) -> None:
+        await self._render(text, finished=False)
+
+    async def _finalize(self, text: str) -> str:
+        await self._render(text, finished=True)
+        return self.message_id
 
 
-__all__ = ["FeishuAdapter", "MODE_WEBSOCKET", "MODE_WEBHOOK"]
+__all__ = ["FeishuAdapter", "FeishuReplyStream", "MODE_WEBSOCKET", "MODE_WEBHOOK"]
@@ -8,8 +8,11 @@ import asyncio
 import time
 import httpx
 import threading
-from typing import Optional, Dict, Any, Callable, Awaitable
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Tuple, Union
 from loguru import logger
+from pydantic import ValidationError
+from chatagentcore.adapters.feishu.models import FeishuEventEnvelope, parse_event
+from chatagentcore.storage.logger import get_log_throttle
 
 # 优先导入 WS 客户端（长连接）
 try:
@@ -83,7 +86,7 @@ def _run_ws_in_new_thread(ws_client: WSClient):
         # 注意：WSClient.start() 是阻塞的，会一直保持连接
         ws_client.start()
     except Exception as e:
-        logger.error(f"WebSocket 客户端运行异常: {e}")
+        get_log_throttle().error("WebSocket 客户端运行异常: {}", e)
     finally:
         # 清理事件循环
         try:
@@ -100,7 +103,7 @@ class FeishuClientSDK:
         self,
         app_id: str,
         app_secret: str,
-        event_handlers: Optional[Dict[str, Callable[[str], Any]]] = None,
+        event_handlers: Optional[Dict[str, Callable[[FeishuEventEnvelope], Any]]] = None,
         domain: str = "feishu",
     ):
         """
@@ -109,7 +112,7 @@ class FeishuClientSDK:
         Args:
             app_id: 飞书应用 ID
             app_secret: 飞书应用密钥
-            event_handlers: 事件处理器字典，key 为事件类型，value 为处理函数（接收 JSON 字符串）
+            event_handlers: 事件处理器字典，key 为事件类型，value 为处理函数（接收已解析的 FeishuEventEnvelope）
             domain: 域名，feishu 或 lark
         """
         if not HAS_SDK:
@@ -158,34 +161,25 @@ class FeishuClientSDK:
             logger.warning("未设置事件处理器，长连接将无法处理消息")
             return None
 
-        # 创建内部事件分发器
+        # 创建内部事件分发器：payload 只解码一次，处理器直接收到类型化的事件
         class InternalEventDispatcher:
-            def __init__(self, handlers: Dict[str, Callable[[str], Any]]):
+            def __init__(self, handlers: Dict[str, Callable[[FeishuEventEnvelope], Any]]):
                 self.handlers = handlers
 
-            def do_without_validation(self, payload: str) -> Optional[Dict[str, Any]]:
+            def do_without_validation(self, payload: Union[str, bytes]) -> Optional[Dict[str, Any]]:
                 """处理事件（不验证）"""
                 try:
-                    # payload 可能是 bytes 类型，需要解码为字符串
-                    if isinstance(payload, bytes):
-                        payload = payload.decode('utf-8', errors='ignore')
+                    event = parse_event(payload)
+                    event_type = event.header.event_type
 
-                    # 解析 JSON 获取事件类型
-                    event_data = json.loads(payload)
-                    event_type = event_data.get("header", {}).get("event_type")
-
-                    # 查找对应的处理器
+                    # 查找对应的处理器，静默忽略未注册的事件类型（如 message_read_v1 等）
                     handler = self.handlers.get(event_type)
                     if handler:
-                        logger.debug(f"收到事件: {event_type}, payload: {payload[:200]}...")
-                        result = handler(payload)
-                        # 返回成功响应
-                        return {"msg": "success"}
-                    else:
-                        # 静默忽略未注册的事件类型（如 message_read_v1 等）
-                        return {"msg": "success"}
-
-                except json.JSONDecodeError as e:
+                        logger.debug(f"收到事件: {event_type}")
+                        handler(event)
+                    return {"msg": "success"}
+
+                except ValidationError as e:
                     logger.error(f"事件 JSON 解析失败: {e}")
                 except Exception as e:
                     logger.error(f"事件处理异常: {e}")
@@ -325,6 +319,30 @@ class FeishuClientSDK:
         Returns:
             是否发送成功
         """
+        message_id = await self.send_message_with_id(
+            receive_id, message_type, content, receive_id_type
+        )
+        return message_id is not None
+
+    async def send_message_with_id(
+        self,
+        receive_id: str,
+        message_type: str,
+        content: Any,
+        receive_id_type: str = "open_id"
+    ) -> Optional[str]:
+        """
+        发送消息并返回飞书消息 ID
+
+        Args:
+            receive_id: 接收者 ID
+            message_type: 消息类型 (text / interactive / post / card 等)
+            content: 消息内容（interactive 类型可直接传入卡片 JSON 字符串）
+            receive_id_type: ID 类型
+
+        Returns:
+            飞书返回的 message_id，发送失败返回 None
+        """
         try:
             # 获取访问令牌
             access_token = await self._get_access_token()
@@ -332,6 +350,9 @@ class FeishuClientSDK:
             # 内容序列化
             if isinstance(content, (dict, list)):
                 content_json = json.dumps(content, ensure_ascii=False)
+            elif message_type == "interactive":
+                # 已序列化的卡片 JSON 原样发送，避免解析后再序列化
+                content_json = content
             else:
                 content_json = json.dumps({"text": str(content)}, ensure_ascii=False)
 
@@ -357,14 +378,14 @@ class FeishuClientSDK:
             if data.get("code") == 0:
                 message_id = data.get("data", {}).get("message_id", "")
                 logger.debug(f"消息发送成功: msg_id={message_id}")
-                return True
+                return message_id
             else:
                 logger.debug(f"消息发送失败: code={data.get('code')}, msg={data.get('msg')}")
-                return False
+                return None
 
         except Exception as e:
-            logger.error(f"发送消息异常: {e}")
-            return False
+            get_log_throttle().error("发送消息异常: {}", e)
+            return None
 
     async def send_text_message(
         self,
@@ -414,6 +435,89 @@ class FeishuClientSDK:
             receive_id_type=receive_id_type,
         )
 
+    async def batch_send_message(
+        self,
+        open_ids: List[str],
+        message_type: str,
+        content: Dict[str, Any],
+    ) -> Tuple[Optional[str], List[str]]:
+        """
+        批量发送消息（message/v4/batch_send，单次最多 200 个用户）
+
+        Args:
+            open_ids: 接收者 open_id 列表
+            message_type: 消息类型 (text / interactive 等)
+            content: 消息内容；interactive 类型为卡片内容，其他类型为 content 字段
+
+        Returns:
+            (批量消息 ID, 无效的 open_id 列表)，请求失败时批量消息 ID 为 None
+        """
+        try:
+            access_token = await self._get_access_token()
+
+            url = "https://open.feishu.cn/open-apis/message/v4/batch_send/"
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/json",
+            }
+            payload: Dict[str, Any] = {"open_ids": open_ids, "msg_type": message_type}
+            if message_type == "interactive":
+                payload["card"] = content
+            else:
+                payload["content"] = content
+
+            if not self._http_client:
+                self._http_client = httpx.AsyncClient(timeout=30.0)
+
+            response = await self._http_client.post(url, json=payload, headers=headers)
+            data = response.json()
+
+            if data.get("code") == 0:
+                result = data.get("data", {})
+                return result.get("message_id", ""), result.get("invalid_open_ids", []) or []
+            get_log_throttle().error("批量发送失败: code={}, msg={}", data.get("code"), data.get("msg"))
+            return None, []
+
+        except Exception as e:
+            get_log_throttle().error("批量发送异常: {}", e)
+            return None, []
+
+    async def update_card_message(self, message_id: str, card: Dict[str, Any]) -> bool:
+        """
+        更新已发送的卡片消息（卡片需开启 config.update_multi）
+
+        Args:
+            message_id: 飞书消息 ID
+            card: 新的卡片内容
+
+        Returns:
+            是否更新成功
+        """
+        try:
+            access_token = await self._get_access_token()
+
+            url = f"https://open.feishu.cn/open-apis/im/v1/messages/{message_id}"
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/json",
+            }
+            payload = {"content": json.dumps(card, ensure_ascii=False)}
+
+            if not self._http_client:
+                self._http_client = httpx.AsyncClient(timeout=30.0)
+
+            response = await self._http_client.patch(url, json=payload, headers=headers)
+            data = response.json()
+
+            if data.get("code") == 0:
+                return True
+            logger.debug(f"卡片更新失败: code={data.get('code')}, msg={data.get('msg')}")
+            return False
+
+        except Exception as e:
+            get_log_throttle().error("更新卡片异常: {}", e)
+            return False
+
     @property
     def is_ws_started(self) -> bool:
         """WebSocket 是否已启动"""
@@ -1,24 +1,124 @@
 """Feishu platform models"""
 
-from typing import Any, Dict, Optional
+import json
+from functools import cached_property
+from typing import Any, Dict, Optional, Union
 from pydantic import BaseModel, Field
 
 
 class FeishuEventHeader(BaseModel):
     """飞书事件头"""
 
-    event_type: str = Field(..., description="事件类型")
-    event_id: str = Field(..., description="事件 ID")
-    app_id: str = Field(..., description="应用 ID")
-    create_time: str = Field(..., description="创建时间")
-    token: str = Field(..., description="验证令牌")
+    event_type: str = Field("", description="事件类型")
+    event_id: str = Field("", description="事件 ID")
+    app_id: str = Field("", description="应用 ID")
+    create_time: Union[str, int] = Field("", description="创建时间")
+    token: str = Field("", description="验证令牌")
 
 
 class FeishuEventSender(BaseModel):
     """飞书事件发送者"""
 
-    sender_id: Dict[str, str] = Field(default_factory=dict, description="发送者 ID")
+    sender_id: Dict[str, Optional[str]] = Field(default_factory=dict, description="发送者 ID")
     sender_type: str = Field("user", description="发送者类型: user | app")
+    open_id: str = Field("", description="发送者 open_id（部分事件直接携带）")
+    user_id: str = Field("", description="发送者 user_id（部分事件直接携带）")
+
+    @property
+    def id(self) -> str:
+        """发送者 ID（优先 sender_id.open_id）"""
+        if self.sender_id:
+            return self.sender_id.get("open_id") or ""
+        return self.open_id or self.user_id
+
+
+class FeishuEventMessage(BaseModel):
+    """飞书消息事件中的消息体
+
+    content 保留为原始 JSON 字符串，首次访问 content_data 时才解码。
+    """
+
+    message_id: str = Field("", description="消息 ID")
+    chat_id: str = Field("", description="会话 ID")
+    chat_type: str = Field("user", description="聊天类型: p2p | group")
+    message_type: str = Field("", description="消息类型")
+    msg_type: str = Field("", description="消息类型（旧字段名）")
+    content: Union[str, Dict[str, Any]] = Field("", description="消息内容（JSON 字符串）")
+    create_time: Union[str, int] = Field(0, description="创建时间")
+
+    @property
+    def type(self) -> str:
+        """消息类型（兼容 message_type / msg_type 两种字段名）"""
+        return self.message_type or self.msg_type
+
+    @cached_property
+    def content_data(self) -> Dict[str, Any]:
+        """解码后的消息内容（首次访问时解码，之后复用）"""
+        content = self.content
+        if isinstance(content, dict):
+            return content
+        if not content:
+            return {"text": ""}
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            return {"text": content}
+        return data if isinstance(data, dict) else {"text": content}
+
+
+class FeishuEventData(BaseModel):
+    """飞书事件中的 data 包装（部分 Webhook 事件）"""
+
+    message: Optional[FeishuEventMessage] = None
+    sender: Optional[FeishuEventSender] = None
+
+
+class FeishuEventBody(FeishuEventMessage):
+    """飞书事件体
+
+    消息通常位于 event.message，部分 Webhook 事件位于 event.data.message，
+    少数事件直接把消息字段放在 event 上（因此继承 FeishuEventMessage）。
+    """
+
+    message: Optional[FeishuEventMessage] = None
+    sender: Optional[FeishuEventSender] = None
+    data: Optional[FeishuEventData] = None
+
+    def get_message(self) -> FeishuEventMessage:
+        """定位消息体"""
+        if self.message is not None:
+            return self.message
+        if self.data is not None and self.data.message is not None:
+            return self.data.message
+        return self
+
+    def get_sender(self) -> FeishuEventSender:
+        """定位发送者"""
+        if self.sender is not None:
+            return self.sender
+        if self.data is not None and self.data.sender is not None:
+            return self.data.sender
+        return FeishuEventSender()
+
+
+class FeishuEventEnvelope(BaseModel):
+    """飞书事件（WebSocket 与 Webhook 推送的完整结构，未声明的字段被忽略）"""
+
+    header: FeishuEventHeader = Field(default_factory=FeishuEventHeader)
+    event: FeishuEventBody = Field(default_factory=FeishuEventBody)
+
+
+def parse_event(payload: Union[str, bytes]) -> FeishuEventEnvelope:
+    """
+    一次解码把事件 JSON 解析为类型化结构（直接从 bytes 解析，不经过 dict）
+
+    Args:
+        payload: 事件 JSON
+
+    Returns:
+        飞书事件
+    """
+    return FeishuEventEnvelope.model_validate_json(payload)
 
 
 class FeishuMessage(BaseModel):
@@ -94,6 +194,11 @@ MESSAGE_CONTENT_MODELS = {
 __all__ = [
     "FeishuEventHeader",
     "FeishuEventSender",
+    "FeishuEventMessage",
+    "FeishuEventData",
+    "FeishuEventBody",
+    "FeishuEventEnvelope",
+    "parse_event",
     "FeishuMessage",
     "FeishuEvent",
     "FeishuReceiveMessageEvent",
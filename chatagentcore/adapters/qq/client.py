@@ -5,7 +5,7 @@ import threading
 import json
 import uuid
 import time
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Dict, Optional
 from loguru import logger
 
 try:
@@ -18,14 +18,14 @@ except ImportError:
     logger.warning("botpy not installed, run: pip install qq-botpy")
 
 from chatagentcore.adapters.base import BaseAdapter, Message
+from chatagentcore.storage.logger import get_log_throttle
 
 
 class QQBotClient(botpy.Client):
     """Custom BotPy Client to handle events"""
     
-    def __init__(self, intents: "botpy.Intents", message_handler: Optional[Callable[[Message], None]], adapter: "QQAdapter"):
+    def __init__(self, intents: "botpy.Intents", adapter: "QQAdapter"):
         super().__init__(intents=intents)
-        self.message_handler = message_handler
         self.adapter = adapter
         self.robot_info = None
 
@@ -78,6 +78,7 @@ class QQBotClient(botpy.Client):
             msg_id = getattr(message, "id", "")
             if msg_id and conversation_id and self.adapter:
                 self.adapter._last_msg_ids[conversation_id] = msg_id
+                self.adapter._msg_seqs.pop(conversation_id, None)
 
             msg_obj = Message(
                 platform="qq",
@@ -88,10 +89,8 @@ class QQBotClient(botpy.Client):
                 timestamp=int(time.time()) # Timestamp is often not readily available in simple format
             )
             
-            if self.message_handler:
-                self.message_handler(msg_obj)
-            else:
-                logger.warning("No message handler set for QQ adapter")
+            # botpy 运行在独立线程的事件循环中，交由主循环处理
+            self.adapter.emit_inbound(msg_obj)
                 
         except Exception as e:
             logger.error(f"Error handling QQ message: {e}")
@@ -116,7 +115,7 @@ def _run_bot_in_thread(client: QQBotClient, appid: str, secret: str):
         # We use run() which is blocking and handles the loop
         client.run(appid=appid, secret=secret)
     except Exception as e:
-        logger.error(f"QQ Bot crashed: {e}")
+        get_log_throttle().error("QQ Bot crashed: {}", e)
     finally:
         try:
             loop.close()
@@ -127,17 +126,24 @@ def _run_bot_in_thread(client: QQBotClient, appid: str, secret: str):
 class QQAdapter(BaseAdapter):
     """QQ Platform Adapter"""
 
+    # Max length of a single text message
+    max_text_length = 2000
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.app_id = config.get("app_id")
         self.token = config.get("token") # This is AppSecret
         self.client: Optional[QQBotClient] = None
         self._thread: Optional[threading.Thread] = None
-        self._message_handler: Optional[Callable[[Message], None]] = None
         # Cache for last message IDs to support passive replies
         self._last_msg_ids: Dict[str, str] = {}
+        # Last msg_seq used per conversation; multiple passive replies to the
+        # same msg_id must carry increasing msg_seq or QQ drops them as duplicates
+        self._msg_seqs: Dict[str, int] = {}
 
     async def initialize(self) -> None:
+        # SDK 在独立线程中回调，入站消息需投递回当前（主）事件循环
+        self._bind_inbound_loop()
         if not HAS_BOTPY:
             raise ImportError("qq-botpy is not installed")
         
@@ -151,11 +157,7 @@ class QQAdapter(BaseAdapter):
         # Enable public messages (group/c2c) and guild messages
         intents = botpy.Intents(public_messages=True, public_guild_messages=True)
         
-        self.client = QQBotClient(
-            intents=intents, 
-            message_handler=self._message_handler,
-            adapter=self
-        )
+        self.client = QQBotClient(intents=intents, adapter=self)
         
         # Run in thread
         self._thread = threading.Thread(
@@ -189,11 +191,6 @@ class QQAdapter(BaseAdapter):
                 
         logger.info("QQ Adapter shutdown")
 
-    def set_message_handler(self, handler: Callable[[Message], None]):
-        self._message_handler = handler
-        if self.client:
-            self.client.message_handler = handler
-
     async def send_message(
         self, to: str, message_type: str, content: str, conversation_type: str = "user"
     ) -> str:
@@ -208,6 +205,8 @@ class QQAdapter(BaseAdapter):
         try:
             # Use the last received message_id as msg_id for passive reply
             msg_id_to_reply = self._last_msg_ids.get(to, "0")
+            msg_seq = self._msg_seqs.get(to, 0) + 1
+            self._msg_seqs[to] = msg_seq
             
             # The actual API call that MUST run on the client's loop
             async def _do_send():
@@ -218,6 +217,7 @@ class QQAdapter(BaseAdapter):
                             group_openid=to,
                             msg_type=0, 
                             msg_id=msg_id_to_reply, 
+                            msg_seq=msg_seq,
                             content=content
                         )
                     elif conversation_type == "user":
@@ -225,6 +225,7 @@ class QQAdapter(BaseAdapter):
                             openid=to,
                             msg_type=0,
                             msg_id=msg_id_to_reply, 
+                            msg_seq=msg_seq,
                             content=content
                         )
                     elif conversation_type == "guild":
@@ -234,7 +235,7 @@ class QQAdapter(BaseAdapter):
                         )
                     
                     # Log response for debugging
-                    logger.info(f"QQ API Response ({conversation_type}, reply_to={msg_id_to_reply}): {res}")
+                    logger.info(f"QQ API Response ({conversation_type}, reply_to={msg_id_to_reply}, seq={msg_seq}): {res}")
                     
                     if res is None:
                         return ""
@@ -256,5 +257,5 @@ class QQAdapter(BaseAdapter):
             return await asyncio.wrap_future(future)
             
         except Exception as e:
-            logger.error(f"Failed to send QQ message: {e}")
+            get_log_throttle().error("Failed to send QQ message: {}", e)
             raise e
@@ -0,0 +1,160 @@
+"""Streaming reply with throttled incremental delivery"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, List, Optional
+from loguru import logger
+from chatagentcore.core.chunker import split_text
+
+if TYPE_CHECKING:
+    from chatagentcore.adapters.base import BaseAdapter
+
+
+class ReplyStream:
+    """流式回复基类
+
+    调用方不断 append 增量文本，最后调用 finish。
+    中间进度按 min_interval 节流后交给 _update 渲染（同一时刻最多一次平台调用），
+    结束时由 _finalize 发送最终内容，避免逐 token 调用平台 API。
+
+    子类实现 _update（可选）和 _finalize。
+    """
+
+    def __init__(self, adapter: "BaseAdapter", to: str, conversation_type: str = "user", min_interval: float = 1.0):
+        """
+        初始化流式回复
+
+        Args:
+            adapter: 平台适配器
+            to: 接收者 ID
+            conversation_type: 会话类型
+            min_interval: 两次进度更新之间的最小间隔（秒）
+        """
+        self.adapter = adapter
+        self.to = to
+        self.conversation_type = conversation_type
+        self.min_interval = min_interval
+        self.text = ""
+        self.message_id: Optional[str] = None
+        self.updates = 0
+        self.finished = False
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._last_update = 0.0
+
+    async def append(self, delta: str) -> None:
+        """
+        追加增量文本
+
+        Args:
+            delta: 新增的文本
+        """
+        if self.finished:
+            raise RuntimeError("Stream already finished")
+        if not delta:
+            return
+        self.text += delta
+        if self._timer is None:
+            delay = max(0.0, self._last_update + self.min_interval - time.monotonic())
+            self._timer = asyncio.create_task(self._update_later(delay))
+
+    async def _update_later(self, delay: float) -> None:
+        """等待节流间隔后渲染最新进度"""
+        await asyncio.sleep(delay)
+        async with self._lock:
+            # 渲染期间到达的增量由下一次定时更新处理
+            self._timer = None
+            if self.finished:
+                return
+            self._last_update = time.monotonic()
+            try:
+                await self._update(self.text)
+                self.updates += 1
+            except Exception as e:
+                # 进度更新失败不影响最终发送
+                logger.warning(f"Stream update to {self.to} failed: {e}")
+
+    async def finish(self) -> str:
+        """
+        结束流式回复并发送最终内容
+
+        Returns:
+            消息 ID
+
+        Raises:
+            Exception: 最终内容发送失败
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            self.finished = True
+            self.message_id = await self._finalize(self.text)
+        return self.message_id
+
+    async def abort(self) -> None:
+        """放弃流式回复（不再发送后续内容）"""
+        self.finished = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def _update(self, text: str) -> None:
+        """
+        渲染中间进度（默认不渲染）
+
+        Args:
+            text: 截至目前的完整文本
+        """
+
+    async def _finalize(self, text: str) -> str:
+        """
+        发送最终内容
+
+        Args:
+            text: 完整文本
+
+        Returns:
+            消息 ID
+        """
+        raise NotImplementedError
+
+
+class ChunkedReplyStream(ReplyStream):
+    """分段发送的流式回复 - 用于不支持更新已发消息的平台
+
+    每次进度更新把已完整的段落作为独立消息发出，结束时发送剩余内容；
+    超过平台长度限制的段落按 max_text_length 切分。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sent = 0
+        self._message_ids: List[str] = []
+
+    async def _send(self, text: str) -> None:
+        limit = self.adapter.max_text_length or 0
+        for chunk in split_text(text, limit):
+            if chunk.strip():
+                self._message_ids.append(
+                    await self.adapter.send_message(self.to, "text", chunk, self.conversation_type)
+                )
+
+    async def _update(self, text: str) -> None:
+        boundary = text.rfind("\n\n", self._sent)
+        if boundary < 0:
+            return
+        segment = text[self._sent:boundary]
+        await self._send(segment)
+        # 发送成功后才推进已发送位置，失败的段落由下一次更新或 _finalize 重发
+        self._sent = boundary + 2
+
+    async def _finalize(self, text: str) -> str:
+        await self._send(text[self._sent:])
+        self._sent = len(text)
+        if not self._message_ids:
+            raise ValueError("Stream finished without content")
+        return self._message_ids[0]
+
+
+__all__ = ["ReplyStream", "ChunkedReplyStream"]
@@ -10,6 +10,7 @@ from typing import Optional, Dict, Any
 
 import httpx
 from loguru import logger
+from chatagentcore.storage.logger import get_log_throttle
 
 from ..models.message import BaseInfo
 from ..constants import (
@@ -193,18 +194,19 @@ class WeixinHTTPClient:
         # 构建请求 Headers
         headers = self._build_headers()
 
-        # 序列化请求体
-        body_str = ""
-        if data is not None:
-            # 添加 channel_version
-            if "base_info" not in data:
-                data["base_info"] = {"channel_version": CHANNEL_VERSION}
-            body_str = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        # 添加 channel_version
+        if data is not None and "base_info" not in data:
+            data["base_info"] = {"channel_version": CHANNEL_VERSION}
 
-        logger.debug(f"[{label}] HTTP {method} {url}")
-        logger.debug(f"[{label}] Token: {self._redact_token()}")
-        if body_str:
-            logger.debug(f"[{label}] Body: {self._redact_body(body_str)}")
+        # 调试日志延迟格式化：未开启 DEBUG 时不序列化请求体、不做脱敏
+        logger.opt(lazy=True).debug(
+            "[{}] HTTP {} {} | Token: {} | Body: {}",
+            lambda: label,
+            lambda: method,
+            lambda: url,
+            self._redact_token,
+            lambda: self._redact_body(json.dumps(data, ensure_ascii=False, separators=(',', ':'))) if data else "",
+        )
 
         # 设置超时
         timeout = httpx.Timeout(timeout_ms / 1000.0)
@@ -217,19 +219,17 @@ class WeixinHTTPClient:
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
 
-            logger.debug(f"[{label}] Response: status={response.status_code}")
-
-            # 增强：输出响应内容（特别是 sendMessage）
-            response_text = response.text
-            if "sendMessage" in label or response_text:
-                # 对于 sendMessage 请求，输出完整响应以便调试
-                preview = response_text[:300] if response_text else "(empty)"
-                logger.debug(f"[{label}] Response body: {preview}{'...' if len(response_text) > 300 else ''}")
+            logger.opt(lazy=True).debug(
+                "[{}] Response: status={} body={}",
+                lambda: label,
+                lambda: response.status_code,
+                lambda: self._redact_body(response.text, max_length=300) if response.text else "(empty)",
+            )
 
             # 检查响应状态
             if not response.is_success:
                 error_text = response.text
-                logger.error(f"[{label}] HTTP Error {response.status_code}: {error_text}")
+                get_log_throttle().error("[{}] HTTP Error {}: {}", label, response.status_code, error_text)
                 # 某些 API 失败返回 JSON
                 try:
                     error_json = self._parse_json(error_text)
@@ -253,7 +253,7 @@ class WeixinHTTPClient:
             logger.debug(f"[{label}] Timeout after {timeout_ms}ms")
             raise
         except httpx.HTTPError as e:
-            logger.error(f"[{label}] HTTP Error: {e}")
+            get_log_throttle().error("[{}] HTTP Error: {}", label, e)
             raise
 
     def _parse_json(self, text: str) -> Any:
@@ -272,7 +272,7 @@ class WeixinHTTPClient:
             return json.loads(text)
         except json.JSONDecodeError as e:
             error_msg = f"JSON 解析失败: {e}"
-            logger.debug(f"{error_msg}, 原始文本: {text[:500]}...")
+            logger.opt(lazy=True).debug("{}, 原始文本: {}...", lambda: error_msg, lambda: text[:500])
             raise ValueError(error_msg) from e
 
     async def post(
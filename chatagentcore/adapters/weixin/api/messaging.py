@@ -207,19 +207,29 @@ class MessagingAPI:
         to_user_id: str,
         text: str,
         context_token: str,
-    ) -> None:
+        client_id: Optional[str] = None,
+        message_state: int = MessageState.FINISH,
+    ) -> str:
         """发送文本消息（便捷方法）
 
+        流式回复时，使用同一个 client_id 先以 GENERATING 状态多次发送累积文本，
+        最后以 FINISH 状态发送完整文本，客户端会在同一条消息上刷新内容。
+
         Args:
             to_user_id: 目标用户 ID
             text: 文本内容
             context_token: 上下文令牌
+            client_id: 客户端消息 ID（可选，默认生成新 ID）
+            message_state: 消息状态（GENERATING / FINISH）
+
+        Returns:
+            本条消息的 client_id
 
         Raises:
             Exception: 发送失败
         """
         # 生成每条消息唯一的 client_id（参考 openclaw-weixin 源码）
-        client_id = f"bot-{uuid.uuid4().hex[:12]}"
+        client_id = client_id or f"bot-{uuid.uuid4().hex[:12]}"
 
         msg = WeixinMessage(
             from_user_id="",  # 必需字段：标记发送方
@@ -227,7 +237,7 @@ class MessagingAPI:
             client_id=client_id,  # 必需字段：每条消息唯一 ID
             context_token=context_token,
             message_type=MessageType.BOT,
-            message_state=MessageState.FINISH,
+            message_state=message_state,
             item_list=[
                 MessageItem(
                     type=MessageItemType.TEXT,
@@ -237,6 +247,7 @@ class MessagingAPI:
         )
 
         await self.send_message(msg)
+        return client_id
 
     async def get_config(
         self,
@@ -13,6 +13,7 @@
 """
 
 import asyncio
+import inspect
 import time
 import uuid
 from typing import Any, Callable, Optional, Dict
@@ -21,6 +22,9 @@ from loguru import logger
 
 # 使用相对导入（更健壮）
 from chatagentcore.adapters.base import BaseAdapter, Message
+from chatagentcore.adapters.stream import ReplyStream
+from chatagentcore.core.inbound import get_inbound_pipeline
+from chatagentcore.storage.logger import get_log_throttle
 
 # 导入微信适配器组件
 from .api.auth import AuthAPI
@@ -67,6 +71,11 @@ class WeixinAdapter(BaseAdapter):
     通过 iLink AI 微信聊天 API 提供完整的微信聊天功能。
     """
 
+    # 单条文本消息的长度上限
+    max_text_length = 4000
+    # 长轮询拉取：入站队列满时等待空位后再推进游标
+    pull_based = True
+
     def __init__(self, config: Dict[str, Any]):
         """初始化微信适配器
 
@@ -316,6 +325,21 @@ class WeixinAdapter(BaseAdapter):
         message_id = f"wx_{self._get_current_timestamp_ms()}"
         return message_id
 
+    def open_stream(
+        self, to: str, conversation_type: str = "user", min_interval: float = 1.0
+    ) -> ReplyStream:
+        """打开流式回复（GENERATING 状态刷新同一条消息，结束时置为 FINISH）
+
+        Args:
+            to: 接收者 ID
+            conversation_type: 会话类型
+            min_interval: 两次进度更新之间的最小间隔（秒）
+
+        Returns:
+            流式回复对象
+        """
+        return WeixinReplyStream(self, to, conversation_type, min_interval)
+
     async def send_text_message(
         self,
         to: str,
@@ -448,33 +472,35 @@ class WeixinAdapter(BaseAdapter):
 
                 # 检查 API 错误
                 if resp.ret != 0:
-                    logger.error(
-                        f"getUpdates 失败: ret={resp.ret}, errcode={resp.errcode}, errmsg={resp.errmsg}"
+                    get_log_throttle().error(
+                        "getUpdates 失败: ret={}, errcode={}, errmsg={}", resp.ret, resp.errcode, resp.errmsg
                     )
                     consecutive_failures += 1
                     if consecutive_failures >= max_consecutive_failures:
-                        logger.warning(f"连续 {max_consecutive_failures} 次失败，等待 30 秒")
+                        get_log_throttle().warning("连续 {} 次失败，等待 30 秒", max_consecutive_failures)
                         await asyncio.sleep(30)
                     else:
                         await asyncio.sleep(2)
                     continue
 
-                # 保存新游标
-                if resp.get_updates_buf:
-                    self.sync_buf_store.save(self.account_id, resp.get_updates_buf)
-                    sync_buf = resp.get_updates_buf
-
                 # 处理消息
                 if resp.msgs:
                     logger.info(f"收到 {len(resp.msgs)} 条消息")
                     for wx_msg in resp.msgs:
                         await self._handle_message(wx_msg)
+                    # 消息在入站收件箱中落盘后才推进游标，崩溃时不会丢失已拉取的消息
+                    await get_inbound_pipeline().flush()
+
+                # 保存新游标
+                if resp.get_updates_buf:
+                    self.sync_buf_store.save(self.account_id, resp.get_updates_buf)
+                    sync_buf = resp.get_updates_buf
 
             except asyncio.CancelledError:
                 logger.info("长轮询已取消")
                 break
             except Exception as e:
-                logger.error(f"长轮询异常: {e}")
+                get_log_throttle().error("长轮询异常: {}", e)
                 consecutive_failures += 1
                 if consecutive_failures >= max_consecutive_failures:
                     await asyncio.sleep(30)
@@ -529,7 +555,10 @@ class WeixinAdapter(BaseAdapter):
         logger.debug(f"分发给 {len(self._message_handlers)} 个消息处理器")
         for handler in self._message_handlers:
             try:
-                handler(msg)
+                result = handler(msg)
+                if inspect.isawaitable(result):
+                    # 等待消息进入入站队列（队列满时在此放慢拉取）
+                    await result
                 logger.debug("消息处理器执行成功")
             except Exception as e:
                 logger.error(f"消息处理器异常: {e}")
@@ -557,3 +586,41 @@ class WeixinAdapter(BaseAdapter):
         """获取当前时间戳（秒）"""
         import time
         return int(time.time())
+
+
+# ---------------------------------------------------------------------------
+# 流式回复
+# ---------------------------------------------------------------------------
+
+
+class WeixinReplyStream(ReplyStream):
+    """微信流式回复
+
+    同一 client_id 的消息先以 GENERATING 状态发送累积文本，最后以 FINISH 状态发送完整文本。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client_id = f"bot-{uuid.uuid4().hex[:12]}"
+
+    async def _send(self, text: str, state: int) -> str:
+        adapter: WeixinAdapter = self.adapter
+        if not adapter.messaging_api:
+            raise Exception("微信适配器未初始化，请先登录")
+        context_token = adapter.context_cache.get(self.to)
+        if not context_token:
+            raise Exception(f"未找到上下文令牌，请先接收来自 {self.to} 的消息（会话未建立）")
+        return await adapter.messaging_api.send_text_message(
+            to_user_id=self.to,
+            text=text,
+            context_token=context_token,
+            client_id=self._client_id,
+            message_state=state,
+        )
+
+    async def _update(self, text: str) -> None:
+        await self._send(text, MessageState.GENERATING)
+
+    async def _finalize(self, text: str) -> str:
+        # 返回流式更新共用的 client_id，调用方可据此关联整条流式消息
+        return await self._send(text, MessageState.FINISH)
@@ -5,6 +5,7 @@
 """
 
 import json
+import os
 from pathlib import Path
 from typing import Optional
 
@@ -67,8 +68,11 @@ class SyncBufStore:
                 "saved_at": self._get_current_timestamp(),
             }
 
-            with open(file_path, "w") as f:
+            # 先写临时文件再原子替换，避免进程崩溃留下截断的游标文件导致重放
+            tmp_path = file_path.with_suffix(".json.tmp")
+            with open(tmp_path, "w") as f:
                 json.dump(data, f, indent=2)
+            os.replace(tmp_path, file_path)
 
             logger.debug(f"游标已保存: account_id={normalized_id}, len={len(get_updates_buf)}")
 
@@ -3,81 +3,125 @@
 import asyncio
 import time
 from pathlib import Path
+from typing import Any, Callable
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 from chatagentcore.core.event_bus import get_event_bus
 from chatagentcore.core.config_manager import get_config_manager
 from chatagentcore.core.adapter_manager import get_adapter_manager
-from chatagentcore.storage.logger import LogConfig
+from chatagentcore.core.circuit_breaker import CIRCUIT_CLOSED
+from chatagentcore.core.dedup import get_deduplicator
+from chatagentcore.core.metrics import get_metrics
+from chatagentcore.core.idempotency import IdempotencyCache
+from chatagentcore.core.inbound import get_inbound_pipeline
+from chatagentcore.core.webhook_ingress import get_webhook_ingress
+from chatagentcore.core.router import RetryPolicy, get_router
+from chatagentcore.core.scheduler import get_scheduler
+from chatagentcore.core.templates import get_template_registry
+from chatagentcore.storage.inbox import InboxStore
+from chatagentcore.storage.message_store import MessageStore
+from chatagentcore.storage.logger import LogConfig, get_log_throttle, get_message_log
+from chatagentcore.storage.outbox import OutboxStore
+from chatagentcore.storage.schedule import ScheduleStore
 from chatagentcore.api.websocket.manager import get_manager
 from chatagentcore.api.models.message import WSAuthMessage, WSSubscribeMessage, WSMessage
 from chatagentcore.api.schemas.config import Settings
 from chatagentcore.api.routes import message as message_routes
 from chatagentcore.api.routes import webhook as webhook_routes
 from chatagentcore.api.routes import config as config_routes
-from chatagentcore.adapters.base import Message as BaseMessage
+from chatagentcore.api.routes import admin as admin_routes
+from chatagentcore.adapters.base import BaseAdapter, Message as BaseMessage
 from fastapi.staticfiles import StaticFiles
 
 
-def _default_message_handler(message: BaseMessage) -> None:
+def _admit_inbound(message: BaseMessage) -> bool:
+    """
+    入站去重 - 登记消息 ID 并统计
+
+    Args:
+        message: 收到的消息对象
+
+    Returns:
+        False 表示重复消息（应丢弃）
+    """
+    metrics = get_metrics()
+    if get_deduplicator().seen(message.platform, message.message_id):
+        metrics.inc("chatagentcore_inbound_duplicates_total", platform=message.platform)
+        logger.debug(f"Duplicate inbound message dropped: {message.platform}/{message.message_id}")
+        return False
+    metrics.inc("chatagentcore_inbound_messages_total", platform=message.platform)
+    return True
+
+
+def _record_inbound(message: BaseMessage) -> None:
+    """把已入队的入站消息写入消息存储（未启用时忽略）"""
+    message_store = get_router().message_store
+    if message_store is not None:
+        message_store.record_inbound(message)
+
+
+def _on_inbound_message(message: BaseMessage) -> None:
+    """
+    入站消息入口 - 丢弃重复消息后送入入站管道，由管道按会话分道交给消息处理器
+
+    Args:
+        message: 收到的消息对象
+    """
+    if not _admit_inbound(message):
+        return
+    if not get_inbound_pipeline().put_nowait(message):
+        # 队列已满被丢弃：撤销去重登记，平台重投时仍可处理
+        get_deduplicator().forget(message.platform, message.message_id)
+        return
+    _record_inbound(message)
+
+
+async def _on_inbound_message_wait(message: BaseMessage) -> None:
+    """
+    拉取式适配器的入站消息入口 - 队列已满时等待空位，由适配器放慢拉取
+
+    Args:
+        message: 收到的消息对象
+    """
+    if not _admit_inbound(message):
+        return
+    await get_inbound_pipeline().put(message)
+    _record_inbound(message)
+
+
+def _inbound_handler(adapter: BaseAdapter) -> Callable[[BaseMessage], Any]:
+    """按适配器的接收方式选择入站消息入口"""
+    return _on_inbound_message_wait if adapter.pull_based else _on_inbound_message
+
+
+def _attach_inbound(adapter: BaseAdapter, durable: bool) -> None:
+    """
+    为适配器设置入站消息入口
+
+    Args:
+        adapter: 平台适配器
+        durable: 是否启用了收件箱；启用时 SDK 回调等待消息落盘后再向平台应答
+    """
+    adapter.set_message_handler(_inbound_handler(adapter))
+    adapter.set_inbound_flush(get_inbound_pipeline().flush if durable else None)
+
+
+async def _default_message_handler(message: BaseMessage) -> None:
     """
     默认消息处理器 - 打印接收到的消息并广播到 WebSocket
 
     Args:
         message: 收到的消息对象
     """
-    sender_id = message.sender.get("id", "")
-    sender_name = message.sender.get("name", "")
-    conv_id = message.conversation.get("id", "")
-    conv_type = message.conversation.get("type", "")
-
-    logger.info("=" * 70)
-    logger.info("📨 收到消息 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    logger.info(f"平台: {message.platform}")
-    logger.info(f"发送者: {sender_name} ({sender_id})")
-    logger.info(f"会话: {conv_type}:{conv_id}")
-
-    content = message.content
-    msg_type = content.get("type", "unknown")
-
-    # 显示消息内容
-    if msg_type == "text" and content.get("text"):
-        text = content["text"]
-        if text:
-            # 多行消息分行显示
-            for line in text.split("\n"):
-                logger.info(f"内容: {line[:100]}")  # 限制每行长度
-        else:
-            logger.info("内容: [空消息]")
-    elif msg_type == "interactive":
-        logger.info("类型: 交互卡片消息")
-        data = content.get("data", {})
-        if isinstance(data, dict):
-            logger.info(f"卡片数据: {str(data)[:200]}...")
-    elif msg_type == "post":
-        logger.info("类型: 富文本消息")
-        data = content.get("data", {})
-        if isinstance(data, dict):
-            logger.info(f"富文本数据: {str(data)[:200]}...")
-    else:
-        logger.info(f"类型: {msg_type}")
-        data = content.get("data", {})
-        if data:
-            data_str = str(data)[:100]
-            logger.info(f"数据: {data_str}...")
-
-    logger.info("=" * 70)
-
-    # 广播消息到 WebSocket 订阅者
-    ws_payload = {
-        "platform": message.platform,
-        "sender": message.sender,
-        "conversation": message.conversation,
-        "content": message.content,
-        "timestamp": int(time.time())
-    }
+    get_message_log().inbound(message)
+
+    # 广播消息到 WebSocket 订阅者（API 边界：在这里才物化平台原始数据）
+    ws_payload = message.to_dict()
+    del ws_payload["message_id"]
+    ws_payload["timestamp"] = int(time.time())
 
     ws_msg = WSMessage(
         type="message",
@@ -86,11 +130,8 @@ def _default_message_handler(message: BaseMessage) -> None:
         payload=ws_payload
     )
 
-    # 获取当前运行的事件循环并创建广播任务
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            loop.create_task(ws_manager.broadcast(ws_msg, channel="messages"))
+        await ws_manager.broadcast(ws_msg, channel="messages")
     except Exception as e:
         logger.error(f"Failed to broadcast message via WebSocket: {e}")
 
@@ -106,11 +147,64 @@ async def lifespan(app: FastAPI):
     config_manager.load()
 
     # 配置日志
+    logging_config = config_manager.config.logging
+    log_file = Path(logging_config.file)
     log_config = LogConfig(
-        log_dir=config_manager.config.logging.file.rsplit("/", 1)[0],
-        level=config_manager.config.logging.level,
+        log_dir=str(log_file.parent),
+        level=logging_config.level,
+        file_name=log_file.name,
+        rotation=logging_config.rotation,
+        retention=logging_config.retention,
+        enqueue=logging_config.enqueue,
+        json_format=logging_config.format == "json",
     )
     log_config.setup()
+    get_message_log().configure(
+        compact=logging_config.compact_messages,
+        content_sample_rate=logging_config.content_sample_rate,
+        content_max_length=logging_config.content_max_length,
+    )
+    get_log_throttle().window = logging_config.error_throttle_window
+
+    # 入站处理：去重后进入有界管道，按会话分道处理
+    inbound_config = config_manager.config.inbound
+    get_deduplicator().configure(ttl=inbound_config.dedup_ttl, max_size=inbound_config.dedup_max_size)
+    inbound_pipeline = get_inbound_pipeline()
+    inbound_pipeline.configure(max_concurrency=inbound_config.concurrency, queue_size=inbound_config.queue_size)
+    inbound_pipeline.set_handler(_default_message_handler)
+    webhook_ingress = get_webhook_ingress()
+    webhook_ingress.max_size = inbound_config.webhook_queue_size
+    webhook_ingress.workers = inbound_config.webhook_workers
+
+    # 启用消息存储（会话列表与历史消息），需在适配器启动和发件箱恢复之前打开，
+    # 以记录启动后最早的收发消息
+    message_store_config = config_manager.config.message_store
+    message_store = None
+    if message_store_config.enabled:
+        message_store = MessageStore(
+            message_store_config.path,
+            batch_size=message_store_config.batch_size,
+            flush_interval=message_store_config.flush_interval_ms / 1000,
+        )
+        await message_store.open()
+        get_router().message_store = message_store
+
+    # 启用持久化收件箱，并重放上次未处理完成的入站事件
+    inbox_config = config_manager.config.inbox
+    inbox = None
+    if inbox_config.enabled:
+        inbox = InboxStore(
+            inbox_config.path,
+            batch_size=inbox_config.batch_size,
+            flush_interval=inbox_config.flush_interval_ms / 1000,
+        )
+        await inbox.open()
+        inbound_pipeline.configure_inbox(inbox)
+        webhook_ingress.configure_inbox(inbox)
+        for message in await inbound_pipeline.recover():
+            get_deduplicator().seen(message.platform, message.message_id)
+        await webhook_ingress.recover()
+    await webhook_ingress.start()
 
     # 获取适配器管理器并注册适配器类
     adapter_manager = get_adapter_manager()
@@ -143,10 +237,52 @@ async def lifespan(app: FastAPI):
         for platform_name in platforms_config.keys():
             adapter = adapter_manager.get_adapter(platform_name)
             if adapter:
-                adapter.set_message_handler(_default_message_handler)
+                _attach_inbound(adapter, inbox is not None)
     else:
         logger.warning("No platforms enabled in configuration")
 
+    # 出站调度：按会话分道发送
+    message_router = get_router()
+    message_router.set_concurrency(config_manager.config.outbound.concurrency)
+    message_router.idempotency = IdempotencyCache(ttl=config_manager.config.outbound.idempotency_ttl)
+    message_router.stream_interval = config_manager.config.outbound.stream_interval
+    message_router.coalesce_window = config_manager.config.outbound.coalesce_window_ms / 1000
+    message_router.multicast_concurrency = config_manager.config.outbound.multicast_concurrency
+    message_router.send_timeout = config_manager.config.outbound.send_timeout
+    message_router.configure_circuit_breakers(**config_manager.config.outbound.circuit_breaker.model_dump())
+    get_template_registry().load(config_manager.config.templates)
+
+    # 启用持久化发件箱，并恢复上次未发送完成的消息
+    outbox_config = config_manager.config.outbox
+    outbox = None
+    if outbox_config.enabled:
+        outbox = OutboxStore(
+            outbox_config.path,
+            batch_size=outbox_config.batch_size,
+            flush_interval=outbox_config.flush_interval_ms / 1000,
+        )
+        await outbox.open()
+        message_router.configure_outbox(
+            outbox,
+            RetryPolicy(
+                max_attempts=outbox_config.max_attempts,
+                base_delay=outbox_config.base_delay,
+                max_delay=outbox_config.max_delay,
+            ),
+        )
+        await message_router.recover_outbox()
+
+    # 定时消息：恢复持久化的定时消息并启动调度
+    scheduler_config = config_manager.config.scheduler
+    scheduler = get_scheduler()
+    scheduler.batch_size = scheduler_config.batch_size
+    schedule_store = None
+    if scheduler_config.persistent:
+        schedule_store = ScheduleStore(scheduler_config.path)
+        await schedule_store.open()
+        scheduler.configure_store(schedule_store)
+    await scheduler.start()
+
     # 启动事件总线
     event_bus = get_event_bus()
     await event_bus.start()
@@ -176,14 +312,14 @@ async def lifespan(app: FastAPI):
                     await adapter_manager.reload_adapter(platform_name, cfg.model_dump())
                     new_adapter = adapter_manager.get_adapter(platform_name)
                     if new_adapter:
-                        new_adapter.set_message_handler(_default_message_handler)
+                        _attach_inbound(new_adapter, inbox is not None)
                 else:
                     # 如果未运行且已开启，则启动
                     logger.info(f"Platform {platform_name} enabled, loading...")
                     await adapter_manager.load_adapter(platform_name, cfg.model_dump())
                     new_adapter = adapter_manager.get_adapter(platform_name)
                     if new_adapter:
-                        new_adapter.set_message_handler(_default_message_handler)
+                        _attach_inbound(new_adapter, inbox is not None)
             else:
                 if current_adapter:
                     # 如果运行中但已关闭，则卸载
@@ -228,6 +364,19 @@ async def lifespan(app: FastAPI):
 
     prune_job = asyncio.create_task(prune_task())
 
+    # 定期清理超过保留期的消息
+    async def compact_task():
+        while True:
+            try:
+                await asyncio.sleep(message_store_config.compact_interval)
+                await message_store.compact(message_store_config.retention_days * 86400)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in compact_task: {e}")
+
+    compact_job = asyncio.create_task(compact_task()) if message_store is not None else None
+
     logger.info("ChatAgentCore started successfully")
 
     yield
@@ -240,13 +389,31 @@ async def lifespan(app: FastAPI):
     await get_process_manager().stop()
 
     prune_job.cancel()
+    if compact_job is not None:
+        compact_job.cancel()
+    await webhook_ingress.stop()
+    await inbound_pipeline.stop()
+    if inbox is not None:
+        await inbox.close()
+    await scheduler.stop()
+    if schedule_store is not None:
+        await schedule_store.close()
+    await message_router.stop()
+    if outbox is not None:
+        await outbox.close()
+    if message_store is not None:
+        message_router.message_store = None
+        await message_store.close()
     await event_bus.stop()
     await config_manager.stop_watch()
 
     # 卸载所有适配器
     await adapter_manager.unload_all()
 
+    get_log_throttle().flush()
     logger.info("ChatAgentCore shut down")
+    # 等待后台日志线程写完队列中的记录
+    await logger.complete()
 
 
 # 创建 FastAPI 应用
@@ -272,6 +439,7 @@ app.add_middleware(
 app.include_router(message_routes.router)
 app.include_router(webhook_routes.router)
 app.include_router(config_routes.router)
+app.include_router(admin_routes.router)
 
 # 挂载静态文件（管理后台）
 import sys
@@ -306,12 +474,23 @@ async def root():
 async def health_check():
     """健康检查"""
     adapter_manager = get_adapter_manager()
+    breakers = get_router().get_breaker_states()
+    degraded = any(state["state"] != CIRCUIT_CLOSED for state in breakers.values())
     return {
-        "status": "healthy",
+        "status": "degraded" if degraded else "healthy",
         "plugins_loaded": adapter_manager.loaded_platforms_count,
+        "circuit_breakers": breakers,
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """运行指标（Prometheus 文本格式）"""
+    registry = get_metrics()
+    registry.set_gauge("chatagentcore_inbound_dedup_entries", len(get_deduplicator()))
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.websocket("/ws/events")
 async def websocket_events(websocket: WebSocket):
     """
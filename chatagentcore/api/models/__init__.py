@@ -6,14 +6,20 @@ from chatagentcore.api.models.message import (
     MessageContent,
     Message,
     SendMessageRequest,
+    StreamMessageRequest,
+    MulticastRequest,
+    MulticastResponse,
     SendMessageResponse,
     MessageStatusRequest,
     MessageStatusResponse,
     ConversationListRequest,
+    ConversationMessagesRequest,
     ConversationInfoResponse,
     ConversationListResponse,
+    MessageSearchResponse,
     ConfigUpdateRequest,
     ConfigResponse,
+    AdminResponse,
     ErrorResponse,
     WSAuthMessage,
     WSSubscribeMessage,
@@ -26,14 +32,20 @@ __all__ = [
     "MessageContent",
     "Message",
     "SendMessageRequest",
+    "StreamMessageRequest",
+    "MulticastRequest",
+    "MulticastResponse",
     "SendMessageResponse",
     "MessageStatusRequest",
     "MessageStatusResponse",
     "ConversationListRequest",
+    "ConversationMessagesRequest",
     "ConversationInfoResponse",
     "ConversationListResponse",
+    "MessageSearchResponse",
     "ConfigUpdateRequest",
     "ConfigResponse",
+    "AdminResponse",
     "ErrorResponse",
     "WSAuthMessage",
     "WSSubscribeMessage",
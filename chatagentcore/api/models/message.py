@@ -1,7 +1,8 @@
 """Unified message models"""
 
-from typing import Any, Dict, Optional, Literal
-from pydantic import BaseModel, Field
+import time
+from typing import Any, Dict, List, Optional, Literal
+from pydantic import BaseModel, Field, model_validator
 
 
 class SenderInfo(BaseModel):
@@ -55,8 +56,62 @@ class SendMessageRequest(BaseModel):
     platform: str = Field(..., description="平台名称")
     to: str = Field(..., description="接收者 ID（用户 ID 或群 ID）")
     message_type: str = Field("text", description="消息类型: text, card, image等")
-    content: str = Field(..., description="消息内容")
+    content: str = Field("", description="消息内容（使用模板时可省略）")
+    template_id: Optional[str] = Field(None, description="消息模板 ID，指定后由模板渲染消息类型和内容")
+    template_vars: Dict[str, Any] = Field(default_factory=dict, description="模板占位符变量")
     conversation_type: str = Field("user", description="会话类型: user/group, 兼容chat")
+    wait: bool = Field(True, description="是否等待发送完成；false 时立即返回 202 和任务 ID")
+    idempotency_key: Optional[str] = Field(
+        None, max_length=128, description="幂等键，重试时携带相同的值可避免重复发送"
+    )
+    priority: int = Field(0, ge=0, le=9, description="优先级 0-9，数值越大越先发送（如交互回复高于批量通知）")
+    deadline: Optional[float] = Field(None, description="截止时间（Unix 时间戳），过期仍未发出的消息将被丢弃")
+
+    send_at: Optional[float] = Field(None, description="定时发送时间（Unix 时间戳），到达后才进入发送队列")
+    delay_ms: Optional[int] = Field(None, ge=0, description="延迟发送时长（毫秒），与 send_at 二选一")
+
+    @model_validator(mode="after")
+    def check_content(self) -> "SendMessageRequest":
+        """验证消息内容或模板至少提供一项，定时参数至多提供一项"""
+        if not self.content and not self.template_id:
+            raise ValueError("content or template_id is required")
+        if self.send_at is not None and self.delay_ms is not None:
+            raise ValueError("send_at and delay_ms are mutually exclusive")
+        return self
+
+    @property
+    def scheduled_at(self) -> Optional[float]:
+        """定时发送时间（Unix 时间戳），未指定定时参数时为 None"""
+        if self.delay_ms is not None:
+            return time.time() + self.delay_ms / 1000
+        return self.send_at
+
+
+class StreamMessageRequest(BaseModel):
+    """流式发送请求（NDJSON 请求体的首行）"""
+
+    platform: str = Field(..., description="平台名称")
+    to: str = Field(..., description="接收者 ID（用户 ID 或群 ID）")
+    conversation_type: str = Field("user", description="会话类型: user/group")
+
+
+class MulticastRequest(BaseModel):
+    """群发消息请求"""
+
+    platform: str = Field(..., description="平台名称")
+    to: List[str] = Field(..., min_length=1, max_length=10000, description="接收者 ID 列表")
+    message_type: str = Field("text", description="消息类型: text, card 等")
+    content: str = Field(..., description="消息内容")
+    conversation_type: str = Field("user", description="会话类型: user/group")
+
+
+class MulticastResponse(BaseModel):
+    """群发消息响应"""
+
+    code: int = Field(0, description="状态码: 0 全部成功，207 部分失败，500 全部失败")
+    message: str = Field("success", description="响应消息")
+    data: Optional[Dict[str, Any]] = Field(None, description="发送统计及各接收者结果")
+    timestamp: int = Field(..., description="Unix 时间戳")
 
 
 class SendMessageResponse(BaseModel):
@@ -72,7 +127,7 @@ class MessageStatusRequest(BaseModel):
     """消息状态查询请求"""
 
     platform: str = Field(..., description="平台名称")
-    message_id: str = Field(..., description="消息 ID")
+    message_id: str = Field(..., description="消息 ID 或异步发送返回的任务 ID")
 
 
 class MessageStatusResponse(BaseModel):
@@ -92,6 +147,15 @@ class ConversationListRequest(BaseModel):
     cursor: Optional[str] = Field(None, description="分页游标")
 
 
+class ConversationMessagesRequest(BaseModel):
+    """会话历史消息查询请求"""
+
+    platform: str = Field(..., description="平台名称")
+    conversation_id: str = Field(..., description="会话 ID")
+    limit: int = Field(50, description="每页数量", ge=1, le=100)
+    cursor: Optional[str] = Field(None, description="分页游标")
+
+
 class ConversationInfoResponse(BaseModel):
     """会话信息响应"""
 
@@ -110,6 +174,15 @@ class ConversationListResponse(BaseModel):
     timestamp: int = Field(..., description="Unix 时间戳")
 
 
+class MessageSearchResponse(BaseModel):
+    """历史消息检索响应"""
+
+    code: int = Field(0, description="状态码")
+    message: str = Field("success", description="响应消息")
+    data: Optional[Dict[str, Any]] = Field(None, description="检索结果数据")
+    timestamp: int = Field(..., description="Unix 时间戳")
+
+
 class ConfigUpdateRequest(BaseModel):
     """配置更新请求"""
 
@@ -126,6 +199,15 @@ class ConfigResponse(BaseModel):
     timestamp: int = Field(..., description="Unix 时间戳")
 
 
+class AdminResponse(BaseModel):
+    """管理接口响应"""
+
+    code: int = Field(0, description="状态码")
+    message: str = Field("success", description="响应消息")
+    data: Optional[Dict[str, Any]] = Field(None, description="响应数据")
+    timestamp: int = Field(..., description="Unix 时间戳")
+
+
 class ErrorResponse(BaseModel):
     """错误响应"""
 
@@ -172,14 +254,20 @@ __all__ = [
     "MessageContent",
     "Message",
     "SendMessageRequest",
+    "StreamMessageRequest",
+    "MulticastRequest",
+    "MulticastResponse",
     "SendMessageResponse",
     "MessageStatusRequest",
     "MessageStatusResponse",
     "ConversationListRequest",
+    "ConversationMessagesRequest",
     "ConversationInfoResponse",
     "ConversationListResponse",
+    "MessageSearchResponse",
     "ConfigUpdateRequest",
     "ConfigResponse",
+    "AdminResponse",
     "ErrorResponse",
     "WSAuthMessage",
     "WSSubscribeMessage",
@@ -0,0 +1,101 @@
+"""Admin API routes - 发件箱死信的查看与重放"""
+
+import time
+from fastapi import APIRouter, Depends, Query
+from chatagentcore.api.models.message import AdminResponse
+from chatagentcore.api.routes.message import verify_token
+from chatagentcore.core.router import get_router
+
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
+
+
+def _outbox_disabled(timestamp: int) -> AdminResponse:
+    return AdminResponse(code=400, message="outbox is not enabled", timestamp=timestamp)
+
+
+@router.get("/outbox/dead-letters", response_model=AdminResponse)
+async def list_dead_letters(
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    token: str = Depends(verify_token),
+) -> AdminResponse:
+    """
+    列出发件箱死信
+
+    Args:
+        limit: 每页数量
+        offset: 偏移量
+        token: 认证 Token
+
+    Returns:
+        死信列表
+    """
+    timestamp = int(time.time())
+    outbox = get_router().outbox
+    if outbox is None:
+        return _outbox_disabled(timestamp)
+
+    items = await outbox.list_dead_letters(limit=limit, offset=offset)
+    total = await outbox.count_dead_letters()
+    return AdminResponse(
+        code=0,
+        message="success",
+        data={"dead_letters": items, "total": total},
+        timestamp=timestamp,
+    )
+
+
+@router.post("/outbox/dead-letters/{job_id}/replay", response_model=AdminResponse)
+async def replay_dead_letter(job_id: str, token: str = Depends(verify_token)) -> AdminResponse:
+    """
+    重放死信，重新加入发送队列
+
+    Args:
+        job_id: 死信的任务 ID
+        token: 认证 Token
+
+    Returns:
+        新任务信息
+    """
+    timestamp = int(time.time())
+    router_instance = get_router()
+    if router_instance.outbox is None:
+        return _outbox_disabled(timestamp)
+
+    job = await router_instance.replay_dead_letter(job_id)
+    if job is None:
+        return AdminResponse(code=404, message="dead letter not found", timestamp=timestamp)
+
+    return AdminResponse(
+        code=0,
+        message="success",
+        data={"replayed": job_id, "job_id": job.job_id, "status": job.status},
+        timestamp=timestamp,
+    )
+
+
+@router.delete("/outbox/dead-letters/{job_id}", response_model=AdminResponse)
+async def delete_dead_letter(job_id: str, token: str = Depends(verify_token)) -> AdminResponse:
+    """
+    删除死信
+
+    Args:
+        job_id: 死信的任务 ID
+        token: 认证 Token
+
+    Returns:
+        操作结果
+    """
+    timestamp = int(time.time())
+    outbox = get_router().outbox
+    if outbox is None:
+        return _outbox_disabled(timestamp)
+
+    if await outbox.get_dead_letter(job_id) is None:
+        return AdminResponse(code=404, message="dead letter not found", timestamp=timestamp)
+
+    await outbox.delete_dead_letter(job_id)
+    return AdminResponse(code=0, message="success", data={"deleted": job_id}, timestamp=timestamp)
+
+
+__all__ = ["router"]
@@ -56,9 +56,11 @@ async def get_system_status():
     """获取系统运行状态（含 Agent 状态）"""
     from chatagentcore.core.process_manager import get_process_manager
     from chatagentcore.core.adapter_manager import get_adapter_manager
+    from chatagentcore.core.router import get_router
     
     pm = get_process_manager()
     am = get_adapter_manager()
+    breakers = get_router().get_breaker_states()
     
     return {
         "agent": {
@@ -69,7 +71,8 @@ async def get_system_status():
         "platforms": {
             name: {
                 "enabled": adapter.is_connected() if hasattr(adapter, 'is_connected') else True,
-                "type": name
+                "type": name,
+                "circuit": breakers.get(name),
             } for name, adapter in am._adapters.items()
         }
     }
@@ -1,23 +1,33 @@
 """Message API routes"""
 
+import json
 import time
-from typing import Any, Dict
-from fastapi import APIRouter, HTTPException, Depends, Header
+from typing import Any, AsyncIterator, Dict, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response
 from loguru import logger
+from pydantic import ValidationError
 from chatagentcore.api.models.message import (
     SendMessageRequest,
+    StreamMessageRequest,
+    MulticastRequest,
+    MulticastResponse,
     SendMessageResponse,
     MessageStatusRequest,
     MessageStatusResponse,
     ConversationListRequest,
+    ConversationMessagesRequest,
     ConversationListResponse,
+    MessageSearchResponse,
     ConfigUpdateRequest,
     ConfigResponse,
 )
 from chatagentcore.core.adapter_manager import get_adapter_manager
-from chatagentcore.core.router import get_router
+from chatagentcore.core.router import SubmitError, get_router
+from chatagentcore.core.scheduler import get_scheduler
+from chatagentcore.core.send_jobs import JOB_EXPIRED, JOB_SENT
 from chatagentcore.core.config_manager import get_config_manager
-from chatagentcore.core.event_bus import get_event_bus
+from chatagentcore.core.templates import TemplateError, get_template_registry
+from chatagentcore.storage.logger import get_message_log
 
 router = APIRouter(prefix="/api/v1", tags=["message"])
 
@@ -42,73 +52,237 @@ async def verify_token(authorization: str = Header(None)) -> str:
 @router.post("/message/send", response_model=SendMessageResponse)
 async def send_message(
     request: SendMessageRequest,
+    response: Response,
     token: str = Depends(verify_token),
 ) -> SendMessageResponse:
     """
     发送消息到聊天平台
 
+    wait=false 时消息进入发送队列，立即返回 202 和任务 ID，
+    可通过 /message/status 查询发送结果；wait=true 时最多等待 outbound.send_timeout 秒，
+    超时仍未发出同样返回 202 和任务 ID。
+    指定 send_at 或 delay_ms 时消息登记为定时消息，立即返回 202 和定时消息 ID，
+    到期后才进入发送队列。
+
     Args:
         request: 发送消息请求
+        response: HTTP 响应（用于设置 202 状态码）
         token: 认证 Token
 
     Returns:
         发送响应
     """
-    # 打印发送的消息日志
-    logger.info("=" * 70)
-    logger.info("📤 发送消息 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    logger.info(f"平台: {request.platform} | 类型: {request.message_type}")
-    logger.info(f"接收者: {request.to} ({request.conversation_type})")
-    logger.info("-" * 70)
-
-    if request.message_type == "text":
-        lines = request.content.split("\n") if "\n" in request.content else [request.content]
-        for line in lines:
-            logger.info(f"内容: {line}")
-    elif request.message_type in ("card", "interactive"):
-        logger.info(f"卡片消息: {request.content[:200]}...")
-    else:
-        logger.info(f"内容: {str(request.content)[:200]}")
+    timestamp = int(time.time())
+    message_type, content = request.message_type, request.content
+    if request.template_id:
+        try:
+            message_type, content = get_template_registry().render(request.template_id, request.template_vars)
+        except TemplateError as e:
+            return SendMessageResponse(code=400, message=str(e), timestamp=timestamp)
+
+    get_message_log().outbound(
+        request.platform, request.to, request.conversation_type, message_type, content, request.template_id
+    )
 
-    logger.info("=" * 70)
+    send_at = request.scheduled_at
+    if send_at is not None:
+        entry = await get_scheduler().schedule(
+            platform=request.platform,
+            to=request.to,
+            message_type=message_type,
+            content=content,
+            send_at=send_at,
+            conversation_type=request.conversation_type,
+            priority=request.priority,
+            deadline=request.deadline,
+            idempotency_key=request.idempotency_key,
+        )
+        logger.info(f"⏰ 已登记定时消息 | ID: {entry.schedule_id}")
+        response.status_code = 202
+        return SendMessageResponse(
+            code=0,
+            message="scheduled",
+            data={"schedule_id": entry.schedule_id, "status": "scheduled"},
+            timestamp=timestamp,
+        )
 
     router_instance = get_router()
-    timestamp = int(time.time())
 
     try:
-        message_id = await router_instance.route_outgoing(
+        job = await router_instance.submit(
             platform=request.platform,
             to=request.to,
-            message_type=request.message_type,
-            content=request.content,
+            message_type=message_type,
+            content=content,
             conversation_type=request.conversation_type,
+            idempotency_key=request.idempotency_key,
+            priority=request.priority,
+            deadline=request.deadline,
+        )
+    except SubmitError as e:
+        logger.error(f"❌ 发送任务登记失败: {e}")
+        return SendMessageResponse(
+            code=500,
+            message=str(e),
+            data={"job_id": e.job.job_id, "status": e.job.status},
+            timestamp=timestamp,
         )
 
-        logger.info(f"✅ 发送成功 | 消息 ID: {message_id}")
-
-        # 发布消息事件
-        event_bus = get_event_bus()
-        await event_bus.emit("message:sent", {
-            "platform": request.platform,
-            "message_id": message_id,
-            "to": request.to,
-            "message_type": request.message_type,
-        })
+    if not request.wait:
+        logger.info(f"⏳ 已加入发送队列 | 任务 ID: {job.job_id}")
+        response.status_code = 202
+        return SendMessageResponse(
+            code=0,
+            message="accepted",
+            data={"job_id": job.job_id, "status": job.status},
+            timestamp=timestamp,
+        )
 
+    await router_instance.wait_job(job, timeout=router_instance.send_timeout)
+    if not job.finished:
+        # 等待超时：任务仍在队列或发送中，按异步提交返回，客户端可查询状态
+        logger.warning(f"⏳ 同步发送等待超时 | 任务 ID: {job.job_id}")
+        response.status_code = 202
         return SendMessageResponse(
             code=0,
-            message="success",
-            data={"message_id": message_id, "status": "sent"},
+            message="accepted",
+            data={"job_id": job.job_id, "status": job.status},
             timestamp=timestamp,
         )
-    except Exception as e:
-        logger.error(f"❌ 发送失败: {e}")
+
+    if job.status != JOB_SENT:
+        logger.error(f"❌ 发送失败: {job.error}")
         return SendMessageResponse(
-            code=500,
-            message=str(e),
+            code=504 if job.status == JOB_EXPIRED else 500,
+            message=job.error or "send failed",
             timestamp=timestamp,
         )
 
+    message_id = job.message_id or ""
+    logger.info(f"✅ 发送成功 | 消息 ID: {message_id}")
+
+    return SendMessageResponse(
+        code=0,
+        message="success",
+        data={"message_id": message_id, "job_id": job.job_id, "status": job.status},
+        timestamp=timestamp,
+    )
+
+
+async def _iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    """按行解析 NDJSON 请求体（忽略空行）"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+@router.post("/message/stream", response_model=SendMessageResponse)
+async def stream_message(
+    request: Request,
+    token: str = Depends(verify_token),
+) -> SendMessageResponse:
+    """
+    流式发送消息
+
+    请求体为 NDJSON（可使用 chunked 传输边生成边上传）：
+    首行为 {"platform", "to", "conversation_type"}，之后每行为 {"delta": "增量文本"}。
+    各平台按节流间隔渲染生成进度（微信 GENERATING 状态、飞书/钉钉卡片更新，
+    其他平台分段发送），请求体结束后发送最终内容并返回。
+
+    Args:
+        request: HTTP 请求
+        token: 认证 Token
+
+    Returns:
+        发送响应
+    """
+    timestamp = int(time.time())
+    frames = _iter_ndjson(request.stream())
+
+    try:
+        header = StreamMessageRequest.model_validate(await anext(frames))
+        stream = get_router().open_stream(header.platform, header.to, header.conversation_type)
+    except (StopAsyncIteration, json.JSONDecodeError, ValidationError, ValueError) as e:
+        return SendMessageResponse(code=400, message=f"invalid stream header: {str(e) or 'empty body'}", timestamp=timestamp)
+
+    logger.info(f"📤 流式发送 | 平台: {header.platform} | 接收者: {header.to}")
+
+    try:
+        async for frame in frames:
+            delta = frame.get("delta")
+            if delta:
+                await stream.append(delta)
+        message_id = await stream.finish()
+    except Exception as e:
+        await stream.abort()
+        logger.error(f"❌ 流式发送失败: {e}")
+        return SendMessageResponse(code=500, message=str(e) or "stream failed", timestamp=timestamp)
+
+    logger.info(f"✅ 流式发送完成 | 消息 ID: {message_id} | 进度更新 {stream.updates} 次")
+    return SendMessageResponse(
+        code=0,
+        message="success",
+        data={"message_id": message_id or ""},
+        timestamp=timestamp,
+    )
+
+
+@router.post("/message/multicast", response_model=MulticastResponse)
+async def multicast_message(
+    request: MulticastRequest,
+    token: str = Depends(verify_token),
+) -> MulticastResponse:
+    """
+    向同一平台的多个接收者群发同一条消息
+
+    飞书单聊使用 message/v4/batch_send，钉钉单聊使用 oToMessages/batchSend，
+    其他情况以有限并发逐个发送。
+
+    Args:
+        request: 群发请求
+        token: 认证 Token
+
+    Returns:
+        群发响应
+    """
+    timestamp = int(time.time())
+    logger.info(f"📤 群发消息 | 平台: {request.platform} | 接收者: {len(request.to)} 个")
+
+    try:
+        results = await get_router().multicast(
+            platform=request.platform,
+            recipients=request.to,
+            message_type=request.message_type,
+            content=request.content,
+            conversation_type=request.conversation_type,
+        )
+    except Exception as e:
+        logger.error(f"❌ 群发失败: {e}")
+        return MulticastResponse(code=500, message=str(e), timestamp=timestamp)
+
+    failed = sum(1 for result in results.values() if result.startswith("Error:"))
+    logger.info(f"✅ 群发完成 | 成功: {len(results) - failed} | 失败: {failed}")
+
+    if not failed:
+        code, message = 0, "success"
+    elif failed == len(results):
+        code, message = 500, "all failed"
+    else:
+        code, message = 207, "partial failure"
+
+    return MulticastResponse(
+        code=code,
+        message=message,
+        data={"total": len(results), "succeeded": len(results) - failed, "failed": failed, "results": results},
+        timestamp=timestamp,
+    )
+
 
 @router.post("/message/status", response_model=MessageStatusResponse)
 async def get_message_status(
@@ -127,27 +301,65 @@ async def get_message_status(
     """
     timestamp = int(time.time())
 
-    # 暂时返回默认状态，实际需要根据平台实现
+    job = get_router().get_job(request.message_id)
+    if job is None:
+        entry = get_scheduler().get(request.message_id)
+        if entry is not None and entry.platform == request.platform:
+            return MessageStatusResponse(code=0, message="success", data=entry.to_dict(), timestamp=timestamp)
+
+    if job is None or job.platform != request.platform:
+        return MessageStatusResponse(
+            code=404,
+            message="message not found",
+            data={
+                "platform": request.platform,
+                "message_id": request.message_id,
+                "status": "unknown",
+            },
+            timestamp=timestamp,
+        )
+
+    data = job.to_dict()
+    data["sent_at"] = int(job.updated_at) if job.status == JOB_SENT else None
+
     return MessageStatusResponse(
         code=0,
         message="success",
-        data={
-            "platform": request.platform,
-            "message_id": request.message_id,
-            "status": "sent",  # sent | delivered | read | failed
-            "sent_at": timestamp,
-        },
+        data=data,
         timestamp=timestamp,
     )
 
 
+@router.delete("/message/scheduled/{schedule_id}", response_model=SendMessageResponse)
+async def cancel_scheduled_message(
+    schedule_id: str,
+    token: str = Depends(verify_token),
+) -> SendMessageResponse:
+    """
+    取消尚未发送的定时消息
+
+    Args:
+        schedule_id: 定时消息 ID
+        token: 认证 Token
+
+    Returns:
+        取消结果
+    """
+    timestamp = int(time.time())
+    if not await get_scheduler().cancel(schedule_id):
+        return SendMessageResponse(code=404, message="scheduled message not found", timestamp=timestamp)
+    return SendMessageResponse(
+        code=0, message="cancelled", data={"schedule_id": schedule_id, "status": "cancelled"}, timestamp=timestamp
+    )
+
+
 @router.post("/conversation/list", response_model=ConversationListResponse)
 async def list_conversations(
     request: ConversationListRequest,
     token: str = Depends(verify_token),
 ) -> ConversationListResponse:
     """
-    获取会话列表
+    获取会话列表（按最近活跃度倒序，游标分页）
 
     Args:
         request: 查询请求
@@ -157,16 +369,118 @@ async def list_conversations(
         会话列表响应
     """
     timestamp = int(time.time())
+    message_store = get_router().message_store
+    if message_store is None:
+        # 未启用消息存储时没有会话数据
+        return ConversationListResponse(
+            code=0,
+            message="success",
+            data={"conversations": [], "has_more": False, "cursor": None},
+            timestamp=timestamp,
+        )
+
+    try:
+        conversations, cursor = await message_store.list_conversations(
+            request.platform, limit=request.limit, cursor=request.cursor
+        )
+    except ValueError as e:
+        return ConversationListResponse(code=400, message=str(e), timestamp=timestamp)
 
-    # 暂时返回空列表，实际需要根据平台实现
     return ConversationListResponse(
         code=0,
         message="success",
-        data={
-            "conversations": [],
-            "has_more": False,
-            "cursor": None,
-        },
+        data={"conversations": conversations, "has_more": cursor is not None, "cursor": cursor},
+        timestamp=timestamp,
+    )
+
+
+@router.post("/conversation/messages", response_model=ConversationListResponse)
+async def list_conversation_messages(
+    request: ConversationMessagesRequest,
+    token: str = Depends(verify_token),
+) -> ConversationListResponse:
+    """
+    获取会话历史消息（按时间倒序，游标分页）
+
+    Args:
+        request: 查询请求
+        token: 认证 Token
+
+    Returns:
+        历史消息响应
+    """
+    timestamp = int(time.time())
+    message_store = get_router().message_store
+    if message_store is None:
+        return ConversationListResponse(code=400, message="message store is not enabled", timestamp=timestamp)
+
+    try:
+        messages, cursor = await message_store.list_messages(
+            request.platform, request.conversation_id, limit=request.limit, cursor=request.cursor
+        )
+    except ValueError as e:
+        return ConversationListResponse(code=400, message=str(e), timestamp=timestamp)
+
+    return ConversationListResponse(
+        code=0,
+        message="success",
+        data={"messages": messages, "has_more": cursor is not None, "cursor": cursor},
+        timestamp=timestamp,
+    )
+
+
+@router.get("/messages/search", response_model=MessageSearchResponse)
+async def search_messages(
+    q: str = Query(..., min_length=1, description="关键词：不少于 3 个字符时走 FTS5 trigram 短语匹配，更短时退化为 LIKE 全表扫描"),
+    platform: Optional[str] = Query(None, description="平台名称"),
+    conversation_id: Optional[str] = Query(None, description="会话 ID"),
+    since: Optional[float] = Query(None, description="起始时间（Unix 时间戳，含）"),
+    until: Optional[float] = Query(None, description="结束时间（Unix 时间戳，不含）"),
+    limit: int = Query(50, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="分页游标"),
+    token: str = Depends(verify_token),
+) -> MessageSearchResponse:
+    """
+    全文检索历史消息（按时间倒序，游标分页）
+
+    关键词不少于 3 个字符时使用 FTS5 trigram 索引做短语匹配；
+    1-2 个字符的关键词无法使用索引，退化为 LIKE 扫描，建议同时指定平台、会话或时间范围。
+
+    Args:
+        q: 关键词
+        platform: 平台过滤
+        conversation_id: 会话过滤
+        since: 起始时间
+        until: 结束时间
+        limit: 每页数量
+        cursor: 分页游标
+        token: 认证 Token
+
+    Returns:
+        检索结果响应
+    """
+    timestamp = int(time.time())
+    message_store = get_router().message_store
+    if message_store is None:
+        return MessageSearchResponse(code=400, message="message store is not enabled", timestamp=timestamp)
+
+    try:
+        messages, next_cursor = await message_store.search(
+            q,
+            platform=platform,
+            conversation_id=conversation_id,
+            since=since,
+            until=until,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        return MessageSearchResponse(code=400, message=str(e), timestamp=timestamp)
+
+    return MessageSearchResponse(
+        code=0,
+        message="success",
+        data={"messages": messages, "has_more": next_cursor is not None, "cursor": next_cursor},
         timestamp=timestamp,
     )
 
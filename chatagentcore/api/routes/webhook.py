@@ -1,12 +1,19 @@
 """Webhook 路由 - 处理平台回调消息"""
 
+import base64
+import hashlib
+import hmac
 import json
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional
+from xml.etree import ElementTree
 from fastapi import APIRouter, Header, Request, HTTPException
 from loguru import logger
 
+from chatagentcore.adapters.feishu.models import parse_event as parse_feishu_event
 from chatagentcore.core.adapter_manager import get_adapter_manager
 from chatagentcore.core.config_manager import get_config_manager
+from chatagentcore.core.webhook_ingress import get_webhook_ingress
 
 router = APIRouter(prefix="/webhook", tags=["webhook"])
 
@@ -34,6 +41,90 @@ def get_event_handler(platform: str) -> Any:
     return _event_handlers.get(platform)
 
 
+def _dispatch(platform: str, event_data: Any) -> None:
+    """把解析后的事件交给已注册的平台处理器"""
+    handler = get_event_handler(platform)
+    if handler is None:
+        return
+    if hasattr(handler, "handle_webhook"):
+        handler.handle_webhook(event_data)
+    elif callable(handler):
+        handler(event_data)
+
+
+def _process_feishu(body: bytes) -> None:
+    """后台解析并分发飞书事件（一次解码为类型化的 FeishuEventEnvelope）"""
+    event = parse_feishu_event(body)
+    logger.info(f"收到飞书事件: {event.header.event_type}")
+    _dispatch("feishu", event)
+
+
+def _process_wecom(body: bytes) -> None:
+    """后台解析并分发企业微信事件"""
+    event_data = ElementTree.fromstring(body.decode("utf-8"))
+    logger.info(f"收到企业微信事件: {event_data.findtext('MsgType')}")
+    _dispatch("wecom", event_data)
+
+
+def _process_dingtalk(body: bytes) -> None:
+    """后台解析并分发钉钉事件"""
+    event_data = json.loads(body)
+    logger.info(f"收到钉钉事件: {event_data.get('msgType')}")
+    _dispatch("dingtalk", event_data)
+
+
+_ingress = get_webhook_ingress()
+_ingress.register("feishu", _process_feishu)
+_ingress.register("wecom", _process_wecom)
+_ingress.register("dingtalk", _process_dingtalk)
+
+
+async def _enqueue(platform: str, body: bytes) -> None:
+    """请求体持久化（若启用收件箱）并放入后台处理队列，队列已满时返回 503 让平台稍后重投"""
+    if not await _ingress.submit(platform, body):
+        logger.warning(f"{platform} webhook queue full, asking platform to retry")
+        raise HTTPException(status_code=503, detail="Webhook queue full")
+
+
+def _verify_feishu_signature(
+    body: bytes, timestamp: Optional[str], nonce: Optional[str], signature: Optional[str]
+) -> bool:
+    """
+    校验飞书请求签名（配置了 encrypt_key 时，缺少签名头视为校验失败）
+
+    签名算法：sha256(timestamp + nonce + encrypt_key + body) 的十六进制摘要
+    """
+    encrypt_key = get_config_manager().platforms.feishu.encrypt_key
+    if not encrypt_key:
+        return True
+    if not signature:
+        return False
+    digest = hashlib.sha256(
+        (timestamp or "").encode() + (nonce or "").encode() + encrypt_key.encode() + body
+    ).hexdigest()
+    return hmac.compare_digest(digest, signature)
+
+
+def _verify_dingtalk_signature(timestamp: Optional[str], sign: Optional[str]) -> bool:
+    """
+    校验钉钉请求签名（配置了 app_secret 时，缺少时间戳或签名头视为校验失败）
+
+    签名算法：base64(hmac_sha256(app_secret, timestamp + "\\n" + app_secret))，时间戳需在一小时内
+    """
+    app_secret = get_config_manager().platforms.dingtalk.app_secret
+    if not app_secret:
+        return True
+    if not timestamp or not sign:
+        return False
+    try:
+        if abs(time.time() * 1000 - int(timestamp)) > 3600 * 1000:
+            return False
+    except ValueError:
+        return False
+    digest = hmac.new(app_secret.encode(), f"{timestamp}\n{app_secret}".encode(), hashlib.sha256).digest()
+    return hmac.compare_digest(base64.b64encode(digest).decode(), sign)
+
+
 @router.post("/feishu")
 async def feishu_webhook(
     request: Request,
@@ -45,93 +136,46 @@ async def feishu_webhook(
     处理飞书 Webhook 回调
 
     飞书开放平台会通过 HTTP POST 向此端点推送消息事件。
+    请求内只处理 URL 验证和签名校验，事件放入队列后立即返回，由后台任务解析和分发。
     """
-    try:
-        body = await request.body()
-
-        logger.debug(f"收到飞书 Webhook 请求: {body.decode('utf-8', errors='ignore')}")
-
-        # 解析 JSON
-        event_data = json.loads(body)
-
-        # 检查是否是 URL 验证请求
+    body = await request.body()
+
+    # URL 验证请求需要同步返回 challenge
+    if b"url_verification" in body:
+        try:
+            event_data = json.loads(body)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Invalid JSON")
         if event_data.get("type") == "url_verification":
             challenge = event_data.get("challenge", "")
             logger.info(f"飞书 URL 验证请求，返回 challenge: {challenge}")
             return {"challenge": challenge}
 
-        # 处理消息事件
-        event_type = event_data.get("header", {}).get("event_type", "")
-        logger.info(f"收到飞书事件: {event_type}")
+    if not _verify_feishu_signature(body, x_lark_request_timestamp, x_lark_request_nonce, x_lark_signature):
+        raise HTTPException(status_code=401, detail="Invalid signature")
 
-        # 调用处理器（如果已注册）
-        handler = get_event_handler("feishu")
-        if handler:
-            if hasattr(handler, "handle_webhook"):
-                result = handler.handle_webhook(event_data)
-                if result:
-                    return result
-            elif callable(handler):
-                result = handler(event_data)
-                if result:
-                    return result
-
-        # 简单响应
-        return {"msg": "success"}
-
-    except json.JSONDecodeError as e:
-        logger.error(f"飞书 Webhook JSON 解析失败: {e}")
-        raise HTTPException(status_code=400, detail="Invalid JSON")
-
-    except Exception as e:
-        logger.error(f"飞书 Webhook 处理异常: {e}")
-        raise HTTPException(status_code=500, detail=f"Webhook 处理失败: {str(e)}")
+    await _enqueue("feishu", body)
+    return {"msg": "success"}
 
 
 @router.post("/wecom")
 async def wecom_webhook(request: Request):
-    """处理企业微信 Webhook 回调"""
-    try:
-        body = await request.body()
-        event_data = xml.etree.ElementTree.fromstring(body.decode('utf-8'))
-
-        msg_type = event_data.findtext("MsgType")
-        logger.info(f"收到企业微信事件: {msg_type}")
-
-        handler = get_event_handler("wecom")
-        if handler:
-            result = handler(event_data)
-            if result:
-                return result
-
-        return {"errcode": 0, "errmsg": "success"}
-
-    except Exception as e:
-        logger.error(f"企业微信 Webhook 处理异常: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    """处理企业微信 Webhook 回调（事件放入队列后立即返回）"""
+    await _enqueue("wecom", await request.body())
+    return {"errcode": 0, "errmsg": "success"}
 
 
 @router.post("/dingtalk")
-async def dingtalk_webhook(request: Request):
-    """处理钉钉 Webhook 回调"""
-    try:
-        body = await request.body()
-        event_data = json.loads(body)
-
-        msg_type = event_data.get("msgType")
-        logger.info(f"收到钉钉事件: {msg_type}")
-
-        handler = get_event_handler("dingtalk")
-        if handler:
-            result = handler(event_data)
-            if result:
-                return result
-
-        return {"errcode": 0, "errmsg": "success"}
-
-    except Exception as e:
-        logger.error(f"钉钉 Webhook 处理异常: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def dingtalk_webhook(
+    request: Request,
+    timestamp: str = Header(None),
+    sign: str = Header(None),
+):
+    """处理钉钉 Webhook 回调（校验签名，事件放入队列后立即返回）"""
+    if not _verify_dingtalk_signature(timestamp, sign):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    await _enqueue("dingtalk", await request.body())
+    return {"errcode": 0, "errmsg": "success"}
 
 
 __all__ = [
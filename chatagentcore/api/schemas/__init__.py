@@ -5,6 +5,14 @@ from chatagentcore.api.schemas.config import (
     ServerConfig,
     AuthConfig,
     LoggingConfig,
+    CircuitBreakerConfig,
+    InboundConfig,
+    InboxConfig,
+    MessageStoreConfig,
+    OutboundConfig,
+    OutboxConfig,
+    SchedulerConfig,
+    TemplateConfig,
     PlatformsConfig,
     PlatformConfig,
     FeishuConfig,
@@ -17,6 +25,14 @@ __all__ = [
     "ServerConfig",
     "AuthConfig",
     "LoggingConfig",
+    "CircuitBreakerConfig",
+    "InboundConfig",
+    "InboxConfig",
+    "MessageStoreConfig",
+    "OutboundConfig",
+    "OutboxConfig",
+    "SchedulerConfig",
+    "TemplateConfig",
     "PlatformsConfig",
     "PlatformConfig",
     "FeishuConfig",
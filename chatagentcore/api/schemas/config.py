@@ -1,6 +1,6 @@
 """Configuration schemas using Pydantic"""
 
-from typing import Literal
+from typing import Any, Dict, List, Literal, Union
 from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -24,6 +24,102 @@ class LoggingConfig(BaseModel):
     file: str = Field(default="logs/chatagentcore.log", description="日志文件路径")
     rotation: str = Field(default="10 MB", description="日志轮转大小")
     retention: str = Field(default="30 days", description="日志保留时间")
+    format: Literal["text", "json"] = Field(default="text", description="文件日志格式：text | json（JSON Lines）")
+    enqueue: bool = Field(default=True, description="日志经后台线程写入，文件 I/O 和轮转不阻塞事件循环")
+    compact_messages: bool = Field(
+        default=False, description="消息收发日志使用紧凑模式（每条消息一条结构化记录，适合生产环境）"
+    )
+    content_sample_rate: float = Field(default=1.0, ge=0, le=1, description="消息日志记录内容的比例，其余只记录长度")
+    content_max_length: int = Field(default=200, ge=0, description="消息日志中内容的最大字符数")
+    error_throttle_window: float = Field(
+        default=60.0, ge=0, description="重复错误日志归并窗口（秒），窗口内相同位置和模板的错误只输出汇总，0 表示不限流"
+    )
+
+
+class CircuitBreakerConfig(BaseModel):
+    """平台熔断配置"""
+
+    enabled: bool = Field(default=False, description="是否启用熔断（开启后平台失败率过高时暂停发送并快速失败）")
+    window_size: int = Field(default=20, ge=1, description="统计窗口大小（最近调用次数）")
+    min_calls: int = Field(default=5, ge=1, description="触发熔断所需的最少调用次数")
+    failure_rate_threshold: float = Field(default=0.5, gt=0, le=1, description="失败率阈值")
+    slow_call_duration: float = Field(default=10.0, gt=0, description="慢调用耗时阈值（秒）")
+    slow_call_rate_threshold: float = Field(default=0.8, gt=0, le=1, description="慢调用率阈值")
+    open_duration: float = Field(default=30.0, gt=0, description="熔断持续时间（秒），之后放行探测请求")
+
+
+class OutboundConfig(BaseModel):
+    """出站发送调度配置"""
+
+    concurrency: int = Field(default=16, ge=1, description="跨会话的最大并发发送数（同一会话内始终串行保序）")
+    idempotency_ttl: float = Field(default=3600.0, gt=0, description="幂等键保留时间（秒）")
+    circuit_breaker: CircuitBreakerConfig = Field(default_factory=CircuitBreakerConfig)
+    stream_interval: float = Field(default=1.0, gt=0, description="流式回复两次进度更新之间的最小间隔（秒）")
+    multicast_concurrency: int = Field(default=10, ge=1, description="群发时的最大并发请求数")
+    send_timeout: float = Field(default=30.0, gt=0, description="同步发送（wait=true）等待结果的最长时间（秒），超时后按异步提交返回")
+    coalesce_window_ms: int = Field(
+        default=0, ge=0, description="合并窗口（毫秒），窗口内发往同一会话的连续文本消息合并发送，0 表示不合并"
+    )
+
+
+class OutboxConfig(BaseModel):
+    """出站发件箱配置（持久化、重试与死信）"""
+
+    enabled: bool = Field(default=False, description="是否启用持久化发件箱")
+    path: str = Field(default="data/outbox.db", description="SQLite 数据库文件路径")
+    max_attempts: int = Field(default=5, ge=1, description="最大发送尝试次数，超过后转入死信")
+    base_delay: float = Field(default=1.0, gt=0, description="重试退避基础时长（秒）")
+    max_delay: float = Field(default=60.0, gt=0, description="重试退避最大时长（秒）")
+    batch_size: int = Field(default=100, ge=1, description="单次事务合并的最大写入数")
+    flush_interval_ms: int = Field(default=10, ge=0, description="批量写入收集窗口（毫秒）")
+
+
+class InboxConfig(BaseModel):
+    """入站收件箱配置（崩溃后重放未处理完成的入站事件）"""
+
+    enabled: bool = Field(default=False, description="是否启用持久化收件箱")
+    path: str = Field(default="data/inbox.db", description="SQLite 数据库文件路径")
+    batch_size: int = Field(default=100, ge=1, description="单次事务合并的最大写入数")
+    flush_interval_ms: int = Field(default=10, ge=0, description="批量写入收集窗口（毫秒）")
+
+
+class MessageStoreConfig(BaseModel):
+    """消息存储配置（记录收发消息，供会话列表和历史查询）"""
+
+    enabled: bool = Field(default=False, description="是否启用消息存储")
+    path: str = Field(default="data/messages.db", description="SQLite 数据库文件路径")
+    retention_days: float = Field(default=30.0, gt=0, description="消息保留天数，超过后由压缩任务删除")
+    compact_interval: float = Field(default=3600.0, gt=0, description="压缩任务执行间隔（秒）")
+    batch_size: int = Field(default=100, ge=1, description="单次事务合并的最大写入数")
+    flush_interval_ms: int = Field(default=10, ge=0, description="批量写入收集窗口（毫秒）")
+
+
+class InboundConfig(BaseModel):
+    """入站消息处理配置"""
+
+    dedup_ttl: float = Field(default=600.0, gt=0, description="入站消息去重窗口（秒），窗口内重复的消息 ID 被丢弃")
+    dedup_max_size: int = Field(default=100000, ge=1, description="去重索引最多保留的消息 ID 数")
+    concurrency: int = Field(default=16, ge=1, description="跨会话的最大并发处理数（同一会话内始终串行保序）")
+    queue_size: int = Field(default=1000, ge=1, description="入口队列容量，队列满时新消息被丢弃并计数")
+    webhook_queue_size: int = Field(default=1000, ge=1, description="Webhook 待处理队列容量，满时返回 503 让平台重投")
+    webhook_workers: int = Field(default=4, ge=1, description="Webhook 后台解析处理任务数")
+
+
+class SchedulerConfig(BaseModel):
+    """定时消息配置"""
+
+    persistent: bool = Field(default=False, description="是否持久化定时消息（重启后恢复）")
+    path: str = Field(default="data/schedule.db", description="SQLite 数据库文件路径")
+    batch_size: int = Field(default=100, ge=1, description="单批最多分发的到期消息数")
+
+
+class TemplateConfig(BaseModel):
+    """消息/卡片模板配置（启动时预编译，发送时按 template_id 引用）"""
+
+    message_type: str = Field(default="card", description="渲染结果的消息类型：card | text | markdown")
+    content: Union[str, Dict[str, Any], List[Any]] = Field(
+        ..., description="模板内容，占位符写作 {{name}}；卡片模板为 JSON 对象，占位符须位于字符串值内"
+    )
 
 
 class PlatformConfig(BaseModel):
@@ -135,6 +231,13 @@ class Settings(BaseSettings):
     server: ServerConfig = Field(default_factory=ServerConfig)
     auth: AuthConfig = Field(default_factory=AuthConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
+    inbound: InboundConfig = Field(default_factory=InboundConfig)
+    inbox: InboxConfig = Field(default_factory=InboxConfig)
+    message_store: MessageStoreConfig = Field(default_factory=MessageStoreConfig)
+    outbound: OutboundConfig = Field(default_factory=OutboundConfig)
+    outbox: OutboxConfig = Field(default_factory=OutboxConfig)
+    scheduler: SchedulerConfig = Field(default_factory=SchedulerConfig)
+    templates: Dict[str, TemplateConfig] = Field(default_factory=dict, description="消息模板（模板ID -> 模板配置）")
     platforms: PlatformsConfig = Field(default_factory=PlatformsConfig)
 
     # 可选：从 YAML 文件加载的配置路径
@@ -146,6 +249,14 @@ __all__ = [
     "ServerConfig",
     "AuthConfig",
     "LoggingConfig",
+    "CircuitBreakerConfig",
+    "InboundConfig",
+    "InboxConfig",
+    "MessageStoreConfig",
+    "OutboundConfig",
+    "OutboxConfig",
+    "SchedulerConfig",
+    "TemplateConfig",
     "PlatformsConfig",
     "PlatformConfig",
     "FeishuConfig",
@@ -1,7 +1,7 @@
 """Adapter manager for managing platform adapters"""
 
 import asyncio
-from typing import Dict, Optional, Type
+from typing import Dict, List, Optional, Type
 from loguru import logger
 from chatagentcore.adapters.base import BaseAdapter, Message
 
@@ -173,37 +173,62 @@ class AdapterManager:
             return False
 
     async def broadcast_message(
-        self, message: str, platforms: list[str] | None = None
-    ) -> Dict[str, str]:
+        self,
+        message: str,
+        platforms: list[str] | None = None,
+        recipients: Dict[str, List[str]] | None = None,
+        message_type: str = "text",
+        timeout: float = 10.0,
+    ) -> Dict[str, Dict[str, str]]:
         """
         向多个平台广播消息
 
+        各平台并发发送，每个平台独立计时，超时或失败的平台不影响其他平台，
+        总耗时约等于最慢平台的耗时。
+
         Args:
             message: 要发送的消息内容
-            platforms: 目标平台列表，None 表示所有已加载平台
+            platforms: 目标平台列表，None 表示 recipients 中的平台（未指定 recipients 时为所有已加载平台）
+            recipients: 各平台的接收者列表 {平台名: [接收者ID]}，未指定的平台发送到 "broadcast"
+            message_type: 消息类型
+            timeout: 单个平台的超时时间（秒）
 
         Returns:
-            发送结果 {平台名: 消息ID 或错误信息}
+            发送结果 {平台名: {接收者ID: 消息ID 或错误信息}}
         """
-        target_platforms = platforms or self.list_platforms()
-        results: Dict[str, str] = {}
+        recipients = recipients or {}
+        target_platforms = platforms or list(recipients) or self.list_platforms()
 
-        for platform in target_platforms:
+        async def send_to_platform(platform: str) -> Dict[str, str]:
+            targets = recipients.get(platform) or ["broadcast"]
             adapter = self.get_adapter(platform)
             if adapter is None:
-                results[platform] = "Adapter not loaded"
-                continue
+                return {to: "Adapter not loaded" for to in targets}
+
+            results: Dict[str, str] = {}
+
+            async def send_one(to: str) -> None:
+                try:
+                    results[to] = await adapter.send_message(
+                        to=to, message_type=message_type, content=message
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to broadcast to {platform}/{to}: {e}")
+                    results[to] = f"Error: {e}"
 
             try:
-                msg_id = await adapter.send_message(
-                    to="broadcast", message_type="text", content=message
+                await asyncio.wait_for(
+                    asyncio.gather(*(send_one(to) for to in targets)), timeout
                 )
-                results[platform] = msg_id
-            except Exception as e:
-                logger.error(f"Failed to broadcast to {platform}: {e}")
-                results[platform] = f"Error: {e}"
-
-        return results
+            except asyncio.TimeoutError:
+                logger.error(f"Broadcast to {platform} timed out after {timeout}s")
+            # 超时时保留已完成的结果，其余标记为超时
+            return {to: results.get(to, "Error: timeout") for to in targets}
+
+        platform_results = await asyncio.gather(
+            *(send_to_platform(platform) for platform in target_platforms)
+        )
+        return dict(zip(target_platforms, platform_results))
 
     @property
     def loaded_platforms_count(self) -> int:
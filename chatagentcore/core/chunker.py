@@ -0,0 +1,106 @@
+"""Split long outbound text into platform-sized chunks"""
+
+import re
+from typing import List, Tuple
+
+# 断句优先级：段落 > 换行 > 句末标点 > 空白；都找不到时硬切
+_BOUNDARIES = (
+    re.compile(r"\n\s*\n"),
+    re.compile(r"\n"),
+    re.compile(r"[。！？；.!?;](?=\s|$)|[。！？；]"),
+    re.compile(r"\s"),
+)
+
+_FENCE = "```"
+
+# 在窗口后半段内寻找断点，避免切出过短的分片
+_MIN_FILL = 0.5
+
+
+def _find_cut(text: str, limit: int, min_length: int = 0) -> int:
+    """在 text[:limit] 中寻找最合适的切分位置（返回切分后首段的长度，保证大于 min_length）"""
+    window = text[:limit]
+    floor = int(limit * _MIN_FILL)
+    for pattern in _BOUNDARIES:
+        cut = -1
+        for match in pattern.finditer(window):
+            if match.end() >= floor:
+                cut = match.end()
+        if cut > min_length:
+            return cut
+    return limit
+
+
+def _open_fence(chunk: str) -> str:
+    """返回 chunk 末尾未闭合代码块的重新打开标记（``` 加语言标识），代码块均已闭合时返回空串"""
+    fences = [line.strip() for line in chunk.split("\n") if line.lstrip().startswith(_FENCE)]
+    if len(fences) % 2 == 0:
+        return ""
+    # 只沿用 info string 的第一个词（语言），起始行上的其余内容不重复到后续分片
+    info = fences[-1][len(_FENCE):].split(None, 1)
+    return _FENCE + (info[0] if info else "")
+
+
+def _take_chunk(text: str, max_length: int, min_length: int) -> Tuple[str, str]:
+    """
+    从 text 开头取出一个分片
+
+    Returns:
+        (分片, 需要在下一片重新打开的代码块标记；代码块已闭合时为空串)
+    """
+    chunk = text[:_find_cut(text, max_length, min_length)]
+    fence = _open_fence(chunk)
+    if fence:
+        # 切分点在代码块内：预留结束标记的空间后重新切分
+        chunk = text[:_find_cut(text, max_length - len(_FENCE) - 1, min_length)]
+        fence = _open_fence(chunk)
+    if len(chunk) <= min_length:
+        # 无法在重新打开标记之后取到新内容：硬切且不再补代码块标记，保证每轮都消耗输入
+        return text[:max_length], ""
+    if fence and len(fence) + 1 > max_length // 4:
+        # 重新打开标记过长（语言标识异常）时只用 ```，避免挤占后续分片
+        fence = _FENCE if len(_FENCE) + 1 <= max_length // 4 else ""
+    return chunk, fence + "\n" if fence else ""
+
+
+def split_text(text: str, max_length: int) -> List[str]:
+    """
+    按平台长度限制切分长文本
+
+    优先在段落、换行、句末处切分，保证每个分片不超过 max_length。
+    切分点落在 Markdown 代码块内时，会在当前分片末尾补上结束标记，
+    并在下一分片开头重新打开代码块，使每个分片都能独立渲染。
+
+    Args:
+        text: 原始文本
+        max_length: 单个分片的最大字符数
+
+    Returns:
+        分片列表（文本不超长时只有一个元素）
+    """
+    if max_length <= 0 or len(text) <= max_length:
+        return [text]
+
+    chunks: List[str] = []
+    reopen = ""
+    rest = text
+    while rest:
+        rest = reopen + rest
+        if len(rest) <= max_length:
+            chunks.append(rest)
+            break
+
+        chunk, reopen = _take_chunk(rest, max_length, len(reopen))
+        rest = rest[len(chunk):]
+        if reopen:
+            # 代码块未闭合：本片补结束标记，下一片沿用原语言标记重新打开
+            chunk = chunk.rstrip("\n") + "\n" + _FENCE
+
+        chunk = chunk.strip("\n")
+        if chunk:
+            chunks.append(chunk)
+        rest = rest.lstrip("\n")
+    return chunks
+
+
+__all__ = ["split_text"]
@@ -0,0 +1,173 @@
+"""Circuit breaker for platform send calls"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+from loguru import logger
+
+# 熔断器状态
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，请求被快速拒绝"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit open for {name}, retry after {retry_after:.1f}s")
+
+
+class CircuitBreaker:
+    """熔断器 - 平台异常时快速失败，避免请求堆积在超时上
+
+    - closed: 正常放行，在最近 window_size 次调用的滑动窗口上统计失败率和慢调用率，
+      调用数达到 min_calls 且任一比例超过阈值时打开
+    - open: 直接拒绝请求，open_duration 秒后进入 half_open
+    - half_open: 只放行一个探测请求，成功则关闭，失败则重新打开
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_duration: float = 10.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_duration: float = 30.0,
+    ):
+        """
+        初始化熔断器
+
+        Args:
+            name: 名称（通常为平台名）
+            window_size: 滑动窗口大小（调用次数）
+            min_calls: 触发熔断所需的最少调用次数
+            failure_rate_threshold: 失败率阈值
+            slow_call_duration: 慢调用耗时阈值（秒）
+            slow_call_rate_threshold: 慢调用率阈值
+            open_duration: 打开状态持续时间（秒），之后进入半开状态
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_duration = open_duration
+        # (是否失败, 是否慢调用)
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = CIRCUIT_CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """当前状态（open 超时后自动视为 half_open）"""
+        if self._state == CIRCUIT_OPEN and time.monotonic() - self._opened_at >= self.open_duration:
+            self._state = CIRCUIT_HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """距离进入半开状态的剩余秒数"""
+        if self._state != CIRCUIT_OPEN:
+            return 0.0
+        return max(0.0, self.open_duration - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """
+        判断是否放行本次调用
+
+        Returns:
+            True 表示放行；放行后必须调用 record 或 release
+        """
+        state = self.state
+        if state == CIRCUIT_CLOSED:
+            return True
+        if state == CIRCUIT_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def check(self) -> None:
+        """
+        放行检查，不放行时抛出异常
+
+        Raises:
+            CircuitOpenError: 熔断器打开
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after)
+
+    def record(self, duration: float, success: bool) -> None:
+        """
+        记录一次调用结果
+
+        Args:
+            duration: 调用耗时（秒）
+            success: 是否成功
+        """
+        slow = duration >= self.slow_call_duration
+
+        if self._state == CIRCUIT_HALF_OPEN:
+            self._probe_in_flight = False
+            if success and not slow:
+                self._close()
+            else:
+                self._open("probe failed" if not success else "probe slow")
+            return
+
+        self._window.append((not success, slow))
+        if self._state == CIRCUIT_CLOSED and len(self._window) >= self.min_calls:
+            calls = len(self._window)
+            failure_rate = sum(1 for failed, _ in self._window if failed) / calls
+            slow_rate = sum(1 for _, is_slow in self._window if is_slow) / calls
+            if failure_rate >= self.failure_rate_threshold:
+                self._open(f"failure rate {failure_rate:.0%}")
+            elif slow_rate >= self.slow_call_rate_threshold:
+                self._open(f"slow call rate {slow_rate:.0%}")
+
+    def release(self) -> None:
+        """放弃本次调用（如被取消），不计入统计"""
+        if self._state == CIRCUIT_HALF_OPEN:
+            self._probe_in_flight = False
+
+    def _open(self, reason: str) -> None:
+        self._state = CIRCUIT_OPEN
+        self._opened_at = time.monotonic()
+        self._window.clear()
+        logger.warning(f"Circuit breaker for {self.name} opened ({reason}), retry in {self.open_duration:.0f}s")
+
+    def _close(self) -> None:
+        self._state = CIRCUIT_CLOSED
+        self._window.clear()
+        logger.info(f"Circuit breaker for {self.name} closed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取状态快照
+
+        Returns:
+            状态字典
+        """
+        calls = len(self._window)
+        return {
+            "state": self.state,
+            "calls": calls,
+            "failure_rate": round(sum(1 for failed, _ in self._window if failed) / calls, 3) if calls else 0.0,
+            "slow_rate": round(sum(1 for _, slow in self._window if slow) / calls, 3) if calls else 0.0,
+            "retry_after": round(self.retry_after, 1),
+        }
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "CIRCUIT_CLOSED",
+    "CIRCUIT_OPEN",
+    "CIRCUIT_HALF_OPEN",
+]
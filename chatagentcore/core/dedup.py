@@ -0,0 +1,116 @@
+"""Inbound message de-duplication with a bounded, time-bucketed ID index"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Set, Tuple
+
+# 切分 TTL 的桶数：过期时整桶丢弃，无需逐条清理
+_BUCKETS = 10
+
+
+class InboundDeduplicator:
+    """入站消息去重
+
+    以 (platform, message_id) 为键记录最近 ttl 秒内见过的消息。
+    ID 按时间分桶保存，最旧的桶整体过期丢弃；总量超过 max_size 时提前丢弃最旧的桶，
+    内存始终有界。平台重试、重连重投和游标重放带来的重复消息在此被丢弃，
+    不再触发下游处理。
+
+    可在任意线程中调用。
+    """
+
+    def __init__(self, ttl: float = 600.0, max_size: int = 100000):
+        """
+        初始化去重器
+
+        Args:
+            ttl: 消息 ID 保留时间（秒）
+            max_size: 最多保留的消息 ID 数
+        """
+        self._lock = threading.Lock()
+        # (桶起始时间, 桶内消息键集合)，最新的桶在右端
+        self._buckets: Deque[Tuple[float, Set[Tuple[str, str]]]] = deque()
+        self._size = 0
+        self.configure(ttl, max_size)
+
+    def configure(self, ttl: float, max_size: int) -> None:
+        """
+        调整保留时间和容量（已登记的消息 ID 保留）
+
+        Args:
+            ttl: 消息 ID 保留时间（秒）
+            max_size: 最多保留的消息 ID 数
+        """
+        with self._lock:
+            self.ttl = ttl
+            self.max_size = max_size
+            self._bucket_span = ttl / _BUCKETS
+
+    def seen(self, platform: str, message_id: str) -> bool:
+        """
+        检查消息是否重复，并登记本条消息
+
+        Args:
+            platform: 平台名称
+            message_id: 平台消息 ID
+
+        Returns:
+            True 表示该消息在保留期内已出现过（应丢弃）
+        """
+        if not message_id:
+            return False
+        key = (platform, message_id)
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            for _, ids in self._buckets:
+                if key in ids:
+                    return True
+            if not self._buckets or now - self._buckets[-1][0] >= self._bucket_span:
+                self._buckets.append((now, set()))
+            self._buckets[-1][1].add(key)
+            self._size += 1
+            return False
+
+    def forget(self, platform: str, message_id: str) -> None:
+        """
+        撤销登记（消息未能进入处理流程时调用，平台重投的副本不再被当作重复丢弃）
+
+        Args:
+            platform: 平台名称
+            message_id: 平台消息 ID
+        """
+        key = (platform, message_id)
+        with self._lock:
+            for _, ids in self._buckets:
+                if key in ids:
+                    ids.discard(key)
+                    self._size -= 1
+                    return
+
+    def _evict(self, now: float) -> None:
+        """丢弃过期或超出容量的旧桶"""
+        while self._buckets and (
+            now - self._buckets[0][0] >= self.ttl + self._bucket_span or self._size > self.max_size
+        ):
+            _, ids = self._buckets.popleft()
+            self._size -= len(ids)
+
+    def __len__(self) -> int:
+        return self._size
+
+
+# 全局去重器实例
+_deduplicator: InboundDeduplicator | None = None
+
+
+def get_deduplicator() -> InboundDeduplicator:
+    """获取全局入站去重器实例"""
+    global _deduplicator
+    if _deduplicator is None:
+        _deduplicator = InboundDeduplicator()
+    return _deduplicator
+
+
+__all__ = ["InboundDeduplicator", "get_deduplicator"]
@@ -0,0 +1,78 @@
+"""Idempotency cache for suppressing duplicate sends"""
+
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from chatagentcore.core.send_jobs import SendJob, JOB_FAILED
+
+
+class IdempotencyCache:
+    """幂等键缓存 - 有界 TTL 缓存，记录每个幂等键对应的发送任务
+
+    同一幂等键的重复请求直接复用已登记的任务：
+    - 任务进行中时，重复请求等待同一任务完成（single-flight）
+    - 任务已成功时，重复请求直接得到缓存的结果
+
+    发送失败的任务不会被复用，客户端可以用同一幂等键重试。
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 3600.0):
+        """
+        初始化幂等缓存
+
+        Args:
+            max_size: 最多保留的幂等键数
+            ttl: 幂等键保留时间（秒）
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, SendJob]]" = OrderedDict()
+
+    def get(self, platform: str, key: str) -> Optional[SendJob]:
+        """
+        获取幂等键对应的任务
+
+        Args:
+            platform: 平台名称
+            key: 幂等键
+
+        Returns:
+            可复用的任务，不存在、已过期或已失败则返回 None
+        """
+        self._evict()
+        entry = self._entries.get((platform, key))
+        if entry is None:
+            return None
+        job = entry[1]
+        if job.status == JOB_FAILED:
+            del self._entries[(platform, key)]
+            return None
+        return job
+
+    def put(self, platform: str, key: str, job: SendJob) -> None:
+        """
+        登记幂等键对应的任务
+
+        Args:
+            platform: 平台名称
+            key: 幂等键
+            job: 发送任务
+        """
+        self._entries[(platform, key)] = (time.time(), job)
+        self._entries.move_to_end((platform, key))
+        self._evict()
+
+    def _evict(self) -> None:
+        """淘汰过期或超出容量的幂等键"""
+        deadline = time.time() - self.ttl
+        while self._entries:
+            created_at, _ = next(iter(self._entries.values()))
+            if created_at >= deadline and len(self._entries) <= self.max_size:
+                break
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+__all__ = ["IdempotencyCache"]
@@ -0,0 +1,194 @@
+"""Bounded inbound message pipeline with conversation-keyed workers"""
+
+import asyncio
+import inspect
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Hashable, List, Optional, Union
+from loguru import logger
+from chatagentcore.adapters.base import Message
+from chatagentcore.core.lanes import KeyedWorkerPool
+from chatagentcore.core.metrics import get_metrics
+
+if TYPE_CHECKING:
+    from chatagentcore.storage.inbox import InboxStore
+
+InboundHandler = Callable[[Message], Union[None, Awaitable[None]]]
+
+
+class InboundPipeline:
+    """入站消息管道
+
+    所有适配器收到的消息统一进入有界入口队列，再按 (平台, 会话 ID) 分道交给工作池处理：
+    同一会话内按到达顺序串行处理，不同会话并行处理，总并发受 max_concurrency 限制。
+    突发流量被队列吸收并以受控速率处理，不再为每条消息创建无界任务。
+
+    队列已满时，put 等待空位（适合长轮询等可以放慢的生产者），
+    put_nowait 直接丢弃并计数（适合平台回调等不能阻塞的生产者）。
+
+    配置收件箱后，入队的消息先登记到收件箱，处理器结束后删除，
+    进程崩溃时未处理完成的消息在下次启动时通过 recover 重放（至少一次语义）。
+    """
+
+    def __init__(
+        self,
+        handler: Optional[InboundHandler] = None,
+        max_concurrency: int = 16,
+        queue_size: int = 1000,
+    ):
+        """
+        初始化管道
+
+        Args:
+            handler: 消息处理函数（同步函数或协程函数）
+            max_concurrency: 同时处理的最大消息数（跨所有会话）
+            queue_size: 入口队列容量（排队和处理中的消息总数上限）
+        """
+        self._handler = handler
+        self.queue_size = queue_size
+        self._pool = self._create_pool(max_concurrency)
+        self._pending = 0
+        self._space = asyncio.Event()
+        self._space.set()
+        self._inbox: Optional["InboxStore"] = None
+
+    def set_handler(self, handler: InboundHandler) -> None:
+        """
+        设置消息处理函数
+
+        Args:
+            handler: 消息处理函数（同步函数或协程函数）
+        """
+        self._handler = handler
+
+    def configure(self, max_concurrency: int, queue_size: int) -> None:
+        """
+        调整并发数和队列容量（需在接收消息前调用）
+
+        Args:
+            max_concurrency: 同时处理的最大消息数
+            queue_size: 入口队列容量
+        """
+        self.queue_size = queue_size
+        self._pool = self._create_pool(max_concurrency)
+
+    def configure_inbox(self, inbox: Optional["InboxStore"]) -> None:
+        """
+        设置持久化收件箱
+
+        Args:
+            inbox: 收件箱存储，None 表示仅在内存中排队
+        """
+        self._inbox = inbox
+
+    def _create_pool(self, max_concurrency: int) -> KeyedWorkerPool:
+        return KeyedWorkerPool(self._process, max_concurrency=max_concurrency, name="inbound")
+
+    @staticmethod
+    def _key(message: Message) -> Hashable:
+        """会话分道键"""
+        return message.platform, message.conversation.get("id", "")
+
+    async def put(self, message: Message) -> None:
+        """
+        提交消息，队列已满时等待空位
+
+        Args:
+            message: 入站消息
+        """
+        while self._pending >= self.queue_size:
+            self._space.clear()
+            await self._space.wait()
+        self._enqueue(message)
+
+    def put_nowait(self, message: Message) -> bool:
+        """
+        提交消息，队列已满时丢弃
+
+        Args:
+            message: 入站消息
+
+        Returns:
+            是否已入队
+        """
+        if self._pending >= self.queue_size:
+            get_metrics().inc("chatagentcore_inbound_dropped_total", platform=message.platform)
+            logger.warning(f"Inbound queue full ({self.queue_size}), dropped {message.platform}/{message.message_id}")
+            return False
+        self._enqueue(message)
+        return True
+
+    def _enqueue(self, message: Message, persist: bool = True) -> None:
+        if persist and self._inbox is not None:
+            self._inbox.add_message(message)
+        self._pending += 1
+        get_metrics().set_gauge("chatagentcore_inbound_queue_depth", self._pending)
+        self._pool.submit(self._key(message), (message, time.monotonic()))
+
+    async def _process(self, item: Any) -> None:
+        """处理单条消息（由工作池调用）"""
+        message, enqueued_at = item
+        metrics = get_metrics()
+        metrics.observe("chatagentcore_inbound_wait_seconds", time.monotonic() - enqueued_at)
+        cancelled = False
+        try:
+            if self._handler is not None:
+                result = self._handler(message)
+                if inspect.isawaitable(result):
+                    await result
+        except asyncio.CancelledError:
+            # 停止时被取消：消息保留在收件箱中，下次启动重放
+            cancelled = True
+            raise
+        finally:
+            if self._inbox is not None and not cancelled:
+                self._inbox.remove_message(message)
+            self._pending -= 1
+            metrics.set_gauge("chatagentcore_inbound_queue_depth", self._pending)
+            self._space.set()
+
+    @property
+    def pending(self) -> int:
+        """排队和处理中的消息数"""
+        return self._pending
+
+    async def flush(self) -> None:
+        """等待已入队消息在收件箱中落盘（未配置收件箱时立即返回）"""
+        if self._inbox is not None:
+            await self._inbox.flush()
+
+    async def recover(self) -> List[Message]:
+        """
+        重放收件箱中未处理完成的消息（启动时调用）
+
+        Returns:
+            重放的消息列表
+        """
+        if self._inbox is None:
+            return []
+        messages = await self._inbox.list_messages()
+        for message in messages:
+            self._enqueue(message, persist=False)
+        if messages:
+            logger.info(f"Replaying {len(messages)} unfinished inbound message(s) from inbox")
+        return messages
+
+    async def stop(self) -> None:
+        """停止处理并丢弃排队中的消息"""
+        await self._pool.stop()
+        self._pending = 0
+        self._space.set()
+
+
+# 全局入站管道实例
+_inbound_pipeline: InboundPipeline | None = None
+
+
+def get_inbound_pipeline() -> InboundPipeline:
+    """获取全局入站管道实例"""
+    global _inbound_pipeline
+    if _inbound_pipeline is None:
+        _inbound_pipeline = InboundPipeline()
+    return _inbound_pipeline
+
+
+__all__ = ["InboundPipeline", "get_inbound_pipeline"]
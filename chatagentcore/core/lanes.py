@@ -0,0 +1,198 @@
+"""Keyed worker pool - ordered within a key, parallel across keys"""
+
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+from loguru import logger
+
+
+class PriorityGate:
+    """带优先级的并发闸门
+
+    与 asyncio.Semaphore 类似，但名额不足时按优先级（高者先，同级先到先得）唤醒等待者。
+    """
+
+    def __init__(self, limit: int):
+        """
+        初始化闸门
+
+        Args:
+            limit: 最大并发数
+        """
+        self.limit = limit
+        self._active = 0
+        self._counter = itertools.count()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+
+    async def acquire(self, priority: int = 0) -> None:
+        """
+        获取一个名额
+
+        Args:
+            priority: 优先级，数值越大越先获得名额
+        """
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 已分配名额但等待者被取消时归还名额；未分配的等待项在唤醒时跳过
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """归还名额，并唤醒优先级最高的等待者"""
+        self._active -= 1
+        while self._waiters and self._active < self.limit:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._active += 1
+            future.set_result(None)
+
+    def reclaim(self) -> None:
+        """立即占回一个名额（不等待，可能暂时超出上限），用于与已登记的 release 配对"""
+        self._active += 1
+
+    @property
+    def waiting(self) -> int:
+        """等待名额的数量"""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+
+class KeyedWorkerPool:
+    """按键分道的工作池
+
+    每个键（如 (平台, 会话 ID)）对应一条 FIFO 通道，同一通道内的任务严格按提交顺序串行处理，
+    不同通道之间并行处理，总并发数受 max_concurrency 限制。
+    并发名额不足时，队首任务优先级高的通道先获得名额。
+    通道只在有待处理任务时存在，处理完毕即回收，空闲键不占用资源。
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        max_concurrency: int = 16,
+        name: str = "pool",
+        priority: Optional[Callable[[Any], int]] = None,
+    ):
+        """
+        初始化工作池
+
+        Args:
+            handler: 任务处理协程函数，接收提交的任务对象
+            max_concurrency: 同时处理的最大任务数（跨所有通道）
+            name: 名称（用于日志）
+            priority: 获取任务优先级的函数（可选，默认所有任务同级）
+        """
+        self._handler = handler
+        self._name = name
+        self._priority = priority
+        self._gate = PriorityGate(max_concurrency)
+        self._lanes: Dict[Hashable, Deque[Any]] = {}
+        self._workers: Dict[Hashable, asyncio.Task] = {}
+        self.max_concurrency = max_concurrency
+
+    def submit(self, key: Hashable, item: Any) -> None:
+        """
+        提交任务到指定通道
+
+        Args:
+            key: 通道键
+            item: 任务对象
+        """
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = deque()
+        lane.append(item)
+
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._run_lane(key, lane))
+
+    def take(self, key: Hashable, predicate: Callable[[Any], bool]) -> List[Any]:
+        """
+        从通道队首取出连续满足条件的待处理任务
+
+        Args:
+            key: 通道键
+            predicate: 判断函数，遇到第一个不满足的任务即停止
+
+        Returns:
+            取出的任务列表（按原顺序）
+        """
+        lane = self._lanes.get(key)
+        taken: List[Any] = []
+        while lane and predicate(lane[0]):
+            taken.append(lane.popleft())
+        return taken
+
+    async def _run_lane(self, key: Hashable, lane: Deque[Any]) -> None:
+        """串行处理单个通道中的任务，通道清空后退出"""
+        try:
+            while lane:
+                item = lane.popleft()
+                await self._gate.acquire(self._priority(item) if self._priority else 0)
+                try:
+                    await self._handler(item)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"[{self._name}] Error processing item on lane {key}: {e}")
+                finally:
+                    self._gate.release()
+        finally:
+            self._workers.pop(key, None)
+            if not lane:
+                self._lanes.pop(key, None)
+
+    async def sleep(self, delay: float, priority: int = 0) -> None:
+        """
+        在处理任务期间等待（如重试退避），等待期间归还并发名额
+
+        只能在 handler 内调用。通道本身仍被占用（同一通道的后续任务继续排队保序），
+        但其他通道可以使用归还的名额；等待结束后按优先级重新获取名额。
+
+        Args:
+            delay: 等待时长（秒）
+            priority: 重新获取名额时的优先级
+        """
+        self._gate.release()
+        held = False
+        try:
+            await asyncio.sleep(delay)
+            await self._gate.acquire(priority)
+            held = True
+        finally:
+            if not held:
+                # 等待中被取消：占回名额，与 _run_lane 中的 release 配对
+                self._gate.reclaim()
+
+    @property
+    def pending(self) -> int:
+        """等待处理的任务数（不含正在处理的任务）"""
+        return sum(len(lane) for lane in self._lanes.values())
+
+    @property
+    def active_lanes(self) -> int:
+        """当前活跃的通道数"""
+        return len(self._workers)
+
+    async def stop(self) -> None:
+        """取消所有通道的处理任务并清空队列"""
+        workers = list(self._workers.values())
+        for task in workers:
+            task.cancel()
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+        self._lanes.clear()
+
+
+__all__ = ["KeyedWorkerPool", "PriorityGate"]
@@ -0,0 +1,143 @@
+"""In-process metrics registry with Prometheus text export"""
+
+import threading
+from typing import Dict, List, Tuple
+
+# (指标名, ((标签名, 标签值), ...))
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, str]) -> MetricKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format(name: str, labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f'{k}="{v}"' for k, v in labels)
+    return f"{name}{{{rendered}}}"
+
+
+class Metrics:
+    """进程内指标注册表
+
+    支持计数器（counter）、仪表（gauge）和汇总（summary：次数、总和、最大值），
+    可在任意线程中更新，导出为 Prometheus 文本格式。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[MetricKey, float] = {}
+        self._gauges: Dict[MetricKey, float] = {}
+        # [次数, 总和, 最大值]
+        self._summaries: Dict[MetricKey, List[float]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """
+        计数器累加
+
+        Args:
+            name: 指标名
+            value: 增量
+            labels: 标签
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """
+        设置仪表值
+
+        Args:
+            name: 指标名
+            value: 当前值
+            labels: 标签
+        """
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        记录一次观测值（如耗时）
+
+        Args:
+            name: 指标名
+            value: 观测值
+            labels: 标签
+        """
+        key = _key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                self._summaries[key] = [1, value, value]
+            else:
+                summary[0] += 1
+                summary[1] += value
+                summary[2] = max(summary[2], value)
+
+    def get(self, name: str, **labels: str) -> float:
+        """
+        获取计数器或仪表的当前值
+
+        Args:
+            name: 指标名
+            labels: 标签
+
+        Returns:
+            当前值，不存在返回 0
+        """
+        key = _key(name, labels)
+        with self._lock:
+            return self._counters.get(key, self._gauges.get(key, 0))
+
+    def render(self) -> str:
+        """
+        导出为 Prometheus 文本格式
+
+        Returns:
+            指标文本
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            summaries = sorted((key, list(value)) for key, value in self._summaries.items())
+
+        lines: List[str] = []
+        typed = set()
+
+        def declare(name: str, kind: str) -> None:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            declare(name, "counter")
+            lines.append(f"{_format(name, labels)} {value:g}")
+        for (name, labels), value in gauges:
+            declare(name, "gauge")
+            lines.append(f"{_format(name, labels)} {value:g}")
+        for (name, labels), (count, total, _) in summaries:
+            declare(name, "summary")
+            lines.append(f"{_format(name + '_count', labels)} {count:g}")
+            lines.append(f"{_format(name + '_sum', labels)} {total:g}")
+        # 最大值不属于 summary 规范，单独导出为 gauge
+        for (name, labels), (_, _, peak) in summaries:
+            declare(name + "_max", "gauge")
+            lines.append(f"{_format(name + '_max', labels)} {peak:g}")
+        return "\n".join(lines) + "\n"
+
+
+# 全局指标注册表实例
+_metrics: Metrics | None = None
+
+
+def get_metrics() -> Metrics:
+    """获取全局指标注册表实例"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+__all__ = ["Metrics", "get_metrics"]
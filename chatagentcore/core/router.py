@@ -1,25 +1,161 @@
 """Message router for routing messages to correct adapters"""
 
 import asyncio
+import random
+import time
 import uuid
-from typing import Dict, Optional
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from loguru import logger
 from chatagentcore.core.adapter_manager import AdapterManager, get_adapter_manager
+from chatagentcore.core.chunker import split_text
+from chatagentcore.core.circuit_breaker import CircuitBreaker
+from chatagentcore.core.event_bus import get_event_bus
+from chatagentcore.core.idempotency import IdempotencyCache
+from chatagentcore.core.lanes import KeyedWorkerPool
+from chatagentcore.core.send_jobs import SendJob, SendJobStore
+
+if TYPE_CHECKING:
+    from chatagentcore.adapters.stream import ReplyStream
+    from chatagentcore.storage.message_store import MessageStore
+    from chatagentcore.storage.outbox import OutboxStore
+
+
+@dataclass
+class RetryPolicy:
+    """发送重试策略（带抖动的指数退避）"""
+
+    max_attempts: int = 1
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+
+    def backoff(self, attempt: int) -> float:
+        """
+        计算第 attempt 次失败后的等待时间
+
+        Args:
+            attempt: 已尝试次数（从 1 开始）
+
+        Returns:
+            等待秒数，取 [d/2, d] 之间的随机值，d 为指数退避上限
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(delay / 2, delay)
+
+
+# 这些异常表示请求本身有误（如平台未加载、参数错误），重试没有意义
+_PERMANENT_ERRORS = (ValueError, TypeError, NotImplementedError)
+
+
+# 可以按长度切分发送的消息类型
+_CHUNKABLE_TYPES = ("text", "markdown")
+
+# 合并发送时消息之间的分隔符
+_COALESCE_SEPARATOR = "\n"
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    判断发送异常是否可重试
+
+    Args:
+        error: 发送时抛出的异常
+
+    Returns:
+        True 表示临时错误，可以重试
+    """
+    return not isinstance(error, _PERMANENT_ERRORS)
+
+
+class SubmitError(Exception):
+    """发送任务登记失败（如发件箱写入失败），任务已被标记为失败"""
+
+    def __init__(self, job: SendJob, error: str):
+        self.job = job
+        super().__init__(error)
 
 
 class MessageRouter:
     """消息路由器 - 负责将消息路由到正确的适配器"""
 
-    def __init__(self, adapter_manager: AdapterManager):
+    def __init__(self, adapter_manager: AdapterManager, concurrency: int = 16):
         """
         初始化消息路由器
 
         Args:
             adapter_manager: 适配器管理器实例
+            concurrency: 出站发送的最大并发数
         """
         self.adapter_manager = adapter_manager
         self._pending_messages: Dict[str, asyncio.Future] = {}
         self._running = False
+        self.jobs = SendJobStore()
+        # 出站通道：按 (平台, 接收者) 分道，同一会话内保序，不同会话并行，高优先级通道先发送
+        self._lanes = self._create_lanes(concurrency)
+        self.idempotency = IdempotencyCache()
+        # 每个平台一个熔断器，None 表示禁用熔断
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breaker_options: Optional[Dict[str, Any]] = None
+        self.retry_policy = RetryPolicy()
+        # 流式回复两次进度更新之间的最小间隔（秒）
+        self.stream_interval = 1.0
+        # 合并窗口（秒）：窗口内发往同一会话的连续文本消息合并为一次发送，0 表示不合并
+        self.coalesce_window = 0.0
+        # 群发时的最大并发请求数
+        self.multicast_concurrency = 10
+        # 同步发送（wait=true）等待任务结束的最长时间（秒）
+        self.send_timeout = 30.0
+        self.outbox: Optional["OutboxStore"] = None
+        # 消息存储，发送成功的消息写入其中（None 表示不记录）
+        self.message_store: Optional["MessageStore"] = None
+
+    def configure_outbox(self, outbox: "OutboxStore", retry_policy: RetryPolicy) -> None:
+        """
+        启用持久化发件箱
+
+        Args:
+            outbox: 已打开的发件箱存储
+            retry_policy: 重试策略
+        """
+        self.outbox = outbox
+        self.retry_policy = retry_policy
+
+    def configure_circuit_breakers(self, enabled: bool = True, **options: Any) -> None:
+        """
+        配置平台熔断器（已有熔断器会被重置）
+
+        Args:
+            enabled: 是否启用熔断
+            **options: CircuitBreaker 参数
+        """
+        self._breaker_options = options if enabled else None
+        self._breakers.clear()
+
+    def get_breaker(self, platform: str) -> Optional[CircuitBreaker]:
+        """
+        获取平台的熔断器（按需创建）
+
+        Args:
+            platform: 平台名称
+
+        Returns:
+            熔断器，禁用熔断时返回 None
+        """
+        if self._breaker_options is None:
+            return None
+        breaker = self._breakers.get(platform)
+        if breaker is None:
+            breaker = self._breakers[platform] = CircuitBreaker(platform, **self._breaker_options)
+        return breaker
+
+    def get_breaker_states(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取所有平台熔断器的状态
+
+        Returns:
+            {平台名: 状态快照}
+        """
+        return {platform: breaker.snapshot() for platform, breaker in self._breakers.items()}
 
     async def route_outgoing(
         self, platform: str, to: str, message_type: str, content: str, conversation_type: str = "user"
@@ -39,6 +175,7 @@ class MessageRouter:
 
         Raises:
             ValueError: 平台未加载
+            CircuitOpenError: 平台熔断中
         """
         logger.debug(f"Routing outgoing message to platform: {platform}, to: {to}")
 
@@ -46,14 +183,382 @@ class MessageRouter:
         if adapter is None:
             raise ValueError(f"Adapter not loaded for platform: {platform}")
 
+        breaker = self.get_breaker(platform)
+        if breaker is not None:
+            breaker.check()
+
+        start = time.monotonic()
         try:
             message_id = await adapter.send_message(to, message_type, content, conversation_type)
-            logger.info(f"Message sent: {message_id}")
-            return message_id
+        except asyncio.CancelledError:
+            if breaker is not None:
+                breaker.release()
+            raise
         except Exception as e:
+            if breaker is not None:
+                # 参数类错误说明平台本身可用，不计为平台故障
+                breaker.record(time.monotonic() - start, success=not is_transient_error(e))
             logger.error(f"Error sending message to {platform}: {e}")
             raise
 
+        if breaker is not None:
+            breaker.record(time.monotonic() - start, success=True)
+        logger.info(f"Message sent: {message_id}")
+        return message_id
+
+    def open_stream(self, platform: str, to: str, conversation_type: str = "user") -> "ReplyStream":
+        """
+        打开流式回复
+
+        Args:
+            platform: 平台名称
+            to: 接收者 ID
+            conversation_type: 会话类型 user | group
+
+        Returns:
+            流式回复对象，由调用方 append 增量文本并在结束时 finish
+
+        Raises:
+            ValueError: 平台未加载
+        """
+        adapter = self.adapter_manager.get_adapter(platform)
+        if adapter is None:
+            raise ValueError(f"Adapter not loaded for platform: {platform}")
+        return adapter.open_stream(to, conversation_type, self.stream_interval)
+
+    async def multicast(
+        self,
+        platform: str,
+        recipients: List[str],
+        message_type: str,
+        content: str,
+        conversation_type: str = "user",
+    ) -> Dict[str, str]:
+        """
+        向同一平台的多个接收者群发同一条消息
+
+        优先使用平台的批量发送接口，不支持时以有限并发逐个发送。
+
+        Args:
+            platform: 平台名称
+            recipients: 接收者 ID 列表（重复的 ID 只发送一次）
+            message_type: 消息类型
+            content: 消息内容
+            conversation_type: 会话类型 user | group
+
+        Returns:
+            发送结果 {接收者ID: 消息ID 或 "Error: ..."}
+
+        Raises:
+            ValueError: 平台未加载
+        """
+        adapter = self.adapter_manager.get_adapter(platform)
+        if adapter is None:
+            raise ValueError(f"Adapter not loaded for platform: {platform}")
+
+        recipients = list(dict.fromkeys(recipients))
+        logger.info(f"Multicasting to {len(recipients)} recipients on {platform}")
+        return await adapter.send_batch(
+            recipients, message_type, content, conversation_type, self.multicast_concurrency
+        )
+
+    async def submit(
+        self,
+        platform: str,
+        to: str,
+        message_type: str,
+        content: str,
+        conversation_type: str = "user",
+        idempotency_key: Optional[str] = None,
+        priority: int = 0,
+        deadline: Optional[float] = None,
+    ) -> SendJob:
+        """
+        提交异步发送任务，立即返回任务对象
+
+        启用发件箱时，任务会先持久化再分发。
+        指定幂等键时，同一平台下相同幂等键的重复提交返回已有任务，不会重复发送。
+        指定截止时间时，到期仍未发出的任务会被放弃（状态为 expired）。
+
+        Args:
+            platform: 平台名称
+            to: 接收者 ID
+            message_type: 消息类型 text | image | card
+            content: 消息内容
+            conversation_type: 会话类型 user | group
+            idempotency_key: 幂等键（可选）
+            priority: 优先级，数值越大越先发送
+            deadline: 截止时间（Unix 时间戳，可选）
+
+        Returns:
+            已登记的发送任务（新任务状态为 queued）
+
+        Raises:
+            SubmitError: 发件箱写入失败（任务已标记为失败）
+        """
+        if idempotency_key:
+            existing = self.idempotency.get(platform, idempotency_key)
+            if existing is not None:
+                logger.info(f"Duplicate send suppressed by idempotency key {idempotency_key}: {existing.job_id}")
+                return existing
+
+        job = self.jobs.create(
+            platform, to, message_type, content, conversation_type, priority=priority, deadline=deadline
+        )
+        if idempotency_key:
+            # 在任何 await 之前登记，保证并发的重复请求拿到同一个任务
+            self.idempotency.put(platform, idempotency_key, job)
+        if self.outbox is not None:
+            try:
+                await self.outbox.add(job)
+            except Exception as e:
+                # 持久化失败：任务标记为失败（幂等键随之失效，客户端可重试），并唤醒等待方
+                self.jobs.mark_failed(job, f"outbox write failed: {e}")
+                raise SubmitError(job, job.error) from e
+        self._dispatch(job)
+        return job
+
+    def set_concurrency(self, concurrency: int) -> None:
+        """
+        设置出站发送的最大并发数（需在提交任务前调用）
+
+        Args:
+            concurrency: 最大并发数
+        """
+        self._lanes = self._create_lanes(concurrency)
+
+    def _create_lanes(self, concurrency: int) -> KeyedWorkerPool:
+        """创建出站通道工作池"""
+        return KeyedWorkerPool(
+            self._run_job, max_concurrency=concurrency, name="outbound", priority=lambda job: job.priority
+        )
+
+    def _dispatch(self, job: SendJob) -> None:
+        """将任务放入所属会话的出站通道"""
+        self._lanes.submit((job.platform, job.to), job)
+
+    def split_content(self, platform: str, message_type: str, content: str) -> List[str]:
+        """
+        按平台文本长度限制切分消息内容
+
+        Args:
+            platform: 平台名称
+            message_type: 消息类型（仅切分 text / markdown）
+            content: 消息内容
+
+        Returns:
+            分片列表，无需切分时只有一个元素
+        """
+        adapter = self.adapter_manager.get_adapter(platform)
+        limit = adapter.max_text_length if adapter is not None else None
+        if not limit or message_type not in _CHUNKABLE_TYPES:
+            return [content]
+        return split_text(content, limit)
+
+    def _can_coalesce(self, job: SendJob) -> bool:
+        """是否可以参与合并（未开始发送、无截止时间的文本消息）"""
+        return job.message_type == "text" and job.deadline is None and job.attempts == 0
+
+    async def _coalesce(self, job: SendJob) -> None:
+        """
+        等待合并窗口，把同一会话通道中紧随其后的文本消息并入当前任务
+
+        合并后的总长度不超过平台的单条文本长度限制。
+        """
+        await asyncio.sleep(self.coalesce_window)
+
+        adapter = self.adapter_manager.get_adapter(job.platform)
+        limit = adapter.max_text_length if adapter is not None else None
+        size = len(job.content)
+
+        def fits(other: SendJob) -> bool:
+            nonlocal size
+            if not self._can_coalesce(other) or other.conversation_type != job.conversation_type:
+                return False
+            if limit and size + len(_COALESCE_SEPARATOR) + len(other.content) > limit:
+                return False
+            size += len(_COALESCE_SEPARATOR) + len(other.content)
+            return True
+
+        job.coalesced = self._lanes.take((job.platform, job.to), fits)
+        if job.coalesced:
+            logger.debug(f"Send job {job.job_id} coalesced {len(job.coalesced)} following messages")
+
+    async def _send_chunks(self, job: SendJob) -> str:
+        """
+        按顺序发送任务的各个分片，重试时从第一个未发出的分片继续
+
+        Returns:
+            第一个分片的消息 ID
+        """
+        content = _COALESCE_SEPARATOR.join([job.content] + [other.content for other in job.coalesced])
+        chunks = self.split_content(job.platform, job.message_type, content)
+        if len(chunks) > 1 and not job.chunk_ids:
+            logger.info(f"Send job {job.job_id} split into {len(chunks)} chunks")
+        while len(job.chunk_ids) < len(chunks):
+            message_id = await self.route_outgoing(
+                job.platform, job.to, job.message_type, chunks[len(job.chunk_ids)], job.conversation_type
+            )
+            job.chunk_ids.append(message_id)
+        return job.chunk_ids[0]
+
+    async def _run_job(self, job: SendJob) -> None:
+        """执行发送任务，失败时按重试策略退避重试，并更新任务状态"""
+        if self.coalesce_window > 0 and self._can_coalesce(job):
+            await self._coalesce(job)
+        # 被合并的任务与当前任务共享发送结果
+        group = [job] + job.coalesced
+
+        while True:
+            if job.expired:
+                await self._expire_job(job)
+                return
+
+            for member in group:
+                self.jobs.mark_sending(member)
+            try:
+                message_id = await self._send_chunks(job)
+                break
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+                if is_transient_error(e) and job.attempts < self.retry_policy.max_attempts:
+                    delay = self.retry_policy.backoff(job.attempts)
+                    if job.deadline is not None and time.time() + delay >= job.deadline:
+                        await self._expire_job(job)
+                        return
+                    logger.warning(
+                        f"Send job {job.job_id} attempt {job.attempts} failed, retrying in {delay:.1f}s: {error}"
+                    )
+                    for member in group:
+                        self.jobs.mark_retrying(member, error)
+                        if self.outbox is not None:
+                            await self.outbox.record_attempt(member)
+                    # 退避期间归还全局发送名额，其他会话和平台不受本任务重试影响
+                    await self._lanes.sleep(delay, job.priority)
+                    continue
+
+                for member in group:
+                    self.jobs.mark_failed(member, error)
+                    if self.outbox is not None:
+                        await self.outbox.move_to_dead_letter(member)
+                if self.outbox is not None:
+                    logger.error(f"Send job {job.job_id} moved to dead letters after {job.attempts} attempts")
+                return
+
+        for member in group:
+            self.jobs.mark_sent(member, message_id)
+            if self.message_store is not None:
+                self.message_store.record_outbound(member, message_id)
+            if self.outbox is not None:
+                await self.outbox.remove(member.job_id)
+
+            # 发布消息事件
+            await get_event_bus().emit("message:sent", {
+                "platform": member.platform,
+                "message_id": message_id,
+                "job_id": member.job_id,
+                "to": member.to,
+                "message_type": member.message_type,
+            })
+
+    async def _expire_job(self, job: SendJob) -> None:
+        """放弃已超过截止时间的任务"""
+        self.jobs.mark_expired(job)
+        if self.outbox is not None:
+            await self.outbox.remove(job.job_id)
+        logger.warning(f"Send job {job.job_id} dropped: deadline exceeded")
+
+    async def recover_outbox(self) -> int:
+        """
+        重新分发发件箱中未完成的任务（服务启动时调用）
+
+        Returns:
+            恢复的任务数
+        """
+        if self.outbox is None:
+            return 0
+
+        records = await self.outbox.list_pending()
+        for record in records:
+            job = self.jobs.create(
+                record["platform"],
+                record["to_id"],
+                record["message_type"],
+                record["content"],
+                record["conversation_type"],
+                job_id=record["job_id"],
+                priority=record["priority"],
+                deadline=record["deadline"],
+            )
+            job.attempts = record["attempts"]
+            job.error = record["last_error"]
+            self._dispatch(job)
+
+        if records:
+            logger.info(f"Recovered {len(records)} pending send jobs from outbox")
+        return len(records)
+
+    async def replay_dead_letter(self, job_id: str) -> Optional[SendJob]:
+        """
+        重放死信：从死信表移除并作为新任务重新提交
+
+        Args:
+            job_id: 死信的任务 ID
+
+        Returns:
+            新的发送任务，死信不存在返回 None
+        """
+        if self.outbox is None:
+            return None
+
+        record = await self.outbox.get_dead_letter(job_id)
+        if record is None:
+            return None
+
+        await self.outbox.delete_dead_letter(job_id)
+        job = await self.submit(
+            record["platform"],
+            record["to_id"],
+            record["message_type"],
+            record["content"],
+            record["conversation_type"],
+        )
+        logger.info(f"Replayed dead letter {job_id} as {job.job_id}")
+        return job
+
+    async def stop(self) -> None:
+        """取消进行中的发送任务（启用发件箱时，未完成任务会在下次启动时恢复）"""
+        await self._lanes.stop()
+
+    async def wait_job(self, job: SendJob, timeout: Optional[float] = None) -> SendJob:
+        """
+        等待发送任务结束
+
+        Args:
+            job: 发送任务
+            timeout: 超时时间（秒），None 表示一直等待
+
+        Returns:
+            任务对象（超时后状态可能仍为 queued/sending）
+        """
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    def get_job(self, job_id: str) -> Optional[SendJob]:
+        """
+        查询发送任务
+
+        Args:
+            job_id: 任务 ID 或平台消息 ID
+
+        Returns:
+            任务对象，不存在则返回 None
+        """
+        return self.jobs.get(job_id)
+
     def create_message_id(self) -> str:
         """
         创建唯一的消息 ID
@@ -131,4 +636,4 @@ def get_router() -> MessageRouter:
     return _router
 
 
-__all__ = ["MessageRouter", "get_router"]
+__all__ = ["MessageRouter", "SubmitError", "get_router"]
@@ -0,0 +1,284 @@
+"""Scheduled and delayed outbound message delivery"""
+
+import asyncio
+import heapq
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from loguru import logger
+from chatagentcore.core.router import MessageRouter, get_router
+
+if TYPE_CHECKING:
+    from chatagentcore.storage.schedule import ScheduleStore
+
+# 定时器最长休眠时间（秒），防止系统时间调整后长时间不醒
+_MAX_SLEEP = 60.0
+# 分发失败后的重试间隔（秒）
+_RETRY_DELAY = 1.0
+
+
+@dataclass
+class ScheduledMessage:
+    """定时消息 - 到达 send_at 后作为普通发送任务提交"""
+
+    schedule_id: str
+    send_at: float
+    platform: str
+    to: str
+    message_type: str
+    content: str
+    conversation_type: str = "user"
+    priority: int = 0
+    deadline: Optional[float] = None
+    idempotency_key: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 API 可返回的字典"""
+        return {
+            "schedule_id": self.schedule_id,
+            "platform": self.platform,
+            "to": self.to,
+            "status": "scheduled",
+            "send_at": self.send_at,
+            "created_at": int(self.created_at),
+        }
+
+
+class MessageScheduler:
+    """定时消息调度器
+
+    所有定时消息放在一个按 send_at 排序的最小堆中，由单个后台任务等待堆顶到期，
+    到期的消息按批取出后通过 MessageRouter 提交，不为每条消息创建睡眠任务。
+    配置存储后，定时消息会持久化，重启后重新加载。
+    """
+
+    def __init__(self, router: MessageRouter, batch_size: int = 100):
+        """
+        初始化调度器
+
+        Args:
+            router: 消息路由器
+            batch_size: 单批最多分发的到期消息数
+        """
+        self.router = router
+        self.batch_size = batch_size
+        self.store: Optional["ScheduleStore"] = None
+        self._entries: Dict[str, ScheduledMessage] = {}
+        # (平台, 幂等键) -> 未分发的定时消息 ID，重复登记时返回已有消息
+        self._by_key: Dict[Tuple[str, str], str] = {}
+        # (send_at, 序号, schedule_id)；取消的消息只从 _entries 删除，出堆时跳过
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def configure_store(self, store: Optional["ScheduleStore"]) -> None:
+        """
+        配置定时消息存储（需在 start 之前调用）
+
+        Args:
+            store: 定时消息存储，None 表示仅保存在内存中
+        """
+        self.store = store
+
+    async def start(self) -> None:
+        """加载已持久化的定时消息并启动调度任务"""
+        if self._task is not None:
+            return
+        if self.store is not None:
+            records = await self.store.list_all()
+            for record in records:
+                record["to"] = record.pop("to_id")
+                self._push(ScheduledMessage(**record))
+            if records:
+                logger.info(f"Recovered {len(records)} scheduled messages")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止调度任务（未到期的消息保留在存储中）"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def schedule(
+        self,
+        platform: str,
+        to: str,
+        message_type: str,
+        content: str,
+        send_at: float,
+        conversation_type: str = "user",
+        priority: int = 0,
+        deadline: Optional[float] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> ScheduledMessage:
+        """
+        登记定时消息
+
+        Args:
+            platform: 平台名称
+            to: 接收者 ID
+            message_type: 消息类型
+            content: 消息内容
+            send_at: 发送时间（Unix 时间戳）
+            conversation_type: 会话类型
+            priority: 优先级
+            deadline: 截止时间（Unix 时间戳，可选）
+            idempotency_key: 幂等键（可选）；同一平台下相同幂等键的未分发定时消息已存在时直接返回它，
+                到期提交时同样使用该键
+
+        Returns:
+            已登记的定时消息
+        """
+        if idempotency_key:
+            existing = self._entries.get(self._by_key.get((platform, idempotency_key), ""))
+            if existing is not None:
+                logger.info(f"Duplicate schedule suppressed by idempotency key {idempotency_key}: {existing.schedule_id}")
+                return existing
+
+        entry = ScheduledMessage(
+            schedule_id=f"sched_{uuid.uuid4().hex}",
+            send_at=send_at,
+            platform=platform,
+            to=to,
+            message_type=message_type,
+            content=content,
+            conversation_type=conversation_type,
+            priority=priority,
+            deadline=deadline,
+            idempotency_key=idempotency_key,
+        )
+        # 在任何 await 之前登记，保证并发的重复请求拿到同一条定时消息
+        self._push(entry)
+        if self.store is not None:
+            try:
+                await self.store.add(entry)
+            except Exception:
+                self._discard(entry.schedule_id)
+                raise
+        return entry
+
+    async def cancel(self, schedule_id: str) -> bool:
+        """
+        取消尚未分发的定时消息
+
+        Args:
+            schedule_id: 定时消息 ID
+
+        Returns:
+            是否取消成功（已分发或不存在时返回 False）
+        """
+        if self._discard(schedule_id) is None:
+            return False
+        if self.store is not None:
+            await self.store.remove_many([schedule_id])
+        return True
+
+    def get(self, schedule_id: str) -> Optional[ScheduledMessage]:
+        """获取未分发的定时消息，不存在返回 None"""
+        return self._entries.get(schedule_id)
+
+    @property
+    def pending(self) -> int:
+        """未分发的定时消息数"""
+        return len(self._entries)
+
+    def _push(self, entry: ScheduledMessage) -> None:
+        self._entries[entry.schedule_id] = entry
+        if entry.idempotency_key:
+            self._by_key[(entry.platform, entry.idempotency_key)] = entry.schedule_id
+        self._seq += 1
+        head = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (entry.send_at, self._seq, entry.schedule_id))
+        if head is None or entry.send_at < head:
+            # 新消息成为堆顶，唤醒调度任务重新计算等待时间
+            self._wakeup.set()
+
+    def _discard(self, schedule_id: str) -> Optional[ScheduledMessage]:
+        """移除未分发的定时消息及其幂等键登记（堆中的项在出堆时跳过）"""
+        entry = self._entries.pop(schedule_id, None)
+        if entry is not None and entry.idempotency_key:
+            key = (entry.platform, entry.idempotency_key)
+            if self._by_key.get(key) == schedule_id:
+                del self._by_key[key]
+        return entry
+
+    def _next_delay(self) -> Optional[float]:
+        """距离堆顶到期的秒数，堆为空返回 None"""
+        while self._heap and self._heap[0][2] not in self._entries:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return self._heap[0][0] - time.time()
+
+    def _pop_due(self) -> List[ScheduledMessage]:
+        """弹出一批已到期的消息"""
+        now = time.time()
+        due: List[ScheduledMessage] = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+            _, _, schedule_id = heapq.heappop(self._heap)
+            entry = self._discard(schedule_id)
+            if entry is not None:
+                due.append(entry)
+        return due
+
+    async def _run(self) -> None:
+        """调度循环"""
+        while True:
+            self._wakeup.clear()
+            delay = self._next_delay()
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), min(delay or _MAX_SLEEP, _MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._dispatch(self._pop_due())
+
+    async def _dispatch(self, due: List[ScheduledMessage]) -> None:
+        """通过 MessageRouter 提交一批到期消息，并从存储中删除"""
+        done: List[str] = []
+        for entry in due:
+            try:
+                job = await self.router.submit(
+                    platform=entry.platform,
+                    to=entry.to,
+                    message_type=entry.message_type,
+                    content=entry.content,
+                    conversation_type=entry.conversation_type,
+                    idempotency_key=entry.idempotency_key,
+                    priority=entry.priority,
+                    deadline=entry.deadline,
+                )
+                done.append(entry.schedule_id)
+                logger.debug(f"Scheduled message {entry.schedule_id} dispatched as {job.job_id}")
+            except Exception as e:
+                logger.error(f"Failed to dispatch scheduled message {entry.schedule_id}: {e}")
+                entry.send_at = time.time() + _RETRY_DELAY
+                self._push(entry)
+        if self.store is not None and done:
+            try:
+                await self.store.remove_many(done)
+            except Exception as e:
+                logger.error(f"Failed to remove dispatched scheduled messages: {e}")
+
+
+# 全局调度器实例
+_scheduler: MessageScheduler | None = None
+
+
+def get_scheduler() -> MessageScheduler:
+    """获取全局定时消息调度器实例"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = MessageScheduler(get_router())
+    return _scheduler
+
+
+__all__ = ["MessageScheduler", "ScheduledMessage", "get_scheduler"]
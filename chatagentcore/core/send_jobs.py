@@ -0,0 +1,235 @@
+"""Send job table for tracking outbound message status"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+# 发送任务状态
+JOB_QUEUED = "queued"
+JOB_SENDING = "sending"
+JOB_SENT = "sent"
+JOB_FAILED = "failed"
+JOB_EXPIRED = "expired"
+
+FINAL_STATES = frozenset({JOB_SENT, JOB_FAILED, JOB_EXPIRED})
+
+
+@dataclass
+class SendJob:
+    """发送任务 - 记录一次出站发送的参数与状态"""
+
+    job_id: str
+    platform: str
+    to: str
+    message_type: str
+    content: str
+    conversation_type: str = "user"
+    # 优先级，数值越大越先发送
+    priority: int = 0
+    # 截止时间（Unix 时间戳），超过后不再发送
+    deadline: Optional[float] = None
+    status: str = JOB_QUEUED
+    message_id: Optional[str] = None
+    # 长文本切分发送时，已发出分片的消息 ID（按顺序）
+    chunk_ids: List[str] = field(default_factory=list)
+    # 合并到本任务中一起发送的后续任务
+    coalesced: List["SendJob"] = field(default_factory=list, repr=False)
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    # 完成通知，发送结束（成功或失败）时被置位
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        """是否已结束（成功、失败或过期）"""
+        return self.status in FINAL_STATES
+
+    @property
+    def expired(self) -> bool:
+        """是否已超过截止时间"""
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 API 可返回的字典"""
+        return {
+            "job_id": self.job_id,
+            "platform": self.platform,
+            "to": self.to,
+            "status": self.status,
+            "message_id": self.message_id,
+            "chunks": len(self.chunk_ids),
+            "error": self.error,
+            "attempts": self.attempts,
+            "priority": self.priority,
+            "deadline": self.deadline,
+            "created_at": int(self.created_at),
+            "updated_at": int(self.updated_at),
+        }
+
+
+class SendJobStore:
+    """发送任务表 - 有界内存存储，按创建时间淘汰过期任务
+
+    任务按插入顺序保存在 OrderedDict 中，队首即最旧的任务，TTL 淘汰只需从队首弹出。
+    已结束的任务另按结束顺序登记在 _finished 中，容量淘汰从中弹出最早结束的任务，
+    进行中的任务不会被容量淘汰，也不会阻塞其后已结束任务的淘汰。
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 3600.0):
+        """
+        初始化任务表
+
+        Args:
+            max_size: 最多保留的任务数
+            ttl: 任务保留时间（秒）
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._jobs: "OrderedDict[str, SendJob]" = OrderedDict()
+        # 平台消息 ID -> 任务 ID，便于按平台消息 ID 查询状态
+        self._by_message_id: Dict[str, str] = {}
+        # 已结束的任务 ID（按结束顺序），容量淘汰的候选
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+
+    def create(
+        self,
+        platform: str,
+        to: str,
+        message_type: str,
+        content: str,
+        conversation_type: str = "user",
+        job_id: Optional[str] = None,
+        priority: int = 0,
+        deadline: Optional[float] = None,
+    ) -> SendJob:
+        """
+        创建并登记发送任务
+
+        Args:
+            platform: 平台名称
+            to: 接收者 ID
+            message_type: 消息类型
+            content: 消息内容
+            conversation_type: 会话类型
+            job_id: 指定任务 ID（可选，默认自动生成）
+            priority: 优先级
+            deadline: 截止时间（Unix 时间戳，可选）
+
+        Returns:
+            新建的任务
+        """
+        self._evict()
+        job = SendJob(
+            job_id=job_id or f"job_{uuid.uuid4().hex}",
+            platform=platform,
+            to=to,
+            message_type=message_type,
+            content=content,
+            conversation_type=conversation_type,
+            priority=priority,
+            deadline=deadline,
+        )
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[SendJob]:
+        """
+        获取任务，支持任务 ID 或平台消息 ID
+
+        Args:
+            job_id: 任务 ID 或平台返回的消息 ID
+
+        Returns:
+            任务，不存在或已过期则返回 None
+        """
+        self._evict()
+        job = self._jobs.get(job_id)
+        if job is None and job_id in self._by_message_id:
+            job = self._jobs.get(self._by_message_id[job_id])
+        return job
+
+    def mark_sending(self, job: SendJob) -> None:
+        """标记任务开始发送"""
+        job.status = JOB_SENDING
+        job.attempts += 1
+        job.updated_at = time.time()
+
+    def mark_retrying(self, job: SendJob, error: str) -> None:
+        """标记任务发送失败、等待重试"""
+        job.status = JOB_QUEUED
+        job.error = error
+        job.updated_at = time.time()
+
+    def mark_sent(self, job: SendJob, message_id: str) -> None:
+        """标记任务发送成功"""
+        job.status = JOB_SENT
+        job.message_id = message_id
+        job.error = None
+        job.updated_at = time.time()
+        if message_id and job.job_id in self._jobs:
+            self._by_message_id[message_id] = job.job_id
+        self._mark_finished(job)
+
+    def mark_failed(self, job: SendJob, error: str) -> None:
+        """标记任务发送失败"""
+        job.status = JOB_FAILED
+        job.error = error
+        job.updated_at = time.time()
+        self._mark_finished(job)
+
+    def mark_expired(self, job: SendJob) -> None:
+        """标记任务因超过截止时间而放弃发送"""
+        job.status = JOB_EXPIRED
+        job.error = "deadline exceeded"
+        job.updated_at = time.time()
+        self._mark_finished(job)
+
+    def _mark_finished(self, job: SendJob) -> None:
+        """登记已结束的任务并通知等待方"""
+        if job.job_id in self._jobs:
+            self._finished[job.job_id] = None
+            self._finished.move_to_end(job.job_id)
+        job.done.set()
+
+    def _evict(self) -> None:
+        """淘汰过期的任务，以及超出容量时最早结束的任务"""
+        deadline = time.time() - self.ttl
+        while self._jobs:
+            job_id, job = next(iter(self._jobs.items()))
+            if job.created_at >= deadline:
+                break
+            self._remove(job_id, job)
+            if not job.finished:
+                logger.warning(f"Send job {job_id} expired before completion")
+
+        while self._finished and len(self._jobs) >= self.max_size:
+            job_id, _ = self._finished.popitem(last=False)
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished:
+                self._remove(job_id, job)
+
+    def _remove(self, job_id: str, job: SendJob) -> None:
+        del self._jobs[job_id]
+        self._finished.pop(job_id, None)
+        if job.message_id and self._by_message_id.get(job.message_id) == job_id:
+            del self._by_message_id[job.message_id]
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+
+__all__ = [
+    "SendJob",
+    "SendJobStore",
+    "JOB_QUEUED",
+    "JOB_SENDING",
+    "JOB_SENT",
+    "JOB_FAILED",
+    "JOB_EXPIRED",
+]
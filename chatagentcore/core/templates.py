@@ -0,0 +1,158 @@
+"""Precompiled outbound message/card templates"""
+
+import json
+import re
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+from loguru import logger
+
+# 占位符语法：{{name}}
+_SLOT = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+class TemplateError(ValueError):
+    """模板不存在或渲染参数错误"""
+
+
+class CompiledTemplate:
+    """编译后的模板
+
+    编译时把模板拆分为字面量片段和占位符，渲染时只做字符串拼接。
+    JSON 模板（卡片）在编译时序列化一次，占位符必须位于 JSON 字符串内部，
+    渲染时对变量值做 JSON 转义，无需重新构造和序列化整个卡片。
+    """
+
+    __slots__ = ("message_type", "is_json", "_parts", "slots")
+
+    def __init__(self, body: Union[str, Mapping[str, Any], List[Any]], message_type: str = "text"):
+        """
+        编译模板
+
+        Args:
+            body: 模板内容；dict/list 视为 JSON 模板，字符串视为文本模板
+            message_type: 渲染结果的消息类型
+        """
+        self.message_type = message_type
+        self.is_json = not isinstance(body, str)
+        source = json.dumps(body, ensure_ascii=False) if self.is_json else body
+
+        # 偶数下标为字面量，奇数下标为占位符名
+        self._parts: List[str] = _SLOT.split(source)
+        self.slots = frozenset(self._parts[1::2])
+
+    def render(self, variables: Optional[Mapping[str, Any]] = None) -> str:
+        """
+        渲染模板
+
+        Args:
+            variables: 占位符变量
+
+        Returns:
+            渲染后的内容（JSON 模板返回 JSON 字符串）
+
+        Raises:
+            TemplateError: 缺少变量
+        """
+        variables = variables or {}
+        missing = self.slots.difference(variables)
+        if missing:
+            raise TemplateError(f"Missing template variables: {', '.join(sorted(missing))}")
+
+        parts = self._parts
+        out = [parts[0]]
+        for i in range(1, len(parts), 2):
+            value = variables[parts[i]]
+            value = value if isinstance(value, str) else str(value)
+            # JSON 模板中的占位符位于字符串内，写入转义后的内容（去掉首尾引号）
+            out.append(json.dumps(value, ensure_ascii=False)[1:-1] if self.is_json else value)
+            out.append(parts[i + 1])
+        return "".join(out)
+
+
+class TemplateRegistry:
+    """模板注册表 - 按 ID 管理预编译的消息/卡片模板"""
+
+    def __init__(self):
+        self._templates: Dict[str, CompiledTemplate] = {}
+
+    def register(
+        self, template_id: str, body: Union[str, Mapping[str, Any], List[Any]], message_type: str = "text"
+    ) -> CompiledTemplate:
+        """
+        注册（或覆盖）模板
+
+        Args:
+            template_id: 模板 ID
+            body: 模板内容
+            message_type: 消息类型
+
+        Returns:
+            编译后的模板
+        """
+        template = CompiledTemplate(body, message_type)
+        self._templates[template_id] = template
+        return template
+
+    def load(self, templates: Mapping[str, Any]) -> None:
+        """
+        从配置加载模板（替换已注册的全部模板）
+
+        Args:
+            templates: {模板ID: 含 message_type 和 content 的配置}
+        """
+        self._templates.clear()
+        for template_id, cfg in templates.items():
+            try:
+                self.register(template_id, cfg.content, cfg.message_type)
+            except Exception as e:
+                logger.error(f"Failed to compile template {template_id}: {e}")
+        if self._templates:
+            logger.info(f"Loaded {len(self._templates)} message templates")
+
+    def get(self, template_id: str) -> Optional[CompiledTemplate]:
+        """获取模板，不存在返回 None"""
+        return self._templates.get(template_id)
+
+    def render(self, template_id: str, variables: Optional[Mapping[str, Any]] = None) -> Tuple[str, str]:
+        """
+        渲染模板
+
+        Args:
+            template_id: 模板 ID
+            variables: 占位符变量
+
+        Returns:
+            (消息类型, 消息内容)
+
+        Raises:
+            TemplateError: 模板不存在或缺少变量
+        """
+        template = self._templates.get(template_id)
+        if template is None:
+            raise TemplateError(f"Unknown template: {template_id}")
+        return template.message_type, template.render(variables)
+
+    def __contains__(self, template_id: str) -> bool:
+        return template_id in self._templates
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+
+# 全局模板注册表实例
+_template_registry: TemplateRegistry | None = None
+
+
+def get_template_registry() -> TemplateRegistry:
+    """获取全局模板注册表实例"""
+    global _template_registry
+    if _template_registry is None:
+        _template_registry = TemplateRegistry()
+    return _template_registry
+
+
+__all__ = [
+    "CompiledTemplate",
+    "TemplateError",
+    "TemplateRegistry",
+    "get_template_registry",
+]
@@ -0,0 +1,188 @@
+"""Bounded webhook ingress queue - ack fast, process off the request path"""
+
+import asyncio
+import inspect
+import time
+import uuid
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from loguru import logger
+from chatagentcore.core.metrics import get_metrics
+
+if TYPE_CHECKING:
+    from chatagentcore.storage.inbox import InboxStore
+
+WebhookProcessor = Callable[[bytes], Union[None, Awaitable[None]]]
+
+
+class WebhookIngress:
+    """Webhook 入口队列
+
+    Webhook 路由只做必要的校验（URL 验证、签名），把原始请求体放入有界队列后立即返回；
+    解析和分发由后台工作任务完成，平台不会因处理慢而超时重投。
+    队列已满时 offer 返回 False，由路由返回 503 让平台稍后重试。
+
+    配置收件箱后，submit 先把请求体持久化再入队，解析分发完成后删除，
+    进程崩溃时已应答但未处理的请求在下次启动时通过 recover 重放。
+    """
+
+    def __init__(self, max_size: int = 1000, workers: int = 4):
+        """
+        初始化入口队列
+
+        Args:
+            max_size: 队列容量
+            workers: 后台处理任务数
+        """
+        self.max_size = max_size
+        self.workers = workers
+        self._processors: Dict[str, WebhookProcessor] = {}
+        self._queue: Optional["asyncio.Queue[Tuple[str, bytes, float, Optional[str]]]"] = None
+        self._tasks: List[asyncio.Task] = []
+        self._inbox: Optional["InboxStore"] = None
+
+    def configure_inbox(self, inbox: Optional["InboxStore"]) -> None:
+        """
+        设置持久化收件箱
+
+        Args:
+            inbox: 收件箱存储，None 表示仅在内存中排队
+        """
+        self._inbox = inbox
+
+    def register(self, platform: str, processor: WebhookProcessor) -> None:
+        """
+        注册平台请求体处理函数
+
+        Args:
+            platform: 平台名称
+            processor: 处理函数，接收原始请求体（同步函数或协程函数）
+        """
+        self._processors[platform] = processor
+
+    def _get_queue(self) -> "asyncio.Queue[Tuple[str, bytes, float, Optional[str]]]":
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        return self._queue
+
+    def offer(self, platform: str, body: bytes, event_id: Optional[str] = None) -> bool:
+        """
+        放入一个待处理的请求体（不等待）
+
+        Args:
+            platform: 平台名称
+            body: 原始请求体
+            event_id: 收件箱事件 ID（已持久化时传入，处理完成后删除）
+
+        Returns:
+            是否已入队（队列已满返回 False）
+        """
+        queue = self._get_queue()
+        metrics = get_metrics()
+        try:
+            queue.put_nowait((platform, body, time.monotonic(), event_id))
+        except asyncio.QueueFull:
+            metrics.inc("chatagentcore_webhook_dropped_total", platform=platform)
+            return False
+        metrics.set_gauge("chatagentcore_webhook_queue_depth", queue.qsize())
+        return True
+
+    async def submit(self, platform: str, body: bytes) -> bool:
+        """
+        持久化（若配置了收件箱）并放入一个待处理的请求体，返回后即可应答平台
+
+        Args:
+            platform: 平台名称
+            body: 原始请求体
+
+        Returns:
+            是否已入队（队列已满返回 False）
+        """
+        if self._inbox is None:
+            return self.offer(platform, body)
+        if self._get_queue().full():
+            get_metrics().inc("chatagentcore_webhook_dropped_total", platform=platform)
+            return False
+        event_id = uuid.uuid4().hex
+        await self._inbox.add_event(event_id, platform, body)
+        if not self.offer(platform, body, event_id):
+            # 持久化期间队列被占满：返回 503 由平台重试，删除已持久化的请求体避免重复处理
+            self._inbox.remove_event(event_id)
+            return False
+        return True
+
+    async def recover(self) -> int:
+        """
+        重放收件箱中已应答但未处理的请求体（启动时调用）
+
+        Returns:
+            重放的请求数
+        """
+        if self._inbox is None:
+            return 0
+        count = 0
+        for event in await self._inbox.list_events():
+            if not self.offer(event["platform"], event["body"], event["event_id"]):
+                break
+            count += 1
+        if count:
+            logger.info(f"Replaying {count} unprocessed webhook request(s) from inbox")
+        return count
+
+    async def start(self) -> None:
+        """启动后台处理任务"""
+        if self._tasks:
+            return
+        queue = self._get_queue()
+        self._tasks = [asyncio.create_task(self._worker(queue)) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """停止后台处理任务（队列中未处理的请求被丢弃）"""
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, queue: "asyncio.Queue[Tuple[str, bytes, float, Optional[str]]]") -> None:
+        """后台处理循环"""
+        metrics = get_metrics()
+        while True:
+            platform, body, enqueued_at, event_id = await queue.get()
+            metrics.set_gauge("chatagentcore_webhook_queue_depth", queue.qsize())
+            metrics.observe("chatagentcore_webhook_wait_seconds", time.monotonic() - enqueued_at, platform=platform)
+            try:
+                processor = self._processors.get(platform)
+                if processor is None:
+                    logger.warning(f"No webhook processor registered for {platform}")
+                    continue
+                result = processor(body)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                metrics.inc("chatagentcore_webhook_errors_total", platform=platform)
+                logger.error(f"{platform} webhook processing failed: {e}")
+            finally:
+                # 解析出的消息已登记到入站收件箱（写入顺序在删除之前），原始请求体可以删除
+                if event_id is not None and self._inbox is not None:
+                    self._inbox.remove_event(event_id)
+                queue.task_done()
+
+    @property
+    def pending(self) -> int:
+        """排队中的请求数"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+
+# 全局 Webhook 入口队列实例
+_webhook_ingress: WebhookIngress | None = None
+
+
+def get_webhook_ingress() -> WebhookIngress:
+    """获取全局 Webhook 入口队列实例"""
+    global _webhook_ingress
+    if _webhook_ingress is None:
+        _webhook_ingress = WebhookIngress()
+    return _webhook_ingress
+
+
+__all__ = ["WebhookIngress", "get_webhook_ingress"]
@@ -0,0 +1,125 @@
+"""Durable inbound inbox for at-least-once processing"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+from loguru import logger
+from chatagentcore.adapters.base import Message
+from chatagentcore.storage.sqlite import SQLiteStore, Statement
+
+
+class InboxStore(SQLiteStore):
+    """入站收件箱
+
+    - inbox_events：已应答但尚未解析的原始 Webhook 请求体，应答前写入，解析分发后删除
+    - inbox_messages：已进入入站管道但尚未处理完成的消息，处理器结束后删除
+
+    写操作按提交顺序成批提交，先登记消息再删除原始请求体，
+    因此任意时刻崩溃，事件至少以其中一种形式保留，启动时重放。
+
+    应答前落盘：Webhook 在返回 HTTP 响应前写入请求体；微信在推进游标前等待 flush；
+    飞书长连接、钉钉 Stream、QQ 的 SDK 回调在返回前等待 flush（最长 5 秒，超时后照常应答）。
+    入站队列已满被丢弃的 SDK 消息不会写入收件箱（至多一次）。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS inbox_events (
+        event_id TEXT PRIMARY KEY,
+        platform TEXT NOT NULL,
+        body BLOB NOT NULL,
+        received_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS inbox_messages (
+        platform TEXT NOT NULL,
+        message_id TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        received_at REAL NOT NULL,
+        PRIMARY KEY (platform, message_id)
+    );
+    """
+
+    def _submit(self, statements: List[Statement]) -> "asyncio.Future[None]":
+        """提交写操作不等待，失败时记录日志"""
+        future = self.submit_write(statements)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future: "asyncio.Future[None]") -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Inbox write failed: {future.exception()}")
+
+    async def add_event(self, event_id: str, platform: str, body: bytes) -> None:
+        """
+        持久化原始请求体（等待提交完成后才能应答平台）
+
+        Args:
+            event_id: 事件 ID
+            platform: 平台名称
+            body: 原始请求体
+        """
+        await self.write(
+            "INSERT OR REPLACE INTO inbox_events (event_id, platform, body, received_at) VALUES (?, ?, ?, ?)",
+            (event_id, platform, body, time.time()),
+        )
+
+    def remove_event(self, event_id: str) -> "asyncio.Future[None]":
+        """
+        删除已解析分发的原始请求体
+
+        Args:
+            event_id: 事件 ID
+        """
+        return self._submit([("DELETE FROM inbox_events WHERE event_id = ?", (event_id,))])
+
+    def add_message(self, message: Message) -> "asyncio.Future[None]":
+        """
+        登记进入入站管道的消息
+
+        Args:
+            message: 入站消息
+        """
+        return self._submit([(
+            "INSERT OR REPLACE INTO inbox_messages (platform, message_id, payload, received_at) VALUES (?, ?, ?, ?)",
+            (message.platform, message.message_id, json.dumps(message.to_dict(), ensure_ascii=False), time.time()),
+        )])
+
+    def remove_message(self, message: Message) -> "asyncio.Future[None]":
+        """
+        删除已处理完成的消息
+
+        Args:
+            message: 入站消息
+        """
+        return self._submit([(
+            "DELETE FROM inbox_messages WHERE platform = ? AND message_id = ?",
+            (message.platform, message.message_id),
+        )])
+
+    async def flush(self) -> None:
+        """等待此前提交的写操作全部落盘"""
+        await self.submit_write([])
+
+    async def list_events(self) -> List[Dict[str, Any]]:
+        """
+        列出未处理的原始请求体（用于启动时重放）
+
+        Returns:
+            事件记录列表，按接收时间排序
+        """
+        rows = await self.query("SELECT event_id, platform, body FROM inbox_events ORDER BY received_at")
+        return [dict(row) for row in rows]
+
+    async def list_messages(self) -> List[Message]:
+        """
+        列出未处理完成的消息（用于启动时重放）
+
+        Returns:
+            消息列表，按接收时间排序
+        """
+        rows = await self.query("SELECT payload FROM inbox_messages ORDER BY received_at")
+        return [Message.from_dict(json.loads(row["payload"])) for row in rows]
+
+
+__all__ = ["InboxStore"]
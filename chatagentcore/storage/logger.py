@@ -1,23 +1,52 @@
 """Log module using loguru"""
 
+import random
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 from loguru import logger as _logger
 
 
 class LogConfig:
-    """日志配置"""
+    """日志配置
 
-    def __init__(self, log_dir: str | None = None, level: str = "INFO"):
+    默认所有输出都经 enqueue 交给后台线程写入：日志调用只把记录放入队列，
+    文件写入和轮转不会阻塞事件循环。关闭时调用 logger.complete() 等待队列写完。
+    """
+
+    TEXT_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+
+    def __init__(
+        self,
+        log_dir: str | None = None,
+        level: str = "INFO",
+        file_name: str = "chatagentcore.log",
+        rotation: str = "10 MB",
+        retention: str = "30 days",
+        enqueue: bool = True,
+        json_format: bool = False,
+    ):
         """
         初始化日志配置
 
         Args:
             log_dir: 日志文件目录，None 表示不写文件
             level: 日志级别
+            file_name: 普通日志文件名
+            rotation: 日志轮转条件（如 "10 MB"、"00:00"）
+            retention: 日志保留时间（如 "30 days"）
+            enqueue: 是否经后台线程写入（不阻塞调用方）
+            json_format: 文件日志是否输出为 JSON Lines（每行一条包含 extra 字段的记录）
         """
         self.log_dir = Path(log_dir) if log_dir else None
         self.level = level
+        self.file_name = file_name
+        self.rotation = rotation
+        self.retention = retention
+        self.enqueue = enqueue
+        self.json_format = json_format
 
     def setup(self) -> None:
         """配置日志输出"""
@@ -30,6 +59,7 @@ class LogConfig:
             format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
             level=self.level,
             colorize=True,
+            enqueue=self.enqueue,
         )
 
         # 文件输出（如果指定了日志目录）
@@ -37,25 +67,285 @@ class LogConfig:
             self.log_dir.mkdir(parents=True, exist_ok=True)
 
             # 普通日志文件
-            _logger.add(
-                self.log_dir / "chatagentcore.log",
-                rotation="10 MB",
-                retention="30 days",
-                level=self.level,
-                format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-            )
+            self._add_file(self.log_dir / self.file_name, self.level)
 
             # 错误日志文件
-            _logger.add(
-                self.log_dir / "error.log",
-                rotation="10 MB",
-                retention="30 days",
-                level="ERROR",
-                format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+            self._add_file(self.log_dir / "error.log", "ERROR")
+
+    def _add_file(self, path: Path, level: str) -> None:
+        """添加文件输出"""
+        options: Dict[str, Any] = {
+            "rotation": self.rotation,
+            "retention": self.retention,
+            "level": level,
+            "enqueue": self.enqueue,
+        }
+        if self.json_format:
+            options["serialize"] = True
+        else:
+            options["format"] = self.TEXT_FORMAT
+        _logger.add(path, **options)
+
+
+class MessageLog:
+    """消息收发日志
+
+    - 详细模式（默认）：多行横幅，逐行打印消息内容，便于开发调试
+    - 紧凑模式：每条消息一条结构化记录（字段通过 bind 附加到 extra），
+      格式化延迟到日志级别确认启用之后，适合生产环境的高频路径
+
+    两种模式下内容都按 content_max_length 截断，并按 content_sample_rate 抽样记录，
+    未抽中的消息只记录内容长度。
+    """
+
+    def __init__(self, compact: bool = False, content_sample_rate: float = 1.0, content_max_length: int = 200):
+        """
+        初始化消息日志
+
+        Args:
+            compact: 是否使用紧凑模式
+            content_sample_rate: 记录消息内容的比例（0-1）
+            content_max_length: 记录内容的最大字符数
+        """
+        self.compact = compact
+        self.content_sample_rate = content_sample_rate
+        self.content_max_length = content_max_length
+
+    def configure(self, compact: bool, content_sample_rate: float, content_max_length: int) -> None:
+        """
+        更新配置
+
+        Args:
+            compact: 是否使用紧凑模式
+            content_sample_rate: 记录消息内容的比例（0-1）
+            content_max_length: 记录内容的最大字符数
+        """
+        self.compact = compact
+        self.content_sample_rate = content_sample_rate
+        self.content_max_length = content_max_length
+
+    def preview(self, content: Any) -> str:
+        """
+        生成内容预览（抽样并截断）
+
+        Args:
+            content: 消息内容
+
+        Returns:
+            截断后的内容；未被抽样时返回内容长度
+        """
+        text = content if isinstance(content, str) else str(content)
+        if self.content_sample_rate < 1.0 and random.random() >= self.content_sample_rate:
+            return f"<{len(text)} chars>"
+        if len(text) > self.content_max_length:
+            return f"{text[:self.content_max_length]}... ({len(text)} chars)"
+        return text
+
+    def inbound(self, message: Any) -> None:
+        """
+        记录一条入站消息
+
+        Args:
+            message: 入站消息（adapters.base.Message）
+        """
+        content = message.content
+        msg_type = content.get("type", "unknown")
+        if self.compact:
+            fields: Dict[str, Any] = {
+                "direction": "inbound",
+                "platform": message.platform,
+                "message_id": message.message_id,
+                "sender_id": message.sender.get("id", ""),
+                "conversation": f"{message.conversation.get('type', '')}:{message.conversation.get('id', '')}",
+                "message_type": msg_type,
+            }
+            _logger.bind(**fields).opt(lazy=True).info(
+                "inbound {} {} <- {} [{}] {}",
+                lambda: fields["platform"],
+                lambda: fields["conversation"],
+                lambda: fields["sender_id"],
+                lambda: msg_type,
+                lambda: self.preview(content.get("text", "")),
+            )
+            return
+
+        _logger.info("=" * 70)
+        _logger.info("📨 收到消息 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+        _logger.info(f"平台: {message.platform}")
+        _logger.info(f"发送者: {message.sender.get('name', '')} ({message.sender.get('id', '')})")
+        _logger.info(f"会话: {message.conversation.get('type', '')}:{message.conversation.get('id', '')}")
+
+        if msg_type == "text" and content.get("text"):
+            # 多行消息分行显示
+            for line in self.preview(content["text"]).split("\n"):
+                _logger.info(f"内容: {line}")
+        elif msg_type == "interactive":
+            _logger.info("类型: 交互卡片消息")
+            _logger.opt(lazy=True).info("卡片数据: {}", lambda: self.preview(message.data))
+        elif msg_type == "post":
+            _logger.info("类型: 富文本消息")
+            _logger.opt(lazy=True).info("富文本数据: {}", lambda: self.preview(message.data))
+        else:
+            _logger.info(f"类型: {msg_type}")
+            data = message.data
+            if data:
+                _logger.opt(lazy=True).info("数据: {}", lambda: self.preview(data))
+
+        _logger.info("=" * 70)
+
+    def outbound(
+        self,
+        platform: str,
+        to: str,
+        conversation_type: str,
+        message_type: str,
+        content: Any,
+        template_id: Optional[str] = None,
+    ) -> None:
+        """
+        记录一条出站消息
+
+        Args:
+            platform: 平台名称
+            to: 接收者 ID
+            conversation_type: 会话类型
+            message_type: 消息类型
+            content: 消息内容
+            template_id: 模板 ID
+        """
+        if self.compact:
+            fields: Dict[str, Any] = {
+                "direction": "outbound",
+                "platform": platform,
+                "conversation": f"{conversation_type}:{to}",
+                "message_type": message_type,
+            }
+            if template_id:
+                fields["template_id"] = template_id
+            _logger.bind(**fields).opt(lazy=True).info(
+                "outbound {} {} [{}] {}",
+                lambda: platform,
+                lambda: fields["conversation"],
+                lambda: message_type,
+                lambda: self.preview(content),
+            )
+            return
+
+        _logger.info("=" * 70)
+        _logger.info("📤 发送消息 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+        _logger.info(f"平台: {platform} | 类型: {message_type}")
+        _logger.info(f"接收者: {to} ({conversation_type})")
+        if template_id:
+            _logger.info(f"模板: {template_id}")
+        _logger.info("-" * 70)
+
+        if message_type == "text":
+            for line in self.preview(content).split("\n"):
+                _logger.info(f"内容: {line}")
+        elif message_type in ("card", "interactive"):
+            _logger.info(f"卡片消息: {self.preview(content)}")
+        else:
+            _logger.info(f"内容: {self.preview(content)}")
+
+        _logger.info("=" * 70)
+
+
+class LogThrottle:
+    """重复日志限流
+
+    按 (调用位置, 消息模板) 归并重复日志：窗口内第一次照常输出，之后的重复只计数，
+    窗口结束后的下一次输出附带汇总（"N occurrences in last 60s"）。
+    消息需写成模板加参数（如 throttle.error("长轮询异常: {}", e)），
+    同一位置不同异常文本的日志归为一类。线程安全，可在 SDK 线程中调用。
+    """
+
+    _MAX_KEYS = 1000
+
+    def __init__(self, window: float = 60.0):
+        """
+        初始化限流器
+
+        Args:
+            window: 归并窗口（秒），0 表示不限流
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        # key -> [窗口开始时间, 被抑制次数, 最近一次的 (level, args, kwargs)]
+        self._states: Dict[Tuple[str, int, str], List[Any]] = {}
+
+    def error(self, message: str, *args: Any, **kwargs: Any) -> None:
+        """限流输出 ERROR 日志"""
+        self._log("ERROR", message, args, kwargs)
+
+    def warning(self, message: str, *args: Any, **kwargs: Any) -> None:
+        """限流输出 WARNING 日志"""
+        self._log("WARNING", message, args, kwargs)
+
+    def _log(self, level: str, message: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+        # 调用链：调用方 -> error/warning -> _log
+        if self.window <= 0:
+            _logger.opt(depth=2).log(level, message, *args, **kwargs)
+            return
+
+        frame = sys._getframe(2)
+        key = (frame.f_code.co_filename, frame.f_lineno, message)
+        now = time.monotonic()
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None and now - state[0] < self.window:
+                state[1] += 1
+                state[2] = (level, args, kwargs)
+                return
+            suppressed = state[1] if state is not None else 0
+            elapsed = now - state[0] if state is not None else 0.0
+            self._states[key] = [now, 0, None]
+            if len(self._states) > self._MAX_KEYS:
+                self._states.pop(next(iter(self._states)))
+
+        if suppressed:
+            _logger.opt(depth=2).log(
+                level, message + " [{} occurrences in last {:.0f}s]", *args, suppressed + 1, elapsed, **kwargs
+            )
+        else:
+            _logger.opt(depth=2).log(level, message, *args, **kwargs)
+
+    def flush(self) -> None:
+        """输出所有被抑制日志的汇总（关闭时调用）"""
+        now = time.monotonic()
+        with self._lock:
+            pending = [(key, state) for key, state in self._states.items() if state[1]]
+            self._states.clear()
+        for (_, _, message), (started, suppressed, (level, args, kwargs)) in pending:
+            _logger.log(
+                level, message + " [{} more occurrences in last {:.0f}s]", *args, suppressed, now - started, **kwargs
             )
 
 
 # 创建默认日志实例
 logger = _logger
 
-__all__ = ["logger", "LogConfig"]
+# 全局消息日志实例
+_message_log: MessageLog | None = None
+
+
+def get_message_log() -> MessageLog:
+    """获取全局消息日志实例"""
+    global _message_log
+    if _message_log is None:
+        _message_log = MessageLog()
+    return _message_log
+
+
+# 全局重复日志限流实例
+_log_throttle: LogThrottle | None = None
+
+
+def get_log_throttle() -> LogThrottle:
+    """获取全局重复日志限流实例"""
+    global _log_throttle
+    if _log_throttle is None:
+        _log_throttle = LogThrottle()
+    return _log_throttle
+
+
+__all__ = ["logger", "LogConfig", "MessageLog", "LogThrottle", "get_message_log", "get_log_throttle"]
@@ -0,0 +1,359 @@
+"""Persistent message store with indexed conversation listing and full-text search"""
+
+import asyncio
+import base64
+import json
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Tuple
+from chatagentcore.adapters.base import Message
+from chatagentcore.core.send_jobs import SendJob
+from chatagentcore.storage.sqlite import SQLiteStore
+
+DIRECTION_INBOUND = "inbound"
+DIRECTION_OUTBOUND = "outbound"
+
+
+def encode_cursor(sort_key: Any, tie_breaker: Any) -> str:
+    """把分页位置（排序键, 次序键）编码为不透明游标"""
+    return base64.urlsafe_b64encode(json.dumps([sort_key, tie_breaker], separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    """
+    解码分页游标
+
+    Args:
+        cursor: encode_cursor 生成的游标，None 或空表示第一页
+
+    Returns:
+        分页位置 [排序键, 次序键]
+
+    Raises:
+        ValueError: 游标无效
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("invalid cursor")
+    return values
+
+
+class MessageStore(SQLiteStore):
+    """消息存储
+
+    入站和出站消息都写入 messages 表，同时更新 conversations 表中的会话摘要。
+    记录操作只把写入放入批量写队列（不等待提交），不拖慢收发路径。
+
+    - messages 按 (platform, conversation_id, created_at) 建索引，支持按会话翻页读取历史
+    - conversations 按 (platform, last_message_at) 建索引，支持按最近活跃度翻页列出会话
+    - messages_fts 是 messages.text 的 FTS5 外部内容索引（trigram 分词，适用于不分词的中日韩文本），
+      由触发器与 messages 同步，search 按子串检索历史消息
+    - compact 删除超过保留期的消息和会话，并回收空闲页
+    """
+
+    # 删除过期数据后可用 incremental_vacuum 回收空闲页（只对新建的数据库生效）
+    PRAGMAS = ("PRAGMA auto_vacuum = INCREMENTAL",)
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        platform TEXT NOT NULL,
+        conversation_id TEXT NOT NULL,
+        direction TEXT NOT NULL,
+        message_id TEXT,
+        sender_id TEXT,
+        message_type TEXT NOT NULL,
+        text TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages (platform, conversation_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_messages_created_at ON messages (created_at);
+    CREATE TABLE IF NOT EXISTS conversations (
+        platform TEXT NOT NULL,
+        conversation_id TEXT NOT NULL,
+        type TEXT NOT NULL,
+        name TEXT NOT NULL DEFAULT '',
+        last_message_at REAL NOT NULL,
+        last_text TEXT NOT NULL DEFAULT '',
+        message_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (platform, conversation_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_conversations_recent ON conversations (platform, last_message_at, conversation_id);
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+        text, content='messages', content_rowid='id', tokenize='trigram'
+    );
+    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts (rowid, text) VALUES (new.id, new.text);
+    END;
+    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts (messages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END;
+    """
+
+    # 会话摘要中保留的最后一条消息文本长度
+    _PREVIEW_LENGTH = 200
+    # trigram 索引只能匹配不少于 3 个字符的关键词，更短的关键词退化为 LIKE 扫描
+    _TRIGRAM_LENGTH = 3
+
+    def _open_sync(self) -> None:
+        existed = False
+        if self.path.exists():
+            with closing(sqlite3.connect(str(self.path))) as conn:
+                existed = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'"
+                ).fetchone() is not None
+        super()._open_sync()
+        if not existed:
+            # 为建索引前已存在的消息补建全文索引
+            self._conn.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+
+    def _record(
+        self,
+        platform: str,
+        conversation_id: str,
+        conversation_type: str,
+        direction: str,
+        message_id: Optional[str],
+        sender_id: Optional[str],
+        message_type: str,
+        text: str,
+    ) -> "asyncio.Future[None]":
+        now = time.time()
+        return self.submit_write([
+            (
+                "INSERT INTO messages (platform, conversation_id, direction, message_id, sender_id, "
+                "message_type, text, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (platform, conversation_id, direction, message_id, sender_id, message_type, text, now),
+            ),
+            (
+                "INSERT INTO conversations (platform, conversation_id, type, last_message_at, last_text, "
+                "message_count) VALUES (?, ?, ?, ?, ?, 1) "
+                "ON CONFLICT (platform, conversation_id) DO UPDATE SET "
+                "last_message_at = excluded.last_message_at, last_text = excluded.last_text, "
+                "message_count = message_count + 1",
+                (platform, conversation_id, conversation_type, now, text[:self._PREVIEW_LENGTH]),
+            ),
+        ])
+
+    def record_inbound(self, message: Message) -> "asyncio.Future[None]":
+        """
+        记录入站消息（不等待提交）
+
+        Args:
+            message: 入站消息
+
+        Returns:
+            提交完成时完成的 Future
+        """
+        content = message.content
+        return self._record(
+            message.platform,
+            message.conversation.get("id", ""),
+            message.conversation.get("type", "user"),
+            DIRECTION_INBOUND,
+            message.message_id,
+            message.sender.get("id", ""),
+            content.get("type", "text"),
+            content.get("text", ""),
+        )
+
+    def record_outbound(self, job: SendJob, message_id: Optional[str]) -> "asyncio.Future[None]":
+        """
+        记录已发送的出站消息（不等待提交）
+
+        Args:
+            job: 发送任务
+            message_id: 平台返回的消息 ID
+
+        Returns:
+            提交完成时完成的 Future
+        """
+        return self._record(
+            job.platform,
+            job.to,
+            job.conversation_type,
+            DIRECTION_OUTBOUND,
+            message_id,
+            None,
+            job.message_type,
+            job.content,
+        )
+
+    async def list_conversations(
+        self, platform: str, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        按最近活跃度列出会话（游标分页）
+
+        Args:
+            platform: 平台名称
+            limit: 每页数量
+            cursor: 上一页返回的游标
+
+        Returns:
+            (会话列表, 下一页游标)，没有更多数据时游标为 None
+
+        Raises:
+            ValueError: 游标无效
+        """
+        position = decode_cursor(cursor)
+        sql = (
+            "SELECT conversation_id, type, name, last_message_at, last_text, message_count "
+            "FROM conversations WHERE platform = ?"
+        )
+        params: List[Any] = [platform]
+        if position is not None:
+            sql += " AND (last_message_at, conversation_id) < (?, ?)"
+            params.extend(position)
+        sql += " ORDER BY last_message_at DESC, conversation_id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = [dict(row) for row in await self.query(sql, params)]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["last_message_at"], rows[-1]["conversation_id"])
+        return rows, next_cursor
+
+    async def list_messages(
+        self, platform: str, conversation_id: str, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        按时间倒序读取会话中的消息（游标分页）
+
+        Args:
+            platform: 平台名称
+            conversation_id: 会话 ID
+            limit: 每页数量
+            cursor: 上一页返回的游标
+
+        Returns:
+            (消息列表, 下一页游标)，没有更多数据时游标为 None
+
+        Raises:
+            ValueError: 游标无效
+        """
+        position = decode_cursor(cursor)
+        sql = (
+            "SELECT id, direction, message_id, sender_id, message_type, text, created_at "
+            "FROM messages WHERE platform = ? AND conversation_id = ?"
+        )
+        params: List[Any] = [platform, conversation_id]
+        if position is not None:
+            sql += " AND (created_at, id) < (?, ?)"
+            params.extend(position)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = [dict(row) for row in await self.query(sql, params)]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return rows, next_cursor
+
+    async def search(
+        self,
+        query: str,
+        platform: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        按关键词检索历史消息（按时间倒序，游标分页）
+
+        关键词不少于 3 个字符时作为短语在 FTS5 trigram 索引中匹配（大小写不敏感）；
+        少于 3 个字符时 trigram 索引无法使用，退化为对 messages.text 的 LIKE 扫描，
+        只能依靠平台、会话和时间过滤缩小范围，数据量大时较慢。
+
+        Args:
+            query: 关键词
+            platform: 只检索该平台
+            conversation_id: 只检索该会话
+            since: 起始时间（Unix 时间戳，含）
+            until: 结束时间（Unix 时间戳，不含）
+            limit: 每页数量
+            cursor: 上一页返回的游标
+
+        Returns:
+            (消息列表, 下一页游标)，没有更多数据时游标为 None
+
+        Raises:
+            ValueError: 关键词为空或游标无效
+        """
+        query = query.strip()
+        if not query:
+            raise ValueError("empty query")
+        position = decode_cursor(cursor)
+
+        sql = (
+            "SELECT m.id, m.platform, m.conversation_id, m.direction, m.message_id, m.sender_id, "
+            "m.message_type, m.text, m.created_at "
+        )
+        if len(query) >= self._TRIGRAM_LENGTH:
+            # 关键词作为 FTS5 短语，避免其中的引号、运算符被当作查询语法
+            sql += "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid WHERE messages_fts MATCH ?"
+            params: List[Any] = ['"' + query.replace('"', '""') + '"']
+        else:
+            sql += "FROM messages m WHERE m.text LIKE ? ESCAPE '\\'"
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params = [f"%{escaped}%"]
+        if platform is not None:
+            sql += " AND m.platform = ?"
+            params.append(platform)
+        if conversation_id is not None:
+            sql += " AND m.conversation_id = ?"
+            params.append(conversation_id)
+        if since is not None:
+            sql += " AND m.created_at >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND m.created_at < ?"
+            params.append(until)
+        if position is not None:
+            sql += " AND (m.created_at, m.id) < (?, ?)"
+            params.extend(position)
+        sql += " ORDER BY m.created_at DESC, m.id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = [dict(row) for row in await self.query(sql, params)]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return rows, next_cursor
+
+    async def compact(self, retention: float) -> None:
+        """
+        删除超过保留期的消息和会话，并回收空闲页
+
+        Args:
+            retention: 保留时长（秒）
+        """
+        cutoff = time.time() - retention
+        await self.write_many([
+            # 先从会话计数中扣除即将删除的消息，与删除在同一事务中提交
+            (
+                "UPDATE conversations SET message_count = message_count - ("
+                "SELECT COUNT(*) FROM messages m WHERE m.platform = conversations.platform "
+                "AND m.conversation_id = conversations.conversation_id AND m.created_at < ?) "
+                "WHERE (platform, conversation_id) IN ("
+                "SELECT DISTINCT platform, conversation_id FROM messages WHERE created_at < ?)",
+                (cutoff, cutoff),
+            ),
+            ("DELETE FROM messages WHERE created_at < ?", (cutoff,)),
+            ("DELETE FROM conversations WHERE last_message_at < ?", (cutoff,)),
+        ])
+        await self._run(self._conn.execute, "PRAGMA incremental_vacuum")
+
+
+__all__ = ["MessageStore", "encode_cursor", "decode_cursor", "DIRECTION_INBOUND", "DIRECTION_OUTBOUND"]
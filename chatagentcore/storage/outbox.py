@@ -0,0 +1,159 @@
+"""Durable outbound outbox with dead-letter table"""
+
+import time
+from typing import Any, Dict, List, Optional
+from chatagentcore.core.send_jobs import SendJob
+from chatagentcore.storage.sqlite import SQLiteStore
+
+
+class OutboxStore(SQLiteStore):
+    """出站消息发件箱
+
+    发送任务在分发前写入 outbox 表，发送成功后删除；
+    重试次数耗尽的任务转入 dead_letters 表，等待人工检查或重放。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS outbox (
+        job_id TEXT PRIMARY KEY,
+        platform TEXT NOT NULL,
+        to_id TEXT NOT NULL,
+        message_type TEXT NOT NULL,
+        content TEXT NOT NULL,
+        conversation_type TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        deadline REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS dead_letters (
+        job_id TEXT PRIMARY KEY,
+        platform TEXT NOT NULL,
+        to_id TEXT NOT NULL,
+        message_type TEXT NOT NULL,
+        content TEXT NOT NULL,
+        conversation_type TEXT NOT NULL,
+        attempts INTEGER NOT NULL,
+        last_error TEXT,
+        created_at REAL NOT NULL,
+        failed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_dead_letters_failed_at ON dead_letters (failed_at);
+    """
+
+    _COLUMNS = "job_id, platform, to_id, message_type, content, conversation_type, attempts, last_error, created_at"
+
+    async def add(self, job: SendJob) -> None:
+        """
+        持久化待发送任务
+
+        Args:
+            job: 发送任务
+        """
+        await self.write(
+            "INSERT OR REPLACE INTO outbox (job_id, platform, to_id, message_type, content, "
+            "conversation_type, priority, deadline, attempts, last_error, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job.job_id, job.platform, job.to, job.message_type, job.content, job.conversation_type,
+             job.priority, job.deadline, job.attempts, job.error, job.created_at, time.time()),
+        )
+
+    async def record_attempt(self, job: SendJob) -> None:
+        """
+        记录一次失败的发送尝试
+
+        Args:
+            job: 发送任务
+        """
+        await self.write(
+            "UPDATE outbox SET attempts = ?, last_error = ?, updated_at = ? WHERE job_id = ?",
+            (job.attempts, job.error, time.time(), job.job_id),
+        )
+
+    async def remove(self, job_id: str) -> None:
+        """
+        删除已完成的任务
+
+        Args:
+            job_id: 任务 ID
+        """
+        await self.write("DELETE FROM outbox WHERE job_id = ?", (job_id,))
+
+    async def move_to_dead_letter(self, job: SendJob) -> None:
+        """
+        将任务从 outbox 转入死信表
+
+        Args:
+            job: 发送任务
+        """
+        await self.write_many([
+            (
+                "INSERT OR REPLACE INTO dead_letters (job_id, platform, to_id, message_type, content, "
+                "conversation_type, attempts, last_error, created_at, failed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.job_id, job.platform, job.to, job.message_type, job.content,
+                 job.conversation_type, job.attempts, job.error, job.created_at, time.time()),
+            ),
+            ("DELETE FROM outbox WHERE job_id = ?", (job.job_id,)),
+        ])
+
+    async def list_pending(self) -> List[Dict[str, Any]]:
+        """
+        列出所有未完成的任务（用于启动时恢复）
+
+        Returns:
+            任务记录列表，按创建时间排序
+        """
+        rows = await self.query(f"SELECT {self._COLUMNS}, priority, deadline FROM outbox ORDER BY created_at")
+        return [dict(row) for row in rows]
+
+    async def list_dead_letters(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        列出死信
+
+        Args:
+            limit: 返回数量
+            offset: 偏移量
+
+        Returns:
+            死信记录列表，最新的在前
+        """
+        rows = await self.query(
+            f"SELECT {self._COLUMNS}, failed_at FROM dead_letters ORDER BY failed_at DESC LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+        return [dict(row) for row in rows]
+
+    async def count_dead_letters(self) -> int:
+        """死信数量"""
+        rows = await self.query("SELECT COUNT(*) FROM dead_letters")
+        return rows[0][0]
+
+    async def get_dead_letter(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取单条死信
+
+        Args:
+            job_id: 任务 ID
+
+        Returns:
+            死信记录，不存在返回 None
+        """
+        rows = await self.query(
+            f"SELECT {self._COLUMNS}, failed_at FROM dead_letters WHERE job_id = ?", (job_id,)
+        )
+        return dict(rows[0]) if rows else None
+
+    async def delete_dead_letter(self, job_id: str) -> None:
+        """
+        删除死信
+
+        Args:
+            job_id: 任务 ID
+        """
+        await self.write("DELETE FROM dead_letters WHERE job_id = ?", (job_id,))
+
+
+__all__ = ["OutboxStore"]
@@ -0,0 +1,73 @@
+"""Durable store for scheduled (delayed) messages"""
+
+from typing import Any, Dict, List, Sequence
+from chatagentcore.core.scheduler import ScheduledMessage
+from chatagentcore.storage.sqlite import SQLiteStore
+
+
+class ScheduleStore(SQLiteStore):
+    """定时消息存储
+
+    定时消息在登记时写入 scheduled 表，到期分发后删除，
+    服务重启后由调度器重新加载未到期（或重启期间已到期）的消息。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS scheduled (
+        schedule_id TEXT PRIMARY KEY,
+        send_at REAL NOT NULL,
+        platform TEXT NOT NULL,
+        to_id TEXT NOT NULL,
+        message_type TEXT NOT NULL,
+        content TEXT NOT NULL,
+        conversation_type TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        deadline REAL,
+        idempotency_key TEXT,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_scheduled_send_at ON scheduled (send_at);
+    """
+
+    _COLUMNS = (
+        "schedule_id, send_at, platform, to_id, message_type, content, conversation_type, "
+        "priority, deadline, idempotency_key, created_at"
+    )
+
+    async def add(self, entry: ScheduledMessage) -> None:
+        """
+        持久化定时消息
+
+        Args:
+            entry: 定时消息
+        """
+        await self.write(
+            f"INSERT OR REPLACE INTO scheduled ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry.schedule_id, entry.send_at, entry.platform, entry.to, entry.message_type, entry.content,
+             entry.conversation_type, entry.priority, entry.deadline, entry.idempotency_key, entry.created_at),
+        )
+
+    async def remove_many(self, schedule_ids: Sequence[str]) -> None:
+        """
+        删除已分发或已取消的定时消息（同一事务）
+
+        Args:
+            schedule_ids: 定时消息 ID 列表
+        """
+        if schedule_ids:
+            await self.write_many([
+                ("DELETE FROM scheduled WHERE schedule_id = ?", (schedule_id,)) for schedule_id in schedule_ids
+            ])
+
+    async def list_all(self) -> List[Dict[str, Any]]:
+        """
+        列出全部未分发的定时消息（用于启动时恢复）
+
+        Returns:
+            定时消息记录列表，按发送时间排序
+        """
+        rows = await self.query(f"SELECT {self._COLUMNS} FROM scheduled ORDER BY send_at")
+        return [dict(row) for row in rows]
+
+
+__all__ = ["ScheduleStore"]
@@ -0,0 +1,188 @@
+"""SQLite (WAL) storage base with batched group-commit writes"""
+
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+from loguru import logger
+
+Statement = Tuple[str, Sequence[Any]]
+
+
+class SQLiteStore:
+    """SQLite 存储基类
+
+    - 所有数据库操作都在单独的工作线程中执行，不阻塞事件循环
+    - 使用 WAL 日志模式，读写互不阻塞
+    - 写操作进入队列，由后台任务按批次合并为一个事务提交（group commit），
+      避免每条写入都触发一次 fsync
+
+    子类通过 SCHEMA 定义表结构，PRAGMAS 定义需在建库时设置的选项（如 auto_vacuum）。
+    """
+
+    SCHEMA: str = ""
+    PRAGMAS: Tuple[str, ...] = ()
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 0.01):
+        """
+        初始化存储
+
+        Args:
+            path: 数据库文件路径
+            batch_size: 单个事务最多合并的写操作数
+            flush_interval: 收集一批写操作的最长等待时间（秒）
+        """
+        self.path = Path(path).expanduser()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.__class__.__name__)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._write_queue: "asyncio.Queue[Tuple[List[Statement], asyncio.Future]]" = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+
+    async def _run(self, func, *args) -> Any:
+        """在数据库线程中执行函数"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _open_sync(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if self.SCHEMA:
+            conn.executescript(self.SCHEMA)
+        self._conn = conn
+
+    async def open(self) -> None:
+        """打开数据库并启动批量写入任务"""
+        if self._conn is not None:
+            return
+        await self._run(self._open_sync)
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        logger.info(f"{self.__class__.__name__} opened: {self.path}")
+
+    async def close(self) -> None:
+        """提交剩余写操作并关闭数据库"""
+        if self._writer_task:
+            await self._write_queue.join()
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+    async def write(self, sql: str, params: Sequence[Any] = ()) -> None:
+        """
+        提交单条写操作，等待所在批次提交完成
+
+        Args:
+            sql: SQL 语句
+            params: 参数
+        """
+        await self.write_many([(sql, params)])
+
+    async def write_many(self, statements: List[Statement]) -> None:
+        """
+        提交一组写操作（保证在同一事务中），等待所在批次提交完成
+
+        Args:
+            statements: (SQL, 参数) 列表
+        """
+        await self.submit_write(statements)
+
+    def submit_write(self, statements: List[Statement]) -> "asyncio.Future[None]":
+        """
+        提交一组写操作但不等待（写操作按提交顺序入队和提交）
+
+        Args:
+            statements: (SQL, 参数) 列表
+
+        Returns:
+            所在批次提交完成时完成的 Future
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._write_queue.put_nowait((statements, future))
+        return future
+
+    async def query(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        """
+        执行查询
+
+        Args:
+            sql: SQL 语句
+            params: 参数
+
+        Returns:
+            结果行列表
+        """
+        return await self._run(self._query_sync, sql, params)
+
+    def _query_sync(self, sql: str, params: Sequence[Any]) -> List[sqlite3.Row]:
+        return self._conn.execute(sql, params).fetchall()
+
+    def _commit_batch_sync(self, batch: Iterable[List[Statement]]) -> None:
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            for statements in batch:
+                for sql, params in statements:
+                    conn.execute(sql, params)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def _writer_loop(self) -> None:
+        """后台批量写入循环"""
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._write_queue.get()
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._write_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._run(self._commit_batch_sync, [statements for statements, _ in batch])
+                errors: List[Optional[Exception]] = [None] * len(batch)
+            except Exception as e:
+                # 整批失败时逐组重试，只让出错的写操作失败
+                logger.error(f"{self.__class__.__name__} batch commit failed, retrying one by one: {e}")
+                errors = await self._run(self._commit_each_sync, [statements for statements, _ in batch])
+
+            for (_, future), error in zip(batch, errors):
+                if not future.done():
+                    if error is None:
+                        future.set_result(None)
+                    else:
+                        future.set_exception(error)
+                self._write_queue.task_done()
+
+    def _commit_each_sync(self, batch: List[List[Statement]]) -> List[Optional[Exception]]:
+        errors: List[Optional[Exception]] = []
+        for statements in batch:
+            try:
+                self._commit_batch_sync([statements])
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+
+__all__ = ["SQLiteStore"]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""飞书事件解析微基准
+
+对比旧的解析路径（分发器 json.loads 取 event_type、处理器再次 json.loads、
+逐层 .get 探测字段并第三次解码 content）与当前一次解码为类型化结构的路径。
+
+用法：
+    python scripts/bench_feishu_parse.py [次数]
+
+每项取 5 轮中最快的一轮，输出单条事件耗时和相对旧路径的加速比。
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loguru import logger  # noqa: E402
+from chatagentcore.adapters.base import Message  # noqa: E402
+from chatagentcore.adapters.feishu import FeishuAdapter  # noqa: E402
+from chatagentcore.adapters.feishu.models import parse_event  # noqa: E402
+
+PAYLOAD = json.dumps({
+    "schema": "2.0",
+    "header": {
+        "event_id": "5e3702a84e847582be8db7fb73283c02",
+        "event_type": "im.message.receive_v1",
+        "create_time": "1608725989000",
+        "token": "rvaYgkND1GOiu5MM0E1rncYC6PLtF7JV",
+        "app_id": "cli_9f5343c580712544",
+        "tenant_key": "2ca1d211f64f6438",
+    },
+    "event": {
+        "sender": {
+            "sender_id": {
+                "union_id": "on_8ed6aa67826108097d9ee143816345",
+                "user_id": "e33ggbyz",
+                "open_id": "ou_84aad35d084aa403a838cf73ee18467",
+            },
+            "sender_type": "user",
+            "tenant_key": "736588c9260f175e",
+        },
+        "message": {
+            "message_id": "om_5ce6d572455d361153b7cb51da133945",
+            "root_id": "om_5ce6d572455d361153b7cb5xxfsdfsdfdsf",
+            "parent_id": "om_5ce6d572455d361153b7cb5xxfsdfsdfdsf",
+            "create_time": "1609073151345",
+            "chat_id": "oc_5ce6d572455d361153b7xx51da133945",
+            "chat_type": "group",
+            "message_type": "text",
+            "content": json.dumps({"text": "@_user_1 你好，帮我查一下今天的会议安排"}, ensure_ascii=False),
+            "mentions": [
+                {
+                    "key": "@_user_1",
+                    "id": {"union_id": "on_8ed6aa67826108097d9ee143816345", "open_id": "ou_84aad35d084aa403a838cf73ee18467"},
+                    "name": "Tom",
+                    "tenant_key": "736588c9260f175e",
+                }
+            ],
+        },
+    },
+}, ensure_ascii=False).encode("utf-8")
+
+
+def legacy_parse(payload: bytes) -> Message:
+    """旧的解析路径（三次解码 + 逐层探测）"""
+    text = payload.decode("utf-8", errors="ignore")
+    handler_type = json.loads(text).get("header", {}).get("event_type")
+    assert handler_type
+    event_data = json.loads(text)
+    header = event_data.get("header", {})
+    event = event_data.get("event", {})
+    message_obj = event.get("message", {}) or event.get("data", {}).get("message", {}) or event
+    sender = event.get("sender") or event.get("data", {}).get("sender") or {}
+    sender_id = sender.get("sender_id", {}).get("open_id", "") if "sender_id" in sender else sender.get("open_id", "")
+    sender_type = sender.get("sender_type", "user")
+    content_raw = message_obj.get("content", "")
+    content_data = json.loads(content_raw) if isinstance(content_raw, str) and content_raw else {}
+    logger.debug(f"Content data: {str(content_data)[:200]}")
+    chat_id = message_obj.get("chat_id", "")
+    chat_type = message_obj.get("chat_type", "user")
+    return Message(
+        platform="feishu",
+        message_id=message_obj.get("message_id", ""),
+        sender={"id": sender_id, "name": sender_type, "type": sender_type},
+        conversation={"id": chat_id if chat_type != "user" else sender_id, "type": chat_type},
+        content={"type": message_obj.get("message_type", ""), "text": content_data.get("text", ""), "data": content_data},
+        timestamp=int(message_obj.get("create_time", 0) or header.get("create_time", 0)) * 1000,
+    )
+
+
+def main() -> None:
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+    adapter = FeishuAdapter({})
+
+    def typed() -> None:
+        adapter._parse_message_from_event(parse_event(PAYLOAD))
+
+    def measure(func) -> float:
+        return min(timeit.repeat(func, number=number, repeat=5))
+
+    results = {
+        "legacy (3x json.loads + probing)": measure(lambda: legacy_parse(PAYLOAD)),
+        "typed (1x validate_json)": measure(typed),
+        "  of which envelope decode": measure(lambda: parse_event(PAYLOAD)),
+    }
+    baseline = results["legacy (3x json.loads + probing)"]
+    print(f"payload {len(PAYLOAD)} bytes, {number} iterations")
+    for name, seconds in results.items():
+        print(f"{name:36s} {seconds / number * 1e6:8.2f} us/event  ({baseline / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 """Test configuration"""
 
+import asyncio
 import pytest
 from pathlib import Path
+from chatagentcore.adapters.base import BaseAdapter
+from chatagentcore.core.adapter_manager import AdapterManager
+from chatagentcore.core.router import MessageRouter
 
 
 @pytest.fixture
@@ -16,3 +20,32 @@ def test_data_dir(project_root: Path) -> Path:
     data_dir = project_root / "tests" / "data"
     data_dir.mkdir(parents=True, exist_ok=True)
     return data_dir
+
+
+class FakeAdapter(BaseAdapter):
+    """测试用适配器 - 记录发送内容，可配置延迟和失败"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.sent = []
+        self.fail = config.get("fail", False)
+        self.delay = config.get("delay", 0)
+
+    async def send_message(self, to, message_type, content, conversation_type="user"):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("platform down")
+        self.sent.append((to, content))
+        return f"fake_{len(self.sent)}"
+
+
+@pytest.fixture
+def make_router():
+    """创建挂载了 FakeAdapter（平台名 fake）的消息路由器"""
+
+    async def _make(**config) -> MessageRouter:
+        manager = AdapterManager()
+        await manager.load_adapter("fake", config, FakeAdapter)
+        return MessageRouter(manager)
+
+    return _make
@@ -0,0 +1,57 @@
+"""Unit tests for AdapterManager"""
+
+import time
+import pytest
+from chatagentcore.core.adapter_manager import AdapterManager
+from conftest import FakeAdapter
+
+
+@pytest.mark.asyncio
+async def test_broadcast_runs_platforms_concurrently():
+    """测试广播并发发送，总耗时约等于最慢平台"""
+    manager = AdapterManager()
+    await manager.load_adapter("a", {"delay": 0.1}, FakeAdapter)
+    await manager.load_adapter("b", {"delay": 0.1}, FakeAdapter)
+
+    start = time.monotonic()
+    results = await manager.broadcast_message(
+        "hello", recipients={"a": ["u1", "u2"], "b": ["g1"]}
+    )
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.18
+    assert set(results["a"]) == {"u1", "u2"}
+    assert results["b"] == {"g1": "fake_1"}
+
+
+@pytest.mark.asyncio
+async def test_broadcast_returns_partial_results():
+    """测试超时和失败的平台不影响其他平台的结果"""
+    manager = AdapterManager()
+    await manager.load_adapter("fast", {}, FakeAdapter)
+    await manager.load_adapter("slow", {"delay": 1.0}, FakeAdapter)
+    await manager.load_adapter("down", {"fail": True}, FakeAdapter)
+
+    results = await manager.broadcast_message(
+        "hello", platforms=["fast", "slow", "down", "missing"], timeout=0.1
+    )
+
+    assert results["fast"] == {"broadcast": "fake_1"}
+    assert results["slow"] == {"broadcast": "Error: timeout"}
+    assert results["down"]["broadcast"].startswith("Error:")
+    assert results["missing"] == {"broadcast": "Adapter not loaded"}
+
+
+@pytest.mark.asyncio
+async def test_multicast_falls_back_to_pooled_sends(make_router):
+    """测试无批量接口的平台以有限并发逐个发送，重复接收者只发送一次"""
+    router = await make_router(delay=0.05)
+    router.multicast_concurrency = 10
+
+    start = time.monotonic()
+    results = await router.multicast("fake", [f"u{i}" for i in range(10)] + ["u0"], "text", "notice")
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.15
+    assert len(results) == 10
+    assert not any(result.startswith("Error:") for result in results.values())
@@ -0,0 +1,69 @@
+"""Unit tests for long message chunking"""
+
+import pytest
+from chatagentcore.core.chunker import split_text
+from chatagentcore.core.send_jobs import JOB_SENT
+
+
+def test_short_text_is_not_split():
+    """测试未超长的文本原样返回"""
+    assert split_text("hello", 10) == ["hello"]
+
+
+def test_split_prefers_sentence_boundaries():
+    """测试优先在句末切分且每片不超长"""
+    text = "这是第一句话。" * 20
+    chunks = split_text(text, 50)
+
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert all(chunk.endswith("。") for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_split_keeps_code_fences_balanced():
+    """测试切分点落在代码块内时每片的代码块都完整闭合"""
+    code = "\n".join(f"print({i})" for i in range(40))
+    text = f"说明：\n```python\n{code}\n```\n结束。"
+    chunks = split_text(text, 120)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(chunk) <= 120
+        assert chunk.count("```") % 2 == 0
+    assert chunks[1].startswith("```python\n")
+
+
+def test_fence_line_content_is_not_repeated():
+    """测试代码块起始行 info string 之后的内容不会被复制到后续分片"""
+    text = "intro\n```json " + '{"k": 1}, ' * 400 + "\n```\nend"
+    chunks = split_text(text, 2000)
+
+    assert len(chunks) == 3
+    assert all(len(chunk) <= 2000 for chunk in chunks)
+    assert chunks[1].startswith("```json\n{")
+    assert sum(len(chunk) for chunk in chunks) < len(text) + 100
+
+
+def test_long_fence_line_with_small_limit_terminates():
+    """测试起始行超过分片长度时仍能逐片推进，不会死循环"""
+    text = "intro\n```json " + '{"k": 1}, ' * 40 + "\n```\nend"
+    chunks = split_text(text, 17)
+
+    assert all(len(chunk) <= 17 for chunk in chunks)
+    assert chunks[-1].endswith("end")
+
+
+@pytest.mark.asyncio
+async def test_router_sends_chunks_in_order(make_router):
+    """测试路由器按平台限制切分长文本并按序发送"""
+    router = await make_router()
+    adapter = router.adapter_manager.get_adapter("fake")
+    adapter.max_text_length = 20
+
+    job = await router.submit("fake", "u1", "text", "第一句话很长很长。第二句话也很长。第三句。")
+    await router.wait_job(job, timeout=1.0)
+
+    assert job.status == JOB_SENT
+    assert [content for _, content in adapter.sent] == ["第一句话很长很长。第二句话也很长。", "第三句。"]
+    assert job.message_id == "fake_1"
+    assert job.chunk_ids == ["fake_1", "fake_2"]
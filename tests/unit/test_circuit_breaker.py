@@ -0,0 +1,67 @@
+"""Unit tests for CircuitBreaker"""
+
+import asyncio
+import pytest
+from chatagentcore.core.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    CIRCUIT_HALF_OPEN,
+)
+
+
+def test_breaker_opens_on_failure_rate():
+    """测试失败率超过阈值时打开"""
+    breaker = CircuitBreaker("fake", min_calls=4, failure_rate_threshold=0.5)
+    breaker.record(0.01, success=True)
+    breaker.record(0.01, success=True)
+    breaker.record(0.01, success=False)
+    assert breaker.state == CIRCUIT_CLOSED
+
+    breaker.record(0.01, success=False)
+    assert breaker.state == CIRCUIT_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_breaker_opens_on_slow_calls():
+    """测试慢调用率超过阈值时打开"""
+    breaker = CircuitBreaker("fake", min_calls=2, slow_call_duration=1.0, slow_call_rate_threshold=1.0)
+    breaker.record(2.0, success=True)
+    breaker.record(2.0, success=True)
+    assert breaker.state == CIRCUIT_OPEN
+
+
+@pytest.mark.asyncio
+async def test_breaker_half_open_allows_single_probe():
+    """测试熔断超时后只放行一个探测请求，探测成功后关闭"""
+    breaker = CircuitBreaker("fake", min_calls=1, open_duration=0.05)
+    breaker.record(0.01, success=False)
+    assert not breaker.allow()
+
+    await asyncio.sleep(0.06)
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record(0.01, success=True)
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_router_fails_fast_when_circuit_open(make_router):
+    """测试平台熔断后路由器直接拒绝，不再调用适配器"""
+    router = await make_router(fail=True)
+    router.configure_circuit_breakers(min_calls=2, open_duration=60)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await router.route_outgoing("fake", "u1", "text", "hi")
+
+    adapter = router.adapter_manager.get_adapter("fake")
+    adapter.fail = False
+    with pytest.raises(CircuitOpenError):
+        await router.route_outgoing("fake", "u1", "text", "hi")
+    assert adapter.sent == []
+    assert router.get_breaker_states()["fake"]["state"] == CIRCUIT_OPEN
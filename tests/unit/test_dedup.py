@@ -0,0 +1,72 @@
+"""Unit tests for inbound de-duplication and metrics"""
+
+from chatagentcore.core.dedup import InboundDeduplicator
+from chatagentcore.core.metrics import Metrics
+
+
+def test_duplicate_message_is_detected():
+    """测试同一平台的重复消息 ID 被识别，不同平台互不影响"""
+    dedup = InboundDeduplicator(ttl=60)
+
+    assert not dedup.seen("feishu", "m1")
+    assert dedup.seen("feishu", "m1")
+    assert not dedup.seen("qq", "m1")
+    assert not dedup.seen("feishu", "")
+    assert not dedup.seen("feishu", "")
+
+
+def test_expired_ids_are_forgotten(monkeypatch):
+    """测试超过保留时间的消息 ID 被整桶淘汰"""
+    now = [1000.0]
+    monkeypatch.setattr("chatagentcore.core.dedup.time.monotonic", lambda: now[0])
+    dedup = InboundDeduplicator(ttl=10)
+
+    dedup.seen("feishu", "m1")
+    now[0] += 5
+    assert dedup.seen("feishu", "m1")
+
+    now[0] += 20
+    assert not dedup.seen("feishu", "m1")
+    assert len(dedup) == 1
+
+
+def test_index_size_is_bounded(monkeypatch):
+    """测试超出容量时丢弃最旧的桶"""
+    now = [1000.0]
+    monkeypatch.setattr("chatagentcore.core.dedup.time.monotonic", lambda: now[0])
+    dedup = InboundDeduplicator(ttl=100, max_size=50)
+
+    for i in range(200):
+        dedup.seen("feishu", f"m{i}")
+        now[0] += 1
+
+    assert len(dedup) <= 50 + 10
+    assert dedup.seen("feishu", "m199")
+    assert not dedup.seen("feishu", "m0")
+
+
+def test_metrics_render_prometheus_text():
+    """测试指标导出为 Prometheus 文本格式"""
+    metrics = Metrics()
+    metrics.inc("inbound_duplicates_total", platform="feishu")
+    metrics.inc("inbound_duplicates_total", platform="feishu")
+    metrics.observe("wait_seconds", 0.5)
+
+    text = metrics.render()
+
+    assert metrics.get("inbound_duplicates_total", platform="feishu") == 2
+    assert "# TYPE inbound_duplicates_total counter" in text
+    assert 'inbound_duplicates_total{platform="feishu"} 2' in text
+    assert "wait_seconds_count 1" in text
+
+
+def test_forgotten_id_is_accepted_again():
+    """测试撤销登记后，同一消息重投时不再被当作重复"""
+    dedup = InboundDeduplicator(ttl=60)
+
+    assert not dedup.seen("feishu", "m1")
+    dedup.forget("feishu", "m1")
+
+    assert len(dedup) == 0
+    assert not dedup.seen("feishu", "m1")
+    assert dedup.seen("feishu", "m1")
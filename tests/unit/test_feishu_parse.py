@@ -0,0 +1,61 @@
+"""Unit tests for the typed Feishu event parser"""
+
+import json
+from chatagentcore.adapters.feishu import FeishuAdapter
+from chatagentcore.adapters.feishu.models import parse_event
+
+
+def make_payload(event: dict, event_type: str = "im.message.receive_v1") -> bytes:
+    """构造飞书事件 JSON"""
+    return json.dumps({"header": {"event_type": event_type, "create_time": "1700"}, "event": event}).encode()
+
+
+def test_websocket_event_is_parsed_in_one_pass():
+    """测试 event.message 结构解析为标准消息，content 按需解码"""
+    payload = make_payload({
+        "sender": {"sender_id": {"open_id": "ou_1", "user_id": None}, "sender_type": "user"},
+        "message": {
+            "message_id": "om_1",
+            "chat_id": "oc_1",
+            "chat_type": "group",
+            "message_type": "text",
+            "content": json.dumps({"text": "你好"}),
+            "create_time": "1700000000",
+            "mentions": [{"key": "@_user_1", "id": {"open_id": "ou_2"}}],
+        },
+    })
+
+    event = parse_event(payload)
+    message = FeishuAdapter({})._parse_message_from_event(event)
+
+    assert event.header.event_type == "im.message.receive_v1"
+    assert message.message_id == "om_1"
+    assert message.sender["id"] == "ou_1"
+    assert message.conversation == {"id": "oc_1", "type": "group"}
+    assert message.content["text"] == "你好"
+    assert message.timestamp == 1700000000 * 1000
+
+
+def test_data_wrapped_event_and_non_json_content():
+    """测试 event.data.message 结构和无法解码的 content"""
+    payload = make_payload({
+        "data": {
+            "sender": {"open_id": "ou_3"},
+            "message": {"message_id": "om_2", "msg_type": "text", "content": "plain text"},
+        },
+    })
+
+    message = FeishuAdapter({})._parse_message_from_event(parse_event(payload))
+
+    assert message.sender["id"] == "ou_3"
+    assert message.content["type"] == "text"
+    assert message.content["text"] == "plain text"
+    assert message.conversation == {"id": "ou_3", "type": "user"}
+    assert message.timestamp == 1700 * 1000
+
+
+def test_malformed_card_json_falls_back_to_text():
+    """测试卡片内容不是合法 JSON 时降级为文本发送"""
+    assert FeishuAdapter._is_card_json('{"elements": []}')
+    assert not FeishuAdapter._is_card_json('{"elements": [')
+    assert not FeishuAdapter._is_card_json("plain text")
@@ -0,0 +1,174 @@
+"""Unit tests for the inbound message pipeline"""
+
+import asyncio
+import threading
+import pytest
+from conftest import FakeAdapter
+from chatagentcore.adapters.base import Message
+from chatagentcore.core.inbound import InboundPipeline
+
+
+def make_message(message_id: str, conversation_id: str = "c1") -> Message:
+    """构造测试入站消息"""
+    return Message(
+        platform="fake",
+        message_id=message_id,
+        sender={"id": "u1"},
+        conversation={"id": conversation_id, "type": "user"},
+        content={"type": "text", "text": message_id},
+        timestamp=0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_messages_in_same_conversation_are_ordered():
+    """测试同一会话内按到达顺序串行处理，不同会话并行处理"""
+    handled = []
+    active = {"now": 0, "peak": 0}
+
+    async def handler(message):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        handled.append(message.message_id)
+        active["now"] -= 1
+
+    pipeline = InboundPipeline(handler, max_concurrency=4)
+    for i in range(3):
+        pipeline.put_nowait(make_message(f"a{i}", "c1"))
+        pipeline.put_nowait(make_message(f"b{i}", "c2"))
+
+    await asyncio.sleep(0.1)
+
+    assert [m for m in handled if m.startswith("a")] == ["a0", "a1", "a2"]
+    assert [m for m in handled if m.startswith("b")] == ["b0", "b1", "b2"]
+    assert active["peak"] == 2
+    assert pipeline.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_or_waits():
+    """测试队列满时 put_nowait 丢弃消息，put 等待空位"""
+    release = asyncio.Event()
+    handled = []
+
+    async def handler(message):
+        await release.wait()
+        handled.append(message.message_id)
+
+    pipeline = InboundPipeline(handler, max_concurrency=1, queue_size=2)
+    assert pipeline.put_nowait(make_message("m1"))
+    assert pipeline.put_nowait(make_message("m2"))
+    assert not pipeline.put_nowait(make_message("m3"))
+
+    waiter = asyncio.create_task(pipeline.put(make_message("m4")))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    release.set()
+    await asyncio.wait_for(waiter, 1)
+    await asyncio.sleep(0.01)
+
+    assert handled == ["m1", "m2", "m4"]
+
+
+@pytest.mark.asyncio
+async def test_emit_inbound_from_thread_runs_on_main_loop():
+    """测试 SDK 线程投递的消息在主循环中按顺序处理，一批消息只唤醒主循环一次"""
+    loop = asyncio.get_running_loop()
+    received = []
+    adapter = FakeAdapter({})
+    adapter.set_message_handler(lambda message: received.append((message.message_id, asyncio.get_running_loop())))
+
+    wakeups = []
+    original = loop.call_soon_threadsafe
+
+    def counting_call_soon_threadsafe(callback, *args, **kwargs):
+        wakeups.append(callback)
+        return original(callback, *args, **kwargs)
+
+    loop.call_soon_threadsafe = counting_call_soon_threadsafe
+    try:
+        thread = threading.Thread(target=lambda: [adapter.emit_inbound(make_message(f"m{i}")) for i in range(50)])
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.01)
+    finally:
+        del loop.call_soon_threadsafe
+
+    assert [message_id for message_id, _ in received] == [f"m{i}" for i in range(50)]
+    assert all(handler_loop is loop for _, handler_loop in received)
+    assert len(wakeups) == 1
+
+
+def test_raw_platform_data_is_materialized_lazily():
+    """测试平台原始数据只在访问 data 或转换为字典时生成一次"""
+    calls = []
+
+    def load_raw():
+        calls.append(1)
+        return {"msgtype": "text"}
+
+    message = Message(
+        platform="dingtalk",
+        message_id="m1",
+        sender={"id": "u1"},
+        conversation={"id": "c1", "type": "user"},
+        content={"type": "text", "text": "hi"},
+        timestamp=0,
+        raw=load_raw,
+    )
+    assert calls == []
+
+    data = message.to_dict()
+    assert data["content"] == {"type": "text", "text": "hi", "data": {"msgtype": "text"}}
+    assert message.data == {"msgtype": "text"}
+    assert calls == [1]
+    assert Message.from_dict(data) == message
+
+
+def test_emit_inbound_without_loop_is_dropped():
+    """测试未记录主循环时，SDK 线程投递的消息被丢弃而不是在该线程中执行处理器"""
+    received = []
+    adapter = FakeAdapter({})
+    adapter.set_message_handler(received.append)
+
+    thread = threading.Thread(target=lambda: adapter.emit_inbound(make_message("m1")))
+    thread.start()
+    thread.join()
+
+    assert received == []
+
+
+@pytest.mark.asyncio
+async def test_pull_adapter_waits_for_queue_space(tmp_path):
+    """测试长轮询适配器在入站队列满时等待空位，消息不被丢弃"""
+    from chatagentcore.adapters.weixin.main import WeixinAdapter
+    from chatagentcore.adapters.weixin.models.message import MessageItem, TextItem, WeixinMessage
+
+    release = asyncio.Event()
+    handled = []
+
+    async def handler(message):
+        await release.wait()
+        handled.append(message.message_id)
+
+    pipeline = InboundPipeline(handler, max_concurrency=1, queue_size=1)
+    assert pipeline.put_nowait(make_message("m1"))
+
+    adapter = WeixinAdapter({"state_dir": str(tmp_path)})
+    adapter.set_message_handler(pipeline.put)
+    wx_msg = WeixinMessage(
+        message_id=2, from_user_id="u1", session_id="c1", item_list=[MessageItem(type=1, text_item=TextItem(text="hi"))]
+    )
+    polling = asyncio.create_task(adapter._handle_message(wx_msg))
+    await asyncio.sleep(0.01)
+    # 队列已满：拉取循环停在这里，不会推进游标
+    assert not polling.done()
+
+    release.set()
+    await asyncio.wait_for(polling, 1)
+    await asyncio.sleep(0.01)
+
+    assert adapter.pull_based
+    assert handled == ["m1", "2"]
@@ -0,0 +1,113 @@
+"""Unit tests for the durable inbound inbox"""
+
+import asyncio
+import pytest
+from chatagentcore.adapters.base import Message
+from chatagentcore.core.inbound import InboundPipeline
+from chatagentcore.core.webhook_ingress import WebhookIngress
+from chatagentcore.storage.inbox import InboxStore
+
+
+def make_message(message_id: str) -> Message:
+    """构造测试入站消息"""
+    return Message(
+        platform="fake",
+        message_id=message_id,
+        sender={"id": "u1"},
+        conversation={"id": "c1", "type": "user"},
+        content={"type": "text", "text": message_id},
+        timestamp=0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_unfinished_messages_are_replayed(tmp_path):
+    """测试处理未完成的消息在重启后重放，处理完成的消息被删除"""
+    path = tmp_path / "inbox.db"
+    release = asyncio.Event()
+
+    async def stuck_handler(message):
+        if message.message_id == "m2":
+            await release.wait()
+
+    inbox = InboxStore(str(path))
+    await inbox.open()
+    pipeline = InboundPipeline(stuck_handler, max_concurrency=1)
+    pipeline.configure_inbox(inbox)
+    pipeline.put_nowait(make_message("m1"))
+    pipeline.put_nowait(make_message("m2"))
+    await pipeline.flush()
+    await asyncio.sleep(0.01)
+    # 模拟崩溃：m2 仍在处理中
+    await pipeline.stop()
+    await inbox.close()
+
+    handled = []
+    inbox = InboxStore(str(path))
+    await inbox.open()
+    pipeline = InboundPipeline(lambda message: handled.append(message.message_id))
+    pipeline.configure_inbox(inbox)
+    replayed = await pipeline.recover()
+    await asyncio.sleep(0.01)
+    await pipeline.flush()
+
+    assert [m.message_id for m in replayed] == ["m2"]
+    assert handled == ["m2"]
+    assert await inbox.list_messages() == []
+    await inbox.close()
+
+
+@pytest.mark.asyncio
+async def test_acked_webhook_body_survives_restart(tmp_path):
+    """测试已应答但未处理的 Webhook 请求体在重启后重放"""
+    path = tmp_path / "inbox.db"
+    inbox = InboxStore(str(path))
+    await inbox.open()
+    ingress = WebhookIngress()
+    ingress.configure_inbox(inbox)
+    assert await ingress.submit("feishu", b'{"event": 1}')
+    # 模拟崩溃：后台任务尚未处理
+    await inbox.close()
+
+    processed = []
+    inbox = InboxStore(str(path))
+    await inbox.open()
+    ingress = WebhookIngress()
+    ingress.configure_inbox(inbox)
+    ingress.register("feishu", processed.append)
+    assert await ingress.recover() == 1
+    await ingress.start()
+    await asyncio.sleep(0.01)
+    await ingress.stop()
+    await inbox.flush()
+
+    assert processed == [b'{"event": 1}']
+    assert await inbox.list_events() == []
+    await inbox.close()
+
+
+@pytest.mark.asyncio
+async def test_sdk_thread_waits_until_message_is_persisted(tmp_path):
+    """测试 SDK 线程投递的消息在回调返回（向平台应答）前已写入收件箱"""
+    from conftest import FakeAdapter
+
+    release = asyncio.Event()
+
+    async def stuck_handler(message):
+        await release.wait()
+
+    inbox = InboxStore(str(tmp_path / "inbox.db"), flush_interval=0.05)
+    await inbox.open()
+    pipeline = InboundPipeline(stuck_handler)
+    pipeline.configure_inbox(inbox)
+    adapter = FakeAdapter({})
+    adapter.set_message_handler(pipeline.put_nowait)
+    adapter.set_inbound_flush(pipeline.flush)
+
+    # SDK 回调线程：emit_inbound 返回时消息应已落盘（批量写入窗口为 50ms，不等待则查询不到）
+    await asyncio.to_thread(adapter.emit_inbound, make_message("m1"))
+    assert [m.message_id for m in await inbox.list_messages()] == ["m1"]
+
+    release.set()
+    await pipeline.stop()
+    await inbox.close()
@@ -0,0 +1,104 @@
+"""Unit tests for KeyedWorkerPool"""
+
+import asyncio
+import pytest
+from chatagentcore.core.lanes import KeyedWorkerPool
+
+
+@pytest.mark.asyncio
+async def test_same_key_is_processed_in_order():
+    """测试同一通道内按提交顺序串行处理"""
+    processed = []
+
+    async def handler(item):
+        # 越早提交的任务耗时越长，若并行处理则顺序会颠倒
+        await asyncio.sleep(0.01 * (5 - item))
+        processed.append(item)
+
+    pool = KeyedWorkerPool(handler, max_concurrency=8)
+    for i in range(5):
+        pool.submit("conv", i)
+
+    await asyncio.sleep(0.2)
+    assert processed == [0, 1, 2, 3, 4]
+    assert pool.active_lanes == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_in_parallel():
+    """测试不同通道并行处理，且受最大并发数限制"""
+    running = 0
+    peak = 0
+
+    async def handler(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    pool = KeyedWorkerPool(handler, max_concurrency=3)
+    for i in range(6):
+        pool.submit(f"conv_{i}", i)
+
+    await asyncio.sleep(0.2)
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_handler_error_does_not_stop_lane():
+    """测试单个任务异常不影响通道后续任务"""
+    processed = []
+
+    async def handler(item):
+        if item == 0:
+            raise RuntimeError("boom")
+        processed.append(item)
+
+    pool = KeyedWorkerPool(handler)
+    pool.submit("conv", 0)
+    pool.submit("conv", 1)
+
+    await asyncio.sleep(0.05)
+    assert processed == [1]
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_lane_is_served_first():
+    """测试名额不足时优先处理高优先级通道"""
+    processed = []
+
+    async def handler(item):
+        await asyncio.sleep(0.01)
+        processed.append(item)
+
+    pool = KeyedWorkerPool(handler, max_concurrency=1, priority=lambda item: item[1])
+    pool.submit("busy", ("first", 0))
+    pool.submit("bulk", ("bulk", 0))
+    pool.submit("reply", ("reply", 9))
+
+    await asyncio.sleep(0.1)
+    assert [name for name, _ in processed] == ["first", "reply", "bulk"]
+
+
+@pytest.mark.asyncio
+async def test_sleeping_handler_releases_its_slot():
+    """测试处理中的等待（重试退避）期间归还名额，其他通道不被阻塞"""
+    processed = []
+    pool = None
+
+    async def handler(item):
+        if item == "retrying":
+            await pool.sleep(0.1)
+        processed.append(item)
+
+    pool = KeyedWorkerPool(handler, max_concurrency=1)
+    pool.submit("dead-platform", "retrying")
+    pool.submit("other", "other")
+
+    await asyncio.sleep(0.05)
+    assert processed == ["other"]
+
+    await asyncio.sleep(0.1)
+    assert processed == ["other", "retrying"]
+    assert pool._gate._active == 0
@@ -0,0 +1,95 @@
+"""Unit tests for hot-path message logging and log sinks"""
+
+import json
+import sys
+import pytest
+from loguru import logger
+from chatagentcore.adapters.base import Message
+from chatagentcore.storage.logger import LogConfig, LogThrottle, MessageLog
+
+
+@pytest.fixture
+def records():
+    """收集日志记录"""
+    collected = []
+    handler_id = logger.add(lambda m: collected.append(m.record), level="INFO")
+    yield collected
+    logger.remove(handler_id)
+
+
+def make_message(text: str) -> Message:
+    """构造测试入站消息"""
+    return Message(
+        platform="feishu",
+        message_id="m1",
+        sender={"id": "u1", "name": "Tom"},
+        conversation={"id": "c1", "type": "group"},
+        content={"type": "text", "text": text},
+        timestamp=0,
+    )
+
+
+def test_compact_mode_emits_one_structured_record(records):
+    """测试紧凑模式每条消息只输出一条带结构化字段的记录，内容被截断"""
+    message_log = MessageLog(compact=True, content_max_length=10)
+
+    message_log.inbound(make_message("第一行\n第二行\n" + "x" * 50))
+
+    assert len(records) == 1
+    record = records[0]
+    assert record["extra"]["platform"] == "feishu"
+    assert record["extra"]["conversation"] == "group:c1"
+    assert record["extra"]["direction"] == "inbound"
+    assert "(58 chars)" in record["message"]
+
+
+def test_unsampled_content_is_not_logged(records):
+    """测试未抽中的消息只记录内容长度"""
+    message_log = MessageLog(compact=True, content_sample_rate=0.0)
+
+    message_log.outbound("feishu", "c1", "group", "text", "secret text")
+
+    assert len(records) == 1
+    assert "secret" not in records[0]["message"]
+    assert "<11 chars>" in records[0]["message"]
+
+
+def test_repeated_errors_are_collapsed(records, monkeypatch):
+    """测试窗口内相同位置和模板的错误只输出一次，窗口结束后输出汇总"""
+    now = [1000.0]
+    monkeypatch.setattr("chatagentcore.storage.logger.time.monotonic", lambda: now[0])
+    throttle = LogThrottle(window=60)
+
+    def fail(attempt):
+        throttle.error("发送失败: {}", f"timeout #{attempt}")
+
+    for attempt in range(5):
+        fail(attempt)
+        now[0] += 10
+    now[0] += 20
+    fail(5)
+    throttle.error("另一类错误: {}", "x")
+
+    messages = [record["message"] for record in records]
+    assert messages == [
+        "发送失败: timeout #0",
+        "发送失败: timeout #5 [5 occurrences in last 70s]",
+        "另一类错误: x",
+    ]
+    assert records[0]["function"] == "fail"
+
+
+def test_json_lines_sink_is_written_in_background(tmp_path):
+    """测试文件日志经后台线程写入 JSON Lines，结构化字段保留在 extra 中"""
+    LogConfig(str(tmp_path), file_name="app.log", rotation="1 MB", json_format=True).setup()
+    try:
+        logger.bind(platform="feishu").info("hello")
+        logger.complete()
+    finally:
+        logger.remove()
+        logger.add(sys.stderr)
+
+    lines = (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()
+    record = json.loads(lines[-1])["record"]
+    assert record["message"] == "hello"
+    assert record["extra"]["platform"] == "feishu"
@@ -0,0 +1,113 @@
+"""Unit tests for the persistent message store"""
+
+import pytest
+from chatagentcore.adapters.base import Message
+from chatagentcore.core.send_jobs import SendJob
+from chatagentcore.storage.message_store import MessageStore
+
+
+def make_message(conversation_id: str, text: str) -> Message:
+    """构造测试入站消息"""
+    return Message(
+        platform="feishu",
+        message_id=f"m-{text}",
+        sender={"id": "u1"},
+        conversation={"id": conversation_id, "type": "group"},
+        content={"type": "text", "text": text},
+        timestamp=0,
+    )
+
+
+@pytest.fixture
+async def store(tmp_path):
+    """打开临时消息存储"""
+    message_store = MessageStore(str(tmp_path / "messages.db"))
+    await message_store.open()
+    yield message_store
+    await message_store.close()
+
+
+@pytest.mark.asyncio
+async def test_conversations_are_paginated_by_recent_activity(store, monkeypatch):
+    """测试会话按最近活跃度倒序分页，游标翻页不重复不遗漏"""
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr("chatagentcore.storage.message_store.time.time", lambda: next(clock))
+    for index in range(5):
+        store.record_inbound(make_message(f"c{index}", f"hello {index}"))
+    await store.record_outbound(
+        SendJob(job_id="j1", platform="feishu", to="c0", message_type="text", content="reply", conversation_type="group"), "om_1"
+    )
+
+    first, cursor = await store.list_conversations("feishu", limit=3)
+    second, last_cursor = await store.list_conversations("feishu", limit=3, cursor=cursor)
+
+    assert [c["conversation_id"] for c in first] == ["c0", "c4", "c3"]
+    assert first[0]["last_text"] == "reply"
+    assert first[0]["message_count"] == 2
+    assert [c["conversation_id"] for c in second] == ["c2", "c1"]
+    assert last_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_messages_are_paginated_and_compacted(store):
+    """测试会话历史按时间倒序分页，过期消息被清理"""
+    for index in range(3):
+        store.record_inbound(make_message("c1", str(index)))
+    await store.submit_write([])
+
+    page, cursor = await store.list_messages("feishu", "c1", limit=2)
+    rest, _ = await store.list_messages("feishu", "c1", limit=2, cursor=cursor)
+    assert [m["text"] for m in page + rest] == ["2", "1", "0"]
+    assert page[0]["direction"] == "inbound"
+
+    with pytest.raises(ValueError):
+        await store.list_messages("feishu", "c1", cursor="not-a-cursor")
+
+    await store.compact(retention=-1)
+    assert await store.list_conversations("feishu") == ([], None)
+
+
+@pytest.mark.asyncio
+async def test_search_matches_cjk_substrings_with_filters(store):
+    """测试全文检索匹配中文子串，支持平台/会话过滤与游标分页，短关键词退化为 LIKE"""
+    for conversation_id, text in [
+        ("c1", "明天下午三点开会"),
+        ("c1", "会议改到周五"),
+        ("c2", "今天的会议安排"),
+        ("c2", "100% done"),
+        ("c2", "say \"hi\" AND bye"),
+    ]:
+        store.record_inbound(make_message(conversation_id, text))
+    await store.submit_write([])
+
+    first, cursor = await store.search("会议", limit=1)
+    second, last_cursor = await store.search("会议", limit=1, cursor=cursor)
+    assert [m["text"] for m in first + second] == ["今天的会议安排", "会议改到周五"]
+    assert last_cursor is None
+
+    results, _ = await store.search("下午三点", platform="feishu", conversation_id="c1")
+    assert [m["text"] for m in results] == ["明天下午三点开会"]
+    assert (await store.search("下午三点", conversation_id="c2"))[0] == []
+    assert [m["text"] for m in (await store.search('0% d'))[0]] == ["100% done"]
+    assert [m["text"] for m in (await store.search("%"))[0]] == ["100% done"]
+    assert [m["text"] for m in (await store.search('"hi" AND'))[0]] == ['say "hi" AND bye']
+
+    await store.compact(retention=-1)
+    assert await store.search("会议") == ([], None)
+
+
+@pytest.mark.asyncio
+async def test_compact_keeps_message_count_in_sync(store, monkeypatch):
+    """测试删除过期消息后会话的消息计数随之减少"""
+    now = [1000.0]
+    monkeypatch.setattr("chatagentcore.storage.message_store.time.time", lambda: now[0])
+    store.record_inbound(make_message("c1", "old"))
+    now[0] = 5000.0
+    await store.record_inbound(make_message("c1", "new"))
+
+    await store.compact(retention=2000)
+
+    conversations, _ = await store.list_conversations("feishu")
+    messages, _ = await store.list_messages("feishu", "c1")
+    assert [m["text"] for m in messages] == ["new"]
+    assert conversations[0]["message_count"] == 1
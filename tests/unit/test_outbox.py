@@ -0,0 +1,106 @@
+"""Unit tests for OutboxStore and router retries"""
+
+import pytest
+from chatagentcore.core.router import RetryPolicy, SubmitError
+from chatagentcore.core.send_jobs import JOB_SENT, JOB_FAILED
+from chatagentcore.storage.outbox import OutboxStore
+
+
+@pytest.fixture
+async def outbox(tmp_path):
+    """临时发件箱"""
+    store = OutboxStore(str(tmp_path / "outbox.db"), flush_interval=0)
+    await store.open()
+    yield store
+    await store.close()
+
+
+@pytest.fixture
+def make_outbox_router(make_router, outbox):
+    """创建启用了发件箱的路由器"""
+
+    async def _make(max_attempts: int = 3, **config):
+        router = await make_router(**config)
+        policy = RetryPolicy(max_attempts=max_attempts, base_delay=0.001, max_delay=0.001)
+        router.configure_outbox(outbox, policy)
+        return router
+
+    return _make
+
+
+def test_retry_policy_backoff_is_bounded():
+    """测试退避时长在指数上限的一半到上限之间"""
+    policy = RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=10.0)
+    for attempt, cap in [(1, 1.0), (2, 2.0), (3, 4.0), (10, 10.0)]:
+        delay = policy.backoff(attempt)
+        assert cap / 2 <= delay <= cap
+
+
+@pytest.mark.asyncio
+async def test_sent_job_is_removed_from_outbox(make_outbox_router, outbox):
+    """测试发送成功后从发件箱删除"""
+    router = await make_outbox_router()
+    job = await router.submit("fake", "u1", "text", "hello")
+    await router.wait_job(job, timeout=1.0)
+
+    assert job.status == JOB_SENT
+    assert await outbox.list_pending() == []
+
+
+@pytest.mark.asyncio
+async def test_failed_job_moves_to_dead_letter_and_replays(make_outbox_router, outbox):
+    """测试重试耗尽后进入死信，并可重放"""
+    router = await make_outbox_router(max_attempts=3, fail=True)
+    job = await router.submit("fake", "u1", "text", "hello")
+    await router.wait_job(job, timeout=1.0)
+
+    assert job.status == JOB_FAILED
+    assert job.attempts == 3
+    dead = await outbox.list_dead_letters()
+    assert [d["job_id"] for d in dead] == [job.job_id]
+    assert await outbox.list_pending() == []
+
+    router.adapter_manager.get_adapter("fake").fail = False
+    replayed = await router.replay_dead_letter(job.job_id)
+    await router.wait_job(replayed, timeout=1.0)
+
+    assert replayed.status == JOB_SENT
+    assert await outbox.count_dead_letters() == 0
+
+
+@pytest.mark.asyncio
+async def test_recover_pending_jobs(make_outbox_router, outbox):
+    """测试启动时恢复未完成的任务"""
+    router = await make_outbox_router(delay=10)
+    job = await router.submit("fake", "u1", "text", "hello")
+    await router.stop()
+    assert [r["job_id"] for r in await outbox.list_pending()] == [job.job_id]
+
+    restarted = await make_outbox_router()
+    assert await restarted.recover_outbox() == 1
+    recovered = restarted.get_job(job.job_id)
+    await restarted.wait_job(recovered, timeout=1.0)
+
+    assert recovered.status == JOB_SENT
+    assert await outbox.list_pending() == []
+
+
+@pytest.mark.asyncio
+async def test_outbox_write_failure_releases_idempotency_key(make_outbox_router, outbox, monkeypatch):
+    """测试发件箱写入失败时任务标记为失败，同一幂等键重试时创建新任务"""
+    router = await make_outbox_router()
+
+    async def broken_add(job):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(outbox, "add", broken_add)
+    with pytest.raises(SubmitError) as excinfo:
+        await router.submit("fake", "u1", "text", "hi", idempotency_key="k1")
+    assert excinfo.value.job.status == JOB_FAILED
+    monkeypatch.undo()
+
+    job = await router.submit("fake", "u1", "text", "hi", idempotency_key="k1")
+    await router.wait_job(job, timeout=1.0)
+
+    assert job.status == JOB_SENT
+    assert len([j for j in router.jobs._jobs.values() if j.status == JOB_FAILED]) == 1
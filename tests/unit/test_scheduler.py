@@ -0,0 +1,93 @@
+"""Unit tests for scheduled message delivery"""
+
+import asyncio
+import time
+import pytest
+from chatagentcore.core.scheduler import MessageScheduler
+from chatagentcore.storage.schedule import ScheduleStore
+
+
+@pytest.fixture
+async def schedule_store(tmp_path):
+    """临时定时消息存储"""
+    store = ScheduleStore(str(tmp_path / "schedule.db"), flush_interval=0)
+    await store.open()
+    yield store
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_due_messages_are_sent_in_time_order(make_router):
+    """测试定时消息按发送时间先后提交"""
+    router = await make_router()
+    scheduler = MessageScheduler(router)
+    await scheduler.start()
+
+    now = time.time()
+    await scheduler.schedule("fake", "u1", "text", "second", send_at=now + 0.1)
+    await scheduler.schedule("fake", "u1", "text", "first", send_at=now + 0.05)
+    assert scheduler.pending == 2
+
+    await asyncio.sleep(0.3)
+    await scheduler.stop()
+
+    assert router.adapter_manager.get_adapter("fake").sent == [("u1", "first"), ("u1", "second")]
+    assert scheduler.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_message_is_not_sent(make_router):
+    """测试取消的定时消息不会发送"""
+    router = await make_router()
+    scheduler = MessageScheduler(router)
+    await scheduler.start()
+
+    entry = await scheduler.schedule("fake", "u1", "text", "hello", send_at=time.time() + 0.05)
+    assert await scheduler.cancel(entry.schedule_id)
+    assert not await scheduler.cancel(entry.schedule_id)
+
+    await asyncio.sleep(0.15)
+    await scheduler.stop()
+
+    assert router.adapter_manager.get_adapter("fake").sent == []
+
+
+@pytest.mark.asyncio
+async def test_retried_schedule_with_same_key_is_deduplicated(make_router):
+    """测试相同幂等键的重复登记返回已有定时消息，取消后不会再发送"""
+    router = await make_router()
+    scheduler = MessageScheduler(router)
+    await scheduler.start()
+
+    send_at = time.time() + 0.05
+    first = await scheduler.schedule("fake", "u1", "text", "hello", send_at=send_at, idempotency_key="k1")
+    retry = await scheduler.schedule("fake", "u1", "text", "hello", send_at=send_at, idempotency_key="k1")
+    assert retry is first
+    assert scheduler.pending == 1
+
+    assert await scheduler.cancel(first.schedule_id)
+    await asyncio.sleep(0.15)
+    await scheduler.stop()
+
+    assert router.adapter_manager.get_adapter("fake").sent == []
+
+
+@pytest.mark.asyncio
+async def test_scheduled_messages_survive_restart(make_router, schedule_store):
+    """测试持久化的定时消息在重启后恢复，重启期间到期的消息立即发送"""
+    scheduler = MessageScheduler(await make_router())
+    scheduler.configure_store(schedule_store)
+    await scheduler.schedule("fake", "u1", "text", "missed", send_at=time.time() + 0.05)
+    await scheduler.schedule("fake", "u2", "text", "later", send_at=time.time() + 3600)
+
+    await asyncio.sleep(0.1)
+    router = await make_router()
+    restarted = MessageScheduler(router)
+    restarted.configure_store(schedule_store)
+    await restarted.start()
+    await asyncio.sleep(0.1)
+    await restarted.stop()
+
+    assert router.adapter_manager.get_adapter("fake").sent == [("u1", "missed")]
+    remaining = await schedule_store.list_all()
+    assert [record["content"] for record in remaining] == ["later"]
@@ -0,0 +1,127 @@
+"""Unit tests for send jobs"""
+
+import time
+import pytest
+from chatagentcore.core.send_jobs import SendJobStore, JOB_QUEUED, JOB_SENT, JOB_FAILED, JOB_EXPIRED
+
+
+def test_job_store_lookup_by_message_id():
+    """测试按平台消息 ID 查询任务"""
+    store = SendJobStore()
+    job = store.create("fake", "u1", "text", "hi")
+    assert job.status == JOB_QUEUED
+
+    store.mark_sending(job)
+    store.mark_sent(job, "platform_msg_1")
+
+    assert store.get(job.job_id) is job
+    assert store.get("platform_msg_1") is job
+    assert job.attempts == 1
+
+
+def test_job_store_evicts_finished_jobs_over_capacity():
+    """测试容量淘汰只淘汰已结束的任务"""
+    store = SendJobStore(max_size=2)
+    first = store.create("fake", "u1", "text", "1")
+    store.mark_failed(first, "boom")
+    store.create("fake", "u1", "text", "2")
+    store.create("fake", "u1", "text", "3")
+
+    assert store.get(first.job_id) is None
+    assert len(store) == 2
+
+
+def test_stuck_job_does_not_block_capacity_eviction():
+    """测试队首任务未结束时，其后已结束的任务仍按容量淘汰"""
+    store = SendJobStore(max_size=3)
+    stuck = store.create("fake", "u1", "text", "stuck")
+    for i in range(10):
+        store.mark_sent(store.create("fake", "u1", "text", str(i)), f"m{i}")
+
+    assert len(store) <= 3
+    assert store.get(stuck.job_id) is stuck
+    assert store.get("m0") is None
+    assert store.get("m9") is not None
+
+
+@pytest.mark.asyncio
+async def test_router_submit_tracks_status(make_router):
+    """测试异步提交后任务状态变为 sent"""
+    router = await make_router(delay=0.01)
+    job = await router.submit("fake", "u1", "text", "hello")
+    assert job.status == JOB_QUEUED
+
+    await router.wait_job(job, timeout=1.0)
+
+    assert job.status == JOB_SENT
+    assert job.message_id == "fake_1"
+    assert router.get_job("fake_1") is job
+
+
+@pytest.mark.asyncio
+async def test_router_submit_records_failure(make_router):
+    """测试发送失败时记录错误"""
+    router = await make_router(fail=True)
+    job = await router.submit("fake", "u1", "text", "hello")
+
+    await router.wait_job(job, timeout=1.0)
+
+    assert job.status == JOB_FAILED
+    assert "platform down" in job.error
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_suppresses_duplicates(make_router):
+    """测试相同幂等键的并发和后续请求复用同一任务"""
+    router = await make_router(delay=0.01)
+    first = await router.submit("fake", "u1", "text", "hello", idempotency_key="k1")
+    concurrent = await router.submit("fake", "u1", "text", "hello", idempotency_key="k1")
+    assert concurrent is first
+
+    await router.wait_job(first, timeout=1.0)
+    later = await router.submit("fake", "u1", "text", "hello", idempotency_key="k1")
+
+    assert later is first
+    assert router.adapter_manager.get_adapter("fake").sent == [("u1", "hello")]
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_allows_retry_after_failure(make_router):
+    """测试发送失败后同一幂等键可以重新发送"""
+    router = await make_router(fail=True)
+    first = await router.submit("fake", "u1", "text", "hello", idempotency_key="k1")
+    await router.wait_job(first, timeout=1.0)
+
+    retry = await router.submit("fake", "u1", "text", "hello", idempotency_key="k1")
+    assert retry is not first
+
+
+@pytest.mark.asyncio
+async def test_expired_job_is_dropped(make_router):
+    """测试排队期间超过截止时间的任务被丢弃而不发送"""
+    router = await make_router(delay=0.05)
+    first = await router.submit("fake", "u1", "text", "first")
+    stale = await router.submit("fake", "u1", "text", "stale", deadline=time.time() + 0.01)
+
+    await router.wait_job(first, timeout=1.0)
+    await router.wait_job(stale, timeout=1.0)
+
+    assert stale.status == JOB_EXPIRED
+    assert router.adapter_manager.get_adapter("fake").sent == [("u1", "first")]
+
+
+@pytest.mark.asyncio
+async def test_burst_of_texts_is_coalesced(make_router):
+    """测试合并窗口内发往同一会话的短文本合并为一次发送"""
+    router = await make_router()
+    router.coalesce_window = 0.02
+    adapter = router.adapter_manager.get_adapter("fake")
+    adapter.max_text_length = 5
+
+    jobs = [await router.submit("fake", "u1", "text", text) for text in ("a", "b", "c", "long")]
+    for job in jobs:
+        await router.wait_job(job, timeout=1.0)
+
+    assert adapter.sent == [("u1", "a\nb\nc"), ("u1", "long")]
+    assert [job.message_id for job in jobs] == ["fake_1", "fake_1", "fake_1", "fake_2"]
+    assert all(job.status == JOB_SENT for job in jobs)
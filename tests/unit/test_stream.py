@@ -0,0 +1,70 @@
+"""Unit tests for streaming replies"""
+
+import asyncio
+import pytest
+from chatagentcore.adapters.stream import ReplyStream
+
+
+class RecordingStream(ReplyStream):
+    """记录渲染过程的流式回复"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rendered = []
+
+    async def _update(self, text):
+        self.rendered.append(text)
+
+    async def _finalize(self, text):
+        self.rendered.append(("final", text))
+        return "msg_1"
+
+
+@pytest.mark.asyncio
+async def test_stream_updates_are_throttled():
+    """测试高频增量只触发节流后的少量更新，结束时发送完整内容"""
+    stream = RecordingStream(None, "u1", min_interval=0.05)
+    for i in range(20):
+        await stream.append(f"{i} ")
+        await asyncio.sleep(0.005)
+
+    message_id = await stream.finish()
+
+    assert message_id == "msg_1"
+    assert 1 <= stream.updates <= 4
+    assert stream.rendered[-1] == ("final", "".join(f"{i} " for i in range(20)))
+
+
+@pytest.mark.asyncio
+async def test_chunked_fallback_sends_completed_paragraphs(make_router):
+    """测试不支持更新消息的平台按段落分条发送"""
+    router = await make_router()
+    router.stream_interval = 0.01
+    stream = router.open_stream("fake", "u1")
+
+    await stream.append("第一段。\n\n第二")
+    await asyncio.sleep(0.05)
+    await stream.append("段。")
+    await stream.finish()
+
+    adapter = router.adapter_manager.get_adapter("fake")
+    assert adapter.sent == [("u1", "第一段。"), ("u1", "第二段。")]
+    assert stream.message_id == "fake_1"
+
+
+@pytest.mark.asyncio
+async def test_chunked_failed_update_is_resent_on_finish(make_router):
+    """测试中间段落发送失败时不丢失，结束时随剩余内容一起重发"""
+    router = await make_router()
+    router.stream_interval = 0.01
+    stream = router.open_stream("fake", "u1")
+    adapter = router.adapter_manager.get_adapter("fake")
+
+    adapter.fail = True
+    await stream.append("para one\n\npara")
+    await asyncio.sleep(0.05)
+    adapter.fail = False
+    await stream.append(" two")
+    await stream.finish()
+
+    assert [text for _, text in adapter.sent] == ["para one\n\npara two"]
@@ -0,0 +1,63 @@
+"""Unit tests for precompiled message templates"""
+
+import json
+import pytest
+from chatagentcore.api.models.message import SendMessageRequest
+from chatagentcore.api.schemas.config import TemplateConfig
+from chatagentcore.core.templates import CompiledTemplate, TemplateError, TemplateRegistry
+
+
+def test_text_template_substitutes_slots():
+    """测试文本模板替换占位符"""
+    template = CompiledTemplate("你好，{{name}}！今天是{{ day }}。")
+
+    assert template.slots == {"name", "day"}
+    assert template.render({"name": "张三", "day": 3}) == "你好，张三！今天是3。"
+
+
+def test_json_template_escapes_values():
+    """测试卡片模板对变量值做 JSON 转义，渲染结果仍是合法 JSON"""
+    card = {"header": {"title": "{{title}}"}, "elements": [{"text": "状态：{{status}}"}]}
+    template = CompiledTemplate(card, message_type="card")
+
+    rendered = template.render({"title": '含"引号"\n换行', "status": "完成"})
+
+    assert json.loads(rendered) == {
+        "header": {"title": '含"引号"\n换行'},
+        "elements": [{"text": "状态：完成"}],
+    }
+
+
+def test_missing_variables_raise():
+    """测试缺少变量时报错"""
+    template = CompiledTemplate("{{a}} {{b}}")
+
+    with pytest.raises(TemplateError, match="b"):
+        template.render({"a": 1})
+
+
+def test_registry_loads_config_and_renders():
+    """测试注册表从配置加载并按 ID 渲染"""
+    registry = TemplateRegistry()
+    registry.load({
+        "notice": TemplateConfig(content={"text": "{{msg}}"}),
+        "greeting": TemplateConfig(message_type="text", content="hi {{name}}"),
+    })
+
+    assert len(registry) == 2
+    assert registry.render("greeting", {"name": "bob"}) == ("text", "hi bob")
+    message_type, content = registry.render("notice", {"msg": "ok"})
+    assert message_type == "card"
+    assert json.loads(content) == {"text": "ok"}
+
+    with pytest.raises(TemplateError):
+        registry.render("unknown")
+
+
+def test_send_request_requires_content_or_template():
+    """测试发送请求必须提供内容或模板 ID"""
+    with pytest.raises(ValueError):
+        SendMessageRequest(platform="fake", to="u1")
+
+    request = SendMessageRequest(platform="fake", to="u1", template_id="notice", template_vars={"msg": "ok"})
+    assert request.content == ""
@@ -0,0 +1,66 @@
+"""Unit tests for the webhook ingress queue"""
+
+import asyncio
+import pytest
+from chatagentcore.core.webhook_ingress import WebhookIngress
+
+
+@pytest.mark.asyncio
+async def test_bodies_are_processed_in_background():
+    """测试请求体入队后由后台任务处理"""
+    processed = []
+    ingress = WebhookIngress(max_size=10, workers=1)
+    ingress.register("feishu", processed.append)
+    await ingress.start()
+
+    assert ingress.offer("feishu", b'{"a": 1}')
+    assert ingress.offer("feishu", b'{"a": 2}')
+    await asyncio.sleep(0.01)
+    await ingress.stop()
+
+    assert processed == [b'{"a": 1}', b'{"a": 2}']
+    assert ingress.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_and_errors_do_not_stop_worker():
+    """测试队列满时拒绝入队，处理异常不影响后续请求"""
+    processed = []
+
+    def processor(body):
+        if body == b"bad":
+            raise ValueError("broken payload")
+        processed.append(body)
+
+    ingress = WebhookIngress(max_size=2, workers=1)
+    ingress.register("dingtalk", processor)
+
+    assert ingress.offer("dingtalk", b"bad")
+    assert ingress.offer("dingtalk", b"ok")
+    assert not ingress.offer("dingtalk", b"overflow")
+
+    await ingress.start()
+    await asyncio.sleep(0.01)
+    await ingress.stop()
+
+    assert processed == [b"ok"]
+
+
+def test_missing_signature_headers_are_rejected_when_secret_configured(monkeypatch):
+    """测试配置了密钥时缺少签名头的请求被拒绝，未配置密钥时不校验"""
+    from types import SimpleNamespace
+    from chatagentcore.api.routes import webhook
+
+    platforms = SimpleNamespace(
+        feishu=SimpleNamespace(encrypt_key="key"), dingtalk=SimpleNamespace(app_secret="secret")
+    )
+    monkeypatch.setattr(webhook, "get_config_manager", lambda: SimpleNamespace(platforms=platforms))
+
+    assert not webhook._verify_feishu_signature(b"{}", None, None, None)
+    assert not webhook._verify_dingtalk_signature(None, None)
+    assert not webhook._verify_dingtalk_signature("1700000000000", None)
+
+    platforms.feishu.encrypt_key = ""
+    platforms.dingtalk.app_secret = ""
+    assert webhook._verify_feishu_signature(b"{}", None, None, None)
+    assert webhook._verify_dingtalk_signature(None, None)